@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Toplu Ön Hesaplama - Çok sayıda konum için elevation, tile, piramit ve mesh cache'ini
+bir süreç havuzunda hazırlar
+
+Örnek:
+    python batch_precompute.py --all
+    python batch_precompute.py --csv sites.csv --workers 8 --quality high
+
+CSV satırları `isim,lat,lon` biçimindedir; başlık satırı varsa atlanır.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from config import (DEFAULT_LOCATIONS, LIGHTMAP_SETTINGS, PRECOMPUTE_SETTINGS, RENDER_SETTINGS,
+                    get_terrain_quality_settings)
+from utils import elevation_dtype, load_elevation, logger, save_elevation, setup_logging
+
+STAGES = ('fetch', 'process', 'mesh')
+
+# Worker süreci başına tek loader (ayrı HTTP session)
+_worker_loader = None
+
+
+def load_locations_csv(path):
+    """CSV dosyasından (isim, (lat, lon)) listesi okur"""
+    locations = []
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if len(row) < 3 or row[0].startswith('#'):
+                continue
+            try:
+                lat, lon = float(row[1]), float(row[2])
+            except ValueError:
+                continue  # Başlık satırı
+            locations.append((row[0].strip(), (lat, lon)))
+    return locations
+
+
+# --- Paylaşılan bellek ---
+
+def _attach_shared(name):
+    """Ana sürecin oluşturduğu bloğa bağlanır; bloğun sahibi ana süreçtir"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+def _shared_array(block, shape):
+    return np.ndarray(shape, dtype=elevation_dtype(), buffer=block.buf)
+
+
+# --- Worker aşamaları (ayrı süreçlerde çalışır) ---
+
+def _init_worker():
+    """Worker'lar cache indeksini yazmaz; ana süreç sonunda refresh_index ile toplar"""
+    from cache_manager import set_index_persistence
+    set_index_persistence(False)
+
+
+def _get_loader():
+    global _worker_loader
+    if _worker_loader is None:
+        from map_data_loader import MapDataLoader
+        _worker_loader = MapDataLoader()
+    return _worker_loader
+
+
+def _as_cached_grid(elevation_data):
+    """Grid'i elevation cache'inden okunduğu haliyle (save/load turu) döndürür"""
+    buffer = io.BytesIO()
+    save_elevation(buffer, elevation_data)
+    buffer.seek(0)
+    return load_elevation(buffer)
+
+
+def _fetch_stage(job, shm_name, size, zoom_level):
+    """
+    Elevation grid'ini paylaşılan belleğe yazar, tile'ları disk cache'ine indirir.
+
+    API'den gelen grid cache'e kodlanarak yazılır; widget sonraki yüklemede
+    cache'ten okunan grid'i görür. Sonraki aşamalar aynı grid'le çalışsın diye
+    paylaşılan belleğe bu grid yazılır.
+    """
+    start = time.perf_counter()
+    loader = _get_loader()
+
+    elevation_data = loader.get_elevation_data(job['lat'], job['lon'], size)
+    terrain_bounds = loader.last_elevation_bounds
+    source = loader.last_elevation_source
+    if source == 'api':
+        elevation_data = _as_cached_grid(elevation_data)
+    loader.get_map_tiles(job['lat'], job['lon'], zoom_level, size=size)
+    tile_bounds = loader.get_tile_bounds(job['lat'], job['lon'], zoom_level, size)
+
+    block = _attach_shared(shm_name)
+    try:
+        _shared_array(block, elevation_data.shape)[...] = elevation_data
+    finally:
+        block.close()
+
+    return {
+        'shape': elevation_data.shape,
+        'terrain_bounds': terrain_bounds,
+        'tile_bounds': tile_bounds,
+        'source': source,
+        'bytes': elevation_data.nbytes,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _process_stage(job, shm_name, meta, size, smooth_iterations):
+    """Ham grid'in elevation piramidini cache'e yazar, ardından isteğe bağlı yumuşatmayı yerinde uygular"""
+    from elevation_pyramid import ElevationPyramid
+    from utils import smooth_elevation_data
+
+    start = time.perf_counter()
+    block = _attach_shared(shm_name)
+    try:
+        grid = _shared_array(block, meta['shape'])
+        # Piramit, widget'ın cache'ten okuyacağı ham grid'den üretilir; sahte
+        # veri kalıcı cache'e yazılmaz (loader ile aynı kural)
+        if meta['source'] != 'fake':
+            pyramid = ElevationPyramid.build(grid, meta['terrain_bounds'])
+            _get_loader().store_elevation_pyramid(job['lat'], job['lon'], size, pyramid)
+
+        if smooth_iterations:
+            smooth_elevation_data(grid, smooth_iterations, out=grid)
+    finally:
+        block.close()
+
+    return {'bytes': int(np.prod(meta['shape'])) * elevation_dtype().itemsize,
+            'seconds': time.perf_counter() - start}
+
+
+def _mesh_stage(job, shm_name, meta, height_scale):
+    """
+    Widget'ın kullanacağı anahtarla terrain mesh'ini oluşturup mesh cache'ine yazar
+    (normaller, renkler ve indeksler dahil); ışık haritası da cache'e alınır.
+
+    Anahtar Map3DWidget.generate_terrain_display_list ile aynı girdilerden
+    (grid, height_scale, varsayılan kalite, UV kaynağı) hesaplanır.
+    """
+    from mesh_cache import MeshCache, mesh_cache_key
+    from terrain_mesh import build_terrain_mesh, compute_terrain_uvs
+
+    start = time.perf_counter()
+    block = _attach_shared(shm_name)
+    try:
+        grid = _shared_array(block, meta['shape'])
+        rows, cols = grid.shape
+        uvs = compute_terrain_uvs(meta['terrain_bounds'], meta['tile_bounds'], rows, cols)
+        key = mesh_cache_key(grid, height_scale,
+                             uv_source=[meta['terrain_bounds'], meta['tile_bounds']])
+
+        mesh_cache = MeshCache()
+        mesh = mesh_cache.load(key)
+        cached = mesh is not None
+        if not cached:
+            mesh = build_terrain_mesh(grid, height_scale, uvs)
+            mesh_cache.store(key, mesh)
+        result = {'mesh_key': key, 'triangles': mesh.triangle_count,
+                  'bytes': mesh.nbytes, 'cached': cached}
+        del mesh
+
+        if LIGHTMAP_SETTINGS['ENABLED']:
+            from terrain_lightmap import load_or_bake_lightmap
+            load_or_bake_lightmap(grid, height_scale)
+    finally:
+        block.close()
+
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+# --- Checkpoint ---
+
+def _load_checkpoint(path, settings):
+    """Aynı ayarlarla yazılmış checkpoint'teki tamamlanan konumları döndürür"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('settings') != settings:
+        logger.info("Checkpoint ayarları farklı, baştan başlanıyor")
+        return {}
+    return data.get('completed', {})
+
+
+def _save_checkpoint(path, settings, completed):
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'settings': settings, 'completed': completed}, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Checkpoint kaydedilemedi: {e}")
+
+
+# --- Ana süreç ---
+
+def precompute(locations, quality=None, workers=None, checkpoint_path=None,
+               smooth_iterations=None, restart=False):
+    """
+    Konumları fetch -> process -> mesh aşamalarından geçirir.
+
+    Her aşama havuzdaki herhangi bir worker'da çalışır; farklı konumların
+    aşamaları iç içe ilerler. Elevation grid'i ana sürecin oluşturduğu bir
+    paylaşılan bellek bloğunda durur, aşamalar arasında yalnızca blok adı ve
+    küçük meta veriler pickle edilir. Tamamlanan her konum checkpoint'e yazılır;
+    yeniden çalıştırmada atlanır.
+
+    Aşama başına sayı, süre ve veri hacmini içeren bir özet sözlüğü döndürür.
+    """
+    if isinstance(locations, dict):
+        locations = list(locations.items())
+    quality = quality or RENDER_SETTINGS['TERRAIN_QUALITY']
+    quality_settings = get_terrain_quality_settings(quality)
+    size = quality_settings['terrain_size']
+    zoom_level = quality_settings['tile_zoom']
+    height_scale = RENDER_SETTINGS['HEIGHT_SCALE']  # Map3DWidget.height_scale
+    workers = workers or PRECOMPUTE_SETTINGS['WORKERS'] or os.cpu_count() or 1
+    checkpoint_path = checkpoint_path or PRECOMPUTE_SETTINGS['CHECKPOINT_FILE']
+    if smooth_iterations is None:
+        smooth_iterations = PRECOMPUTE_SETTINGS['SMOOTH_ITERATIONS']
+
+    settings = {'quality': quality, 'size': size, 'zoom': zoom_level,
+                'height_scale': height_scale, 'smooth': smooth_iterations}
+    completed = {} if restart else _load_checkpoint(checkpoint_path, settings)
+
+    pending = [{'name': name, 'lat': lat, 'lon': lon}
+               for name, (lat, lon) in locations if name not in completed]
+    skipped = len(locations) - len(pending)
+    if skipped:
+        logger.info(f"{skipped} konum checkpoint'ten atlandı")
+    pending.reverse()  # pop() ile sırayla al
+
+    stage_stats = {stage: {'count': 0, 'seconds': 0.0, 'bytes': 0} for stage in STAGES}
+    failed = []
+    block_size = size * size * elevation_dtype().itemsize
+    max_in_flight = workers * PRECOMPUTE_SETTINGS['MAX_IN_FLIGHT']
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {}  # Future -> (aşama, iş, blok, meta)
+
+        def start_next():
+            job = pending.pop()
+            block = shared_memory.SharedMemory(create=True, size=block_size)
+            future = executor.submit(_fetch_stage, job, block.name, size, zoom_level)
+            futures[future] = ('fetch', job, block, None)
+
+        while pending and len(futures) < max_in_flight:
+            start_next()
+
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, job, block, meta = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"{job['name']} {stage} aşamasında başarısız: {e}")
+                    failed.append(job['name'])
+                    block.close()
+                    block.unlink()
+                    result = None
+
+                if result is not None:
+                    stats = stage_stats[stage]
+                    stats['count'] += 1
+                    stats['seconds'] += result['seconds']
+                    stats['bytes'] += result['bytes']
+
+                    if stage == 'fetch':
+                        next_future = executor.submit(_process_stage, job, block.name, result,
+                                                      size, smooth_iterations)
+                        futures[next_future] = ('process', job, block, result)
+                    elif stage == 'process':
+                        next_future = executor.submit(_mesh_stage, job, block.name, meta,
+                                                      height_scale)
+                        futures[next_future] = ('mesh', job, block, meta)
+                    else:
+                        block.close()
+                        block.unlink()
+                        completed[job['name']] = {
+                            'lat': job['lat'], 'lon': job['lon'],
+                            'source': meta['source'], 'mesh_key': result['mesh_key'],
+                            'triangles': result['triangles'],
+                        }
+                        _save_checkpoint(checkpoint_path, settings, completed)
+
+                if stage == 'mesh' or result is None:
+                    if pending:
+                        start_next()
+
+    # Worker'ların yazdığı dosyaları ortak cache indeksine kat
+    from cache_manager import get_cache_manager
+    get_cache_manager().refresh_index()
+
+    total_time = time.perf_counter() - start
+    for stats in stage_stats.values():
+        stats['items_per_worker_second'] = stats['count'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+        stats['mb_per_worker_second'] = (stats['bytes'] / (1024 * 1024) / stats['seconds']
+                                         if stats['seconds'] > 0 else 0.0)
+
+    done_count = stage_stats['mesh']['count']
+    summary = {
+        'locations': done_count,
+        'skipped': skipped,
+        'failed': failed,
+        'workers': workers,
+        'total_seconds': total_time,
+        'locations_per_second': done_count / total_time if total_time > 0 else 0.0,
+        'stages': stage_stats,
+    }
+
+    logger.info(f"{done_count} konum {total_time:.2f} sn'de hazırlandı "
+                f"({summary['locations_per_second']:.2f} konum/sn, {workers} worker)")
+    for stage, stats in stage_stats.items():
+        logger.info(f"  {stage:8s} {stats['count']:5d} adet  {stats['seconds']:8.2f} sn  "
+                    f"{stats['items_per_worker_second']:7.2f} adet/sn/worker  "
+                    f"{stats['mb_per_worker_second']:7.2f} MB/sn/worker")
+    return summary
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Konum listesi için toplu veri ve mesh ön hesaplaması")
+    parser.add_argument('--all', action='store_true', help="DEFAULT_LOCATIONS'taki tüm konumlar")
+    parser.add_argument('--csv', action='append', default=[],
+                        help="isim,lat,lon satırları içeren CSV dosyası (tekrarlanabilir)")
+    parser.add_argument('--quality', default=RENDER_SETTINGS['TERRAIN_QUALITY'],
+                        choices=('low', 'medium', 'high'), help="Terrain kalite seviyesi")
+    parser.add_argument('--workers', type=int, default=PRECOMPUTE_SETTINGS['WORKERS'],
+                        help="Süreç sayısı (0: CPU sayısı)")
+    parser.add_argument('--smooth', type=int, default=PRECOMPUTE_SETTINGS['SMOOTH_ITERATIONS'],
+                        help="Yumuşatma iterasyonu")
+    parser.add_argument('--checkpoint', default=PRECOMPUTE_SETTINGS['CHECKPOINT_FILE'],
+                        help="Checkpoint dosyası")
+    parser.add_argument('--restart', action='store_true', help="Checkpoint'i yok say")
+    parser.add_argument('--stats', help="Özeti JSON olarak bu dosyaya yaz")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    setup_logging()
+
+    locations = []
+    if args.all:
+        locations.extend(DEFAULT_LOCATIONS.items())
+    for path in args.csv:
+        locations.extend(load_locations_csv(path))
+    if not locations:
+        raise SystemExit("En az bir konum kaynağı verin (--all veya --csv)")
+
+    summary = precompute(locations, args.quality, args.workers or None, args.checkpoint,
+                         args.smooth, args.restart)
+    if args.stats:
+        with open(args.stats, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    print(f"{summary['locations']} konum hazırlandı, {len(summary['failed'])} başarısız "
+          f"({summary['locations_per_second']:.2f} konum/sn)")
+    return 0 if not summary['failed'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
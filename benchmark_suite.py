@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Benchmark Paketi - Veri yükleme, numpy kernel'leri, mesh ve headless render ölçümleri
+
+Ağ ölçümleri canlı OSM/Open-Elevation yerine stub_map_server ile yapılır.
+Sonuçlar JSON olarak yazılır ve kayıtlı bir baseline ile karşılaştırılır.
+
+Örnek:
+    python benchmark_suite.py --save-baseline
+    python benchmark_suite.py --only kernels --only mesh --fail-on-regression
+    python benchmark_suite.py --latency 0.1 --failure-rate 0.05
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from config import API_SETTINGS, BENCHMARK_SETTINGS
+from utils import logger, setup_logging
+
+GROUPS = ('startup', 'loader', 'kernels', 'mesh', 'headless')
+
+# Import süresi ölçülen modüller ve import sırasında yüklememeleri gereken ağır paketler
+STARTUP_IMPORTS = {
+    'main': ('OpenGL', 'numpy', 'requests', 'PIL'),
+    'utils': ('PyQt6', 'OpenGL', 'requests', 'PIL'),
+    'map_data_loader': ('PyQt6', 'OpenGL', 'requests', 'PIL'),
+    'headless_renderer': ('PyQt6', 'OpenGL'),
+    'batch_precompute': ('PyQt6', 'OpenGL'),
+    'map_widget': (),
+}
+_HEAVY_PACKAGES = ('PyQt6', 'OpenGL', 'numpy', 'requests', 'PIL')
+
+_IMPORT_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [p for p in {packages!r} if p in sys.modules]}}))
+'''
+
+# Pencerenin ilk çizimi ve 3D widget'ın hazır olması (main.main ile aynı sıra)
+_WINDOW_PROBE = '''
+import sys, time
+start = time.perf_counter()
+from PyQt6.QtWidgets import QApplication
+import main
+app = QApplication(sys.argv[:1])
+window = main.MainWindow()
+window.show()
+app.processEvents()
+print('window', time.perf_counter() - start, flush=True)
+window.init_map_widget()
+app.processEvents()
+print('ready', time.perf_counter() - start, flush=True)
+'''
+
+# Ölçümlerde kullanılan sabit konum (İstanbul)
+_LAT, _LON = 41.0082, 28.9784
+
+
+def measure(fn, repeats, setup=None):
+    """
+    fn'i repeats kez çalıştırıp süre istatistiklerini döndürür.
+    setup verilirse her tekrardan önce (ölçüm dışında) çağrılır, sonucu fn'e geçer.
+    """
+    times = []
+    for _ in range(repeats):
+        if setup is not None:
+            arg = setup()
+            start = time.perf_counter()
+            fn(arg)
+        else:
+            start = time.perf_counter()
+            fn()
+        times.append(time.perf_counter() - start)
+    return {
+        'median_s': statistics.median(times),
+        'min_s': min(times),
+        'max_s': max(times),
+        'repeats': repeats,
+    }
+
+
+def _test_grid(size):
+    """Tekrarlanabilir, gerçekçi aralıkta float32 elevation grid'i"""
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    grid = 800 * np.sin(x * 6) * np.cos(y * 5) + 400 + rng.normal(0, 10, (size, size))
+    return grid.astype(np.float32)
+
+
+# --- Gruplar ---
+
+def _run_probe(code, env=None):
+    """Kodu yeni bir Python sürecinde çalıştırır; (çıkış kodu, stdout) döndürür"""
+    completed = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+    return completed.returncode, completed.stdout
+
+
+def _summarize(times):
+    return {'median_s': statistics.median(times), 'min_s': min(times),
+            'max_s': max(times), 'repeats': len(times)}
+
+
+def bench_startup(repeats):
+    """
+    Her ölçüm yeni bir süreçte: modül import süreleri (yasak ağır paket yüklenirse
+    'violations' dolar), pencerenin ilk çizimi ve 3D widget'ın hazır olma süresi
+    """
+    results = {}
+    for module, forbidden in STARTUP_IMPORTS.items():
+        times = []
+        loaded = []
+        for _ in range(repeats):
+            code, output = _run_probe(_IMPORT_PROBE.format(module=module, packages=_HEAVY_PACKAGES))
+            if code != 0:
+                break
+            probe = json.loads(output.strip().splitlines()[-1])
+            times.append(probe['seconds'])
+            loaded = probe['loaded']
+        if not times:
+            results[f'import_{module}'] = {'skipped': f"import başarısız (çıkış kodu {code})"}
+            continue
+        result = _summarize(times)
+        result['loaded'] = loaded
+        result['violations'] = [package for package in forbidden if package in loaded]
+        results[f'import_{module}'] = result
+
+    env = dict(os.environ)
+    if not env.get('DISPLAY') and not env.get('WAYLAND_DISPLAY'):
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    marks = {'window': [], 'ready': []}
+    for _ in range(repeats):
+        _, output = _run_probe(_WINDOW_PROBE, env)
+        for line in output.splitlines():
+            name, _, value = line.partition(' ')
+            if name in marks:
+                marks[name].append(float(value))
+    for name, key in (('window', 'first_window'), ('ready', 'map_widget_ready')):
+        results[key] = _summarize(marks[name]) if marks[name] else {'skipped': "pencere açılamadı"}
+    return results
+
+
+def bench_loader(repeats, latency, failure_rate, size=50, zoom_level=14):
+    """Soğuk (boş cache) ve sıcak get_elevation_data / get_map_tiles ölçümleri"""
+    from map_data_loader import MapDataLoader
+    from stub_map_server import StubMapServer
+
+    results = {}
+    saved_settings = dict(API_SETTINGS)
+    work_dir = tempfile.mkdtemp(prefix='map_bench_')
+    loaders = []
+
+    def fresh_loader():
+        loader = MapDataLoader(cache_dir=tempfile.mkdtemp(dir=work_dir))
+        loaders.append(loader)
+        return loader
+
+    try:
+        with StubMapServer(latency=latency, failure_rate=failure_rate) as server:
+            API_SETTINGS.update(server.api_settings())
+            API_SETTINGS['RATE_LIMIT_DELAY'] = 0  # Yerel sunucuda beklemeye gerek yok
+
+            server.reset_counters()
+            results['elevation_cold'] = measure(
+                lambda loader: loader.get_elevation_data(_LAT, _LON, size), repeats, fresh_loader)
+            results['elevation_cold']['requests'] = dict(server.requests)
+            results['elevation_cold']['failures'] = server.failures
+
+            warm = fresh_loader()
+            warm.get_elevation_data(_LAT, _LON, size)
+            results['elevation_warm'] = measure(
+                lambda: warm.get_elevation_data(_LAT, _LON, size), repeats)
+            results['elevation_warm']['source'] = warm.last_elevation_source
+
+            server.reset_counters()
+            results['tiles_cold'] = measure(
+                lambda loader: loader.get_map_tiles(_LAT, _LON, zoom_level, size=size), repeats, fresh_loader)
+            results['tiles_cold']['requests'] = dict(server.requests)
+            results['tiles_cold']['failures'] = server.failures
+
+            warm.get_map_tiles(_LAT, _LON, zoom_level, size=size)
+            server.reset_counters()
+            results['tiles_warm'] = measure(
+                lambda: warm.get_map_tiles(_LAT, _LON, zoom_level, size=size), repeats)
+            results['tiles_warm']['requests'] = dict(server.requests)
+    finally:
+        API_SETTINGS.clear()
+        API_SETTINGS.update(saved_settings)
+        for loader in loaders:
+            loader.cache.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def bench_kernels(repeats, grid_size):
+    """utils'teki vektörize kernel'ler"""
+    from utils import (calculate_normals, generate_heightmap_texture, normalize_elevation_data,
+                       quantize_elevation, smooth_elevation_data)
+
+    grid = _test_grid(grid_size)
+    out = np.empty_like(grid)
+    normals = np.empty(grid.shape + (3,), dtype=np.float32)
+
+    return {
+        'normalize': measure(lambda: normalize_elevation_data(grid, out=out), repeats),
+        'smooth': measure(lambda: smooth_elevation_data(grid, 1, out=out), repeats),
+        'normals': measure(lambda: calculate_normals(grid, out=normals), repeats),
+        'heightmap_texture': measure(lambda: generate_heightmap_texture(grid), repeats),
+        'quantize': measure(lambda: quantize_elevation(grid), repeats),
+    }
+
+
+def bench_mesh(repeats, grid_size):
+    """Mesh oluşturma ve mesh cache yazma/okuma"""
+    from mesh_cache import read_mesh, write_mesh
+    from terrain_mesh import build_terrain_mesh
+
+    grid = _test_grid(grid_size)
+    mesh = build_terrain_mesh(grid, 0.1)
+    work_dir = tempfile.mkdtemp(prefix='map_bench_')
+    path = os.path.join(work_dir, 'mesh.bin')
+
+    def load_mesh():
+        loaded = read_mesh(path)
+        # memmap tembeldir; sayfaları gerçekten okumak için bir geçiş yap
+        int(loaded.indices[::1024].sum())
+
+    try:
+        results = {
+            'build': measure(lambda: build_terrain_mesh(grid, 0.1), repeats),
+            'cache_write': measure(lambda: write_mesh(path, mesh), repeats),
+            'cache_load': measure(load_mesh, repeats),
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    results['build']['triangles'] = mesh.triangle_count
+    return results
+
+
+def bench_headless(repeats, grid_size):
+    """Offscreen render; GL context oluşturulamıyorsa atlanır"""
+    if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    try:
+        from PyQt6.QtWidgets import QApplication
+        from headless_renderer import HeadlessRenderer
+        QApplication.instance() or QApplication(sys.argv[:1])
+        renderer = HeadlessRenderer()
+    except Exception as e:
+        return {'render': {'skipped': str(e)}}
+
+    grid = _test_grid(grid_size)
+    try:
+        renderer.render(grid)  # İlk çizim: mesh ve GL kaynakları
+        results = {
+            'render': measure(lambda: renderer.render(grid), repeats),
+            'first_frame': measure(lambda g: renderer.render(g), 1, lambda: grid + 1.0),
+        }
+    finally:
+        renderer.cleanup()
+    return results
+
+
+def _run_isolated(group, repeats, grid_size):
+    """
+    Grubu ayrı bir süreçte çalıştırır. GL sürücüsü context oluştururken
+    çökebildiğinden (ör. ekransız sunucular) headless ölçümü paketi düşürmemelidir.
+    """
+    fd, out_path = tempfile.mkstemp(suffix='.json', prefix='map_bench_')
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), '--only', group, '--in-process',
+               '--repeats', str(repeats), '--grid', str(grid_size), '--out', out_path,
+               '--baseline', '']
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True)
+        if completed.returncode != 0:
+            return {'render': {'skipped': f"alt süreç {completed.returncode} koduyla sonlandı"}}
+        with open(out_path, 'r', encoding='utf-8') as f:
+            results = json.load(f)['results']
+    finally:
+        os.remove(out_path)
+    prefix = f"{group}."
+    return {name[len(prefix):]: result for name, result in results.items()}
+
+
+def run_benchmarks(groups=GROUPS, repeats=None, grid_size=None, latency=None, failure_rate=None,
+                   isolate=True):
+    """Seçilen grupları çalıştırıp {'meta': ..., 'results': {'grup.isim': ölçüm}} döndürür"""
+    repeats = repeats or BENCHMARK_SETTINGS['REPEATS']
+    grid_size = grid_size or BENCHMARK_SETTINGS['GRID_SIZE']
+    latency = BENCHMARK_SETTINGS['STUB_LATENCY'] if latency is None else latency
+    failure_rate = BENCHMARK_SETTINGS['STUB_FAILURE_RATE'] if failure_rate is None else failure_rate
+
+    runners = {
+        'startup': lambda: bench_startup(repeats),
+        'loader': lambda: bench_loader(repeats, latency, failure_rate),
+        'kernels': lambda: bench_kernels(repeats, grid_size),
+        'mesh': lambda: bench_mesh(repeats, grid_size),
+        'headless': ((lambda: _run_isolated('headless', repeats, grid_size)) if isolate
+                     else (lambda: bench_headless(repeats, grid_size))),
+    }
+
+    results = {}
+    for group in groups:
+        logger.info(f"Benchmark: {group}")
+        for name, result in runners[group]().items():
+            results[f"{group}.{name}"] = result
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'grid_size': grid_size,
+            'stub_latency': latency,
+            'stub_failure_rate': failure_rate,
+        },
+        'results': results,
+    }
+
+
+def compare_results(current, baseline, tolerance=None):
+    """
+    Ortak ölçümlerin medyanlarını karşılaştırır.
+    (isim, baseline_s, şimdiki_s, oran, durum) listesi döndürür; durum
+    'regression', 'improved' veya 'ok'.
+    """
+    tolerance = BENCHMARK_SETTINGS['TOLERANCE'] if tolerance is None else tolerance
+    rows = []
+    for name, result in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or 'median_s' not in base or 'median_s' not in result:
+            continue
+        ratio = result['median_s'] / base['median_s'] if base['median_s'] > 0 else 1.0
+        if ratio > 1 + tolerance:
+            status = 'regression'
+        elif ratio < 1 - tolerance:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append((name, base['median_s'], result['median_s'], ratio, status))
+    return rows
+
+
+def _format_results(report):
+    lines = []
+    for name, result in report['results'].items():
+        if 'skipped' in result:
+            lines.append(f"  {name:36s} atlandı: {result['skipped']}")
+        else:
+            lines.append(f"  {name:36s} medyan {result['median_s'] * 1000:10.3f} ms  "
+                         f"min {result['min_s'] * 1000:10.3f} ms")
+    return lines
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Tekrarlanabilir performans ölçümleri")
+    parser.add_argument('--only', action='append', choices=GROUPS, default=[],
+                        help="Yalnızca bu grubu çalıştır (tekrarlanabilir)")
+    parser.add_argument('--repeats', type=int, default=BENCHMARK_SETTINGS['REPEATS'])
+    parser.add_argument('--grid', type=int, default=BENCHMARK_SETTINGS['GRID_SIZE'],
+                        help="Kernel/mesh grid boyutu")
+    parser.add_argument('--latency', type=float, default=BENCHMARK_SETTINGS['STUB_LATENCY'],
+                        help="Test sunucusu gecikmesi (sn)")
+    parser.add_argument('--failure-rate', type=float, default=BENCHMARK_SETTINGS['STUB_FAILURE_RATE'],
+                        help="Test sunucusu hata oranı (0-1)")
+    parser.add_argument('--out', default=BENCHMARK_SETTINGS['RESULTS_FILE'], help="Sonuç JSON dosyası")
+    parser.add_argument('--baseline', default=BENCHMARK_SETTINGS['BASELINE_FILE'],
+                        help="Karşılaştırılacak baseline JSON dosyası")
+    parser.add_argument('--save-baseline', action='store_true', help="Sonuçları baseline olarak kaydet")
+    parser.add_argument('--tolerance', type=float, default=BENCHMARK_SETTINGS['TOLERANCE'])
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="Gerileme varsa sıfırdan farklı çıkış kodu döndür")
+    parser.add_argument('--in-process', action='store_true', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    setup_logging()
+
+    report = run_benchmarks(args.only or GROUPS, args.repeats, args.grid,
+                            args.latency, args.failure_rate, isolate=not args.in_process)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Sonuçlar -> {args.out}")
+    for line in _format_results(report):
+        print(line)
+
+    regressions = []
+    for name, result in report['results'].items():
+        if result.get('violations'):
+            print(f"  {name}: import sırasında yüklenmemesi gereken paketler: "
+                  f"{', '.join(result['violations'])}")
+            regressions.append(name)
+
+    if args.baseline and os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Baseline karşılaştırması ({args.baseline}, tolerans %{args.tolerance * 100:.0f}):")
+        for name, base_s, current_s, ratio, status in compare_results(report, baseline, args.tolerance):
+            print(f"  {name:36s} {base_s * 1000:10.3f} -> {current_s * 1000:10.3f} ms  "
+                  f"x{ratio:5.2f}  {status}")
+            if status == 'regression':
+                regressions.append(name)
+
+    if args.save_baseline:
+        shutil.copyfile(args.out, args.baseline)
+        print(f"Baseline kaydedildi -> {args.baseline}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
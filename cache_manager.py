@@ -0,0 +1,364 @@
+"""
+Cache Yöneticisi - İndeksli, boyut sınırlı disk cache'i (LRU/TTL temizleme)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from config import APP_SETTINGS, CACHE_SETTINGS
+from utils import logger
+
+
+class CacheManager:
+    """
+    Tile ve elevation cache'lerinin ortak disk cache'i.
+
+    İndirilen veri ve hesaplanan dosyalar (ARTIFACT_PREFIXES: mesh, ışık
+    haritası, kontur) ayrı bütçelerle sınırlanır; biri dolunca diğerinden
+    silinmez. Her dosya için boyut, oluşturulma ve son erişim zamanı bellekteki bir
+    LRU indeksinde tutulur ve periyodik olarak dizindeki JSON dosyasına
+    yazılır; politika uygulamak için dizini taramak gerekmez. Bütçe aşıldığında
+    veya TTL dolduğunda silme işlemi arka plan thread'inde küçük partiler
+    halinde yapılır; lookup/store yalnızca indeks kilidini kısa süre tutar.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=None, max_age_seconds=None, artifact_max_bytes=None):
+        self.cache_dir = cache_dir or APP_SETTINGS['CACHE_DIR']
+        self.max_bytes = max_bytes if max_bytes is not None else CACHE_SETTINGS['MAX_SIZE_MB'] * 1024 * 1024
+        if artifact_max_bytes is None:
+            artifact_max_bytes = CACHE_SETTINGS['ARTIFACT_MAX_SIZE_MB'] * 1024 * 1024
+        self.artifact_max_bytes = artifact_max_bytes
+        if max_age_seconds is None:
+            max_age_seconds = CACHE_SETTINGS['MAX_AGE_DAYS'] * 86400
+        self.max_age_seconds = max_age_seconds
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, CACHE_SETTINGS['INDEX_FILE'])
+
+        # key -> [size, created, last_access]; sıra LRU sırasıdır (en eski başta)
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._artifact_bytes = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._index_ready = False
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+
+        self._load_index()
+
+    # --- Dosya erişimi ---
+
+    @staticmethod
+    def is_artifact(key):
+        """Anahtar hesaplanan bir dosyaya mı (mesh, ışık haritası, kontur) ait"""
+        return key.startswith(CACHE_SETTINGS['ARTIFACT_PREFIXES'])
+
+    def _add_bytes(self, key, size):
+        """Toplamları günceller (kilit tutulurken çağrılır)"""
+        self._total_bytes += size
+        if self.is_artifact(key):
+            self._artifact_bytes += size
+
+    def _over_budget(self):
+        """Bütçesini aşan havuzların fazlası: {artifact: bool -> bayt} (kilit tutulurken)"""
+        excess = {}
+        data_bytes = self._total_bytes - self._artifact_bytes
+        if data_bytes > self.max_bytes:
+            excess[False] = data_bytes - self.max_bytes
+        if self._artifact_bytes > self.artifact_max_bytes:
+            excess[True] = self._artifact_bytes - self.artifact_max_bytes
+        return excess
+
+    def path_for(self, key):
+        """Cache anahtarının disk yolunu döndürür"""
+        return os.path.join(self.cache_dir, key)
+
+    def lookup(self, key):
+        """Anahtar cache'te varsa yolunu döndürür ve erişimi kaydeder, yoksa None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = now
+                self._entries.move_to_end(key)
+                self._dirty = True
+                self.hits += 1
+                return self.path_for(key)
+
+        # İndeks henüz yeniden oluşturulmadıysa diske bak
+        path = self.path_for(key)
+        if not self._index_ready and os.path.exists(path):
+            self.record(key)
+            with self._lock:
+                self.hits += 1
+            return path
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def record(self, key):
+        """Diske yazılmış bir dosyayı indekse ekler"""
+        try:
+            stat = os.stat(self.path_for(key))
+        except OSError:
+            return
+
+        now = time.time()
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._add_bytes(key, -old[0])
+            self._entries[key] = [stat.st_size, stat.st_mtime, now]
+            self._add_bytes(key, stat.st_size)
+            self._dirty = True
+            over_budget = bool(self._over_budget())
+
+        self._ensure_worker()
+        if over_budget:
+            self._wakeup.set()
+
+    def store_bytes(self, key, data):
+        """Veriyi atomik olarak cache'e yazar ve indekse ekler"""
+        path = self.path_for(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.record(key)
+        return path
+
+    def invalidate(self, key):
+        """Bozuk veya geçersiz bir girdiyi siler"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._add_bytes(key, -entry[0])
+                self._dirty = True
+        try:
+            os.remove(self.path_for(key))
+        except OSError:
+            pass
+
+    # --- Temizleme ---
+
+    def evict_step(self, batch_size=None):
+        """
+        Bütçe ve TTL'e göre en fazla batch_size girdiyi siler, silinen sayıyı döndürür.
+        LRU silme yalnızca bütçesini aşan havuzdan (veri veya hesaplanan) yapılır.
+        Kilit yalnızca indeksten çıkarma sırasında tutulur, dosya silme kilitsizdir.
+        """
+        batch_size = batch_size or CACHE_SETTINGS['EVICTION_BATCH']
+        victims = []
+        now = time.time()
+
+        with self._lock:
+            # TTL: oluşturulma zamanı eski olanlar
+            if self.max_age_seconds:
+                cutoff = now - self.max_age_seconds
+                for key, entry in self._entries.items():
+                    if len(victims) >= batch_size:
+                        break
+                    if entry[1] < cutoff:
+                        victims.append(key)
+                for key in victims:
+                    self._add_bytes(key, -self._entries.pop(key)[0])
+
+            # LRU: havuz bütçe altına inene kadar o havuzun en eski erişilenleri
+            excess = self._over_budget()
+            lru_victims = []
+            for key, entry in self._entries.items():
+                if len(victims) + len(lru_victims) >= batch_size or not excess:
+                    break
+                artifact = self.is_artifact(key)
+                if artifact in excess:
+                    lru_victims.append(key)
+                    excess[artifact] -= entry[0]
+                    if excess[artifact] <= 0:
+                        del excess[artifact]
+            for key in lru_victims:
+                self._add_bytes(key, -self._entries.pop(key)[0])
+            victims.extend(lru_victims)
+
+            if victims:
+                self._dirty = True
+                self.evictions += len(victims)
+
+        for key in victims:
+            try:
+                os.remove(self.path_for(key))
+            except OSError:
+                pass
+
+        return len(victims)
+
+    def evict_expired(self, max_age_seconds):
+        """Belirtilen yaştan eski tüm girdileri siler (senkron)"""
+        previous = self.max_age_seconds
+        self.max_age_seconds = max_age_seconds
+        try:
+            removed = 0
+            while True:
+                count = self.evict_step()
+                removed += count
+                if count == 0:
+                    break
+        finally:
+            self.max_age_seconds = previous
+        self.flush()
+        return removed
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run_worker, name='cache-evictor', daemon=True)
+            self._worker.start()
+
+    def _run_worker(self):
+        """Arka planda artımlı temizleme ve indeks kaydı"""
+        interval = CACHE_SETTINGS['EVICTION_INTERVAL']
+        while not self._stop.is_set():
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+
+            # Partiler arasında kilidi bırakarak bütçe altına in
+            while not self._stop.is_set() and self.evict_step():
+                time.sleep(0)
+
+            self.flush()
+
+    def stop(self):
+        """Arka plan thread'ini durdurur ve indeksi kaydeder"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+            self._worker = None
+        self.flush()
+
+    # --- İndeks kalıcılığı ---
+
+    def _load_index(self):
+        """Kayıtlı indeksi yükler; yoksa dizini arka planda tarar"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            entries = sorted(data.get('entries', {}).items(), key=lambda item: item[1][2])
+            for key, entry in entries:
+                self._entries[key] = entry
+                self._add_bytes(key, entry[0])
+            self._index_ready = True
+        except (OSError, ValueError, KeyError, IndexError):
+            threading.Thread(target=self._rebuild_index, name='cache-index', daemon=True).start()
+
+    def _rebuild_index(self):
+        """İndeks dosyası yoksa mevcut cache dosyalarından indeksi oluşturur"""
+        index_name = os.path.basename(self.index_path)
+        found = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for item in it:
+                    if item.is_file() and item.name != index_name and not item.name.endswith('.tmp'):
+                        stat = item.stat()
+                        found.append((item.name, [stat.st_size, stat.st_mtime, stat.st_atime]))
+        except OSError as e:
+            logger.warning(f"Cache dizini taranamadı: {e}")
+
+        found.sort(key=lambda item: item[1][2])
+        with self._lock:
+            for key, entry in found:
+                if key not in self._entries:
+                    self._entries[key] = entry
+                    self._entries.move_to_end(key, last=False)
+                    self._add_bytes(key, entry[0])
+            self._index_ready = True
+            self._dirty = True
+
+        self._ensure_worker()
+        self._wakeup.set()
+
+    def refresh_index(self):
+        """
+        Başka süreçlerin yazdığı dosyaları indekse katar (senkron dizin taraması).
+        Çok süreçli toplu işlerden sonra ana süreçte çağrılır.
+        """
+        self._rebuild_index()
+        self.flush()
+
+    def flush(self):
+        """İndeksi (değiştiyse) diske atomik olarak yazar"""
+        if not _persist_index:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {'entries': dict(self._entries)}
+            self._dirty = False
+
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Cache indeksi kaydedilemedi: {e}")
+
+    # --- Raporlama ---
+
+    def stats(self):
+        """Doluluk ve isabet oranlarını döndürür"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            data_bytes = self._total_bytes - self._artifact_bytes
+            return {
+                'entries': len(self._entries),
+                'bytes': data_bytes,
+                'max_bytes': self.max_bytes,
+                'occupancy': data_bytes / self.max_bytes if self.max_bytes else 0.0,
+                'artifact_bytes': self._artifact_bytes,
+                'artifact_max_bytes': self.artifact_max_bytes,
+                'artifact_occupancy': (self._artifact_bytes / self.artifact_max_bytes
+                                       if self.artifact_max_bytes else 0.0),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+            }
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+_persist_index = True
+
+
+def set_index_persistence(enabled):
+    """
+    İndeks dosyasının yazılmasını açar/kapatır. Worker süreçlerinde kapatılır;
+    böylece yalnızca ana süreç indeksi yazar, o da refresh_index ile yeni dosyaları toplar.
+    """
+    global _persist_index
+    _persist_index = enabled
+
+
+def get_cache_manager(cache_dir=None):
+    """Dizin başına tek bir CacheManager döndürür (tile ve elevation cache'i paylaşır)"""
+    cache_dir = os.path.abspath(cache_dir or APP_SETTINGS['CACHE_DIR'])
+    with _managers_lock:
+        manager = _managers.get(cache_dir)
+        if manager is None:
+            manager = CacheManager(cache_dir)
+            _managers[cache_dir] = manager
+        return manager
@@ -0,0 +1,323 @@
+"""
+Kamera Uçuşu - Anahtar kare yolu boyunca sabit adımlı kamera animasyonu ve
+yolun önündeki arazi karolarının tahmine dayalı önceden yüklenmesi
+"""
+
+import json
+import time
+
+import numpy as np
+
+import geo_math
+from config import CAMERA_PRESETS, FLIGHT_SETTINGS
+from utils import logger
+
+CAMERA_KEYS = ('target_x', 'target_y', 'distance', 'rotation_x', 'rotation_y')
+
+
+def load_flight_keyframes(path):
+    """
+    Uçuş dosyasını okur. İki biçim desteklenir:
+
+    {"keyframes": [{"t": 0, "lat": 41.0, "lon": 29.0, "distance": 8, ...}, ...]}
+    {"route": [[41.0, 29.0], [41.2, 29.3], ...], "speed_kmh": 300, "distance": 8}
+
+    Anahtar karelerde lat/lon yerine target_x/target_y (dünya birimi) de verilebilir.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if 'keyframes' in data:
+        return data['keyframes']
+    if 'route' in data:
+        return route_keyframes(data['route'], data.get('speed_kmh'), data.get('camera'))
+    raise ValueError("Uçuş dosyasında 'keyframes' veya 'route' bulunamadı")
+
+
+def route_keyframes(points, speed_kmh=None, camera=None):
+    """(lat, lon) rota noktalarından sabit hızlı anahtar kareler"""
+    speed_kmh = speed_kmh or FLIGHT_SETTINGS['DEFAULT_SPEED_KMH']
+    camera = dict(CAMERA_PRESETS['default'], **(camera or {}))
+
+    lats = [p[0] for p in points]
+    lons = [p[1] for p in points]
+    distances = np.concatenate(([0.0], np.cumsum(geo_math.path_lengths(lats, lons))))
+    times = distances / speed_kmh * 3600.0
+
+    return [dict(camera, t=float(t), lat=lat, lon=lon) for t, lat, lon in zip(times, lats, lons)]
+
+
+class FlightPath:
+    """
+    Zamana göre sıralı anahtar kareler arasında kamera enterpolasyonu.
+
+    Hedef noktası kübik Hermite (sonlu fark tanjantlı) eğrisiyle, uzaklık ve
+    açılar doğrusal olarak enterpole edilir. lat/lon içeren anahtar kareler
+    için dünya koordinatlarına çeviren bir grid (ChunkGrid) gerekir.
+    """
+
+    def __init__(self, keyframes, grid=None):
+        if len(keyframes) < 2:
+            raise ValueError("Uçuş yolu için en az iki anahtar kare gerekir")
+
+        defaults = CAMERA_PRESETS['default']
+        frames = sorted(keyframes, key=lambda k: k['t'])
+        rows = []
+        for frame in frames:
+            if 'lat' in frame:
+                if grid is None:
+                    raise ValueError("lat/lon anahtar kareleri için akış grid'i gerekir")
+                x, y = grid.lat_lon_to_world(frame['lat'], frame['lon'])
+            else:
+                x, y = frame.get('target_x', 0.0), frame.get('target_y', 0.0)
+            rows.append((x, y,
+                         frame.get('distance', defaults['distance']),
+                         frame.get('rotation_x', defaults['rotation_x']),
+                         frame.get('rotation_y', defaults['rotation_y'])))
+
+        self.times = np.array([frame['t'] for frame in frames], dtype=np.float64)
+        self.values = np.array(rows, dtype=np.float64)
+
+        # Hedef için sonlu fark tanjantları (birim: dünya birimi / sn)
+        targets = self.values[:, :2]
+        tangents = np.zeros_like(targets)
+        dt = np.maximum(self.times[2:] - self.times[:-2], 1e-9)
+        tangents[1:-1] = (targets[2:] - targets[:-2]) / dt[:, np.newaxis]
+        self.tangents = tangents
+
+    @property
+    def duration(self):
+        return float(self.times[-1] - self.times[0])
+
+    def sample(self, t):
+        """Yolun başından t saniye sonraki kamera: CAMERA_KEYS sözlüğü"""
+        t = min(max(t + self.times[0], self.times[0]), self.times[-1])
+        k = int(np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, len(self.times) - 2))
+        t0, t1 = self.times[k], self.times[k + 1]
+        h = max(t1 - t0, 1e-9)
+        u = (t - t0) / h
+
+        values = self.values[k] + (self.values[k + 1] - self.values[k]) * u
+
+        h00 = 2 * u ** 3 - 3 * u ** 2 + 1
+        h10 = u ** 3 - 2 * u ** 2 + u
+        h01 = -2 * u ** 3 + 3 * u ** 2
+        h11 = u ** 3 - u ** 2
+        values[:2] = (h00 * self.values[k, :2] + h10 * h * self.tangents[k] +
+                      h01 * self.values[k + 1, :2] + h11 * h * self.tangents[k + 1])
+
+        return dict(zip(CAMERA_KEYS, (float(v) for v in values)))
+
+
+class FlightPrefetcher:
+    """
+    Yolu kameranın önünde yürüyerek gerekecek karoları ve ilk gerekecekleri
+    zamanı çıkarır; ihtiyaç zamanı önceden yükleme penceresine girenleri
+    TerrainStreamer.set_prefetch ile ister.
+
+    Pencere ölçülen karo yükleme süresinden türetilir: bekleyen istekler
+    worker'lara paylaştırıldığında son isteğin de zamanında gelmesi için
+    (bekleyen / worker + 1) * yükleme süresi * LEAD_SAFETY.
+
+    Ölçümler (duvar saati): öncelik süresi = ihtiyaç anı - hazır olma anı
+    (pozitif: önceden geldi); ıska = karo görünür olduğunda GPU'da değildi.
+    """
+
+    def __init__(self, path, streamer, sample_step=None):
+        self.path = path
+        self.streamer = streamer
+
+        # Yol boyunca her karonun ilk görünür olacağı zaman
+        step = sample_step or FLIGHT_SETTINGS['SAMPLE_STEP_S']
+        first_needed = {}
+        for t in np.arange(0.0, path.duration + step, step):
+            camera = path.sample(t)
+            for key in streamer.grid.chunks_around(camera['target_x'], camera['target_y'],
+                                                   streamer.view_radius):
+                first_needed.setdefault(key, float(t))
+        self.schedule = sorted(first_needed.items(), key=lambda item: item[1])
+
+        self._next = 0  # schedule'da henüz istenmemiş ilk karo
+        self.requested = {}  # key -> (ihtiyaç zamanı, istek anı)
+        self.ready_at = {}  # key -> hazır olma anı
+        self.needed_at = {}  # key -> görünür olduğu an
+        self.misses = []
+        self.stall_frames = 0
+        self.frames = 0
+
+    def lookahead(self):
+        """Önceden yükleme penceresi (oynatma saniyesi)"""
+        load_seconds = self.streamer.load_seconds
+        if load_seconds is None:
+            return FLIGHT_SETTINGS['MIN_LOOKAHEAD_S']
+        pending = sum(1 for key in self.requested if key not in self.ready_at)
+        window = (pending / self.streamer.workers + 1) * load_seconds * FLIGHT_SETTINGS['LEAD_SAFETY']
+        return min(max(window, FLIGHT_SETTINGS['MIN_LOOKAHEAD_S']), FLIGHT_SETTINGS['MAX_LOOKAHEAD_S'])
+
+    def update(self, t):
+        """Oynatma zamanı t için yeni istekleri verir ve streamer'ın önceden yükleme listesini yeniler"""
+        now = time.perf_counter()
+        horizon = t + self.lookahead()
+        while self._next < len(self.schedule) and self.schedule[self._next][1] <= horizon:
+            key, needed_t = self.schedule[self._next]
+            self.requested[key] = (needed_t, now)
+            self._next += 1
+
+        for key in self.requested:
+            if key not in self.ready_at:
+                chunk = self.streamer.cpu_resident.get(key)
+                if chunk is not None:
+                    self.ready_at[key] = chunk.ready_time
+
+        # Henüz görünür olmamış istekler, en erken gerekecek önce
+        upcoming = sorted((needed_t, key) for key, (needed_t, _) in self.requested.items()
+                          if key not in self.needed_at)
+        self.streamer.set_prefetch([key for _, key in upcoming])
+
+    def initial_ready(self):
+        """Yolun başında görünecek karoların hepsi GPU'da mı"""
+        return all(key in self.streamer.gpu_resident
+                   for key, needed_t in self.schedule if needed_t == 0.0)
+
+    def observe_frame(self):
+        """Çizimden sonra çağrılır: görünür karoların GPU'da olup olmadığını kaydeder"""
+        now = time.perf_counter()
+        self.frames += 1
+        stalled = False
+        for key in self.streamer.visible:
+            resident = key in self.streamer.gpu_resident
+            stalled = stalled or not resident
+            if key in self.needed_at:
+                continue
+            self.needed_at[key] = now
+            if not resident:
+                self.misses.append(key)
+        if stalled:
+            self.stall_frames += 1
+
+    def metrics(self):
+        """Öncelik süreleri (sn), ıska ve takılan frame sayıları"""
+        # Iskalanan ama sonradan gelen karoların gecikmesi de dahil (negatif)
+        for key in self.misses:
+            if key not in self.ready_at:
+                chunk = self.streamer.cpu_resident.get(key)
+                if chunk is not None:
+                    self.ready_at[key] = chunk.ready_time
+        leads = [self.needed_at[key] - self.ready_at[key]
+                 for key in self.needed_at if key in self.ready_at]
+
+        result = {
+            'chunks': len(self.schedule),
+            'requested': len(self.requested),
+            'needed': len(self.needed_at),
+            'misses': len(self.misses),
+            'frames': self.frames,
+            'stall_frames': self.stall_frames,
+            'lookahead_s': self.lookahead(),
+        }
+        fetches = [self.ready_at[key] - requested_at
+                   for key, (_, requested_at) in self.requested.items() if key in self.ready_at]
+        if fetches:
+            result['fetch_mean_s'] = float(np.mean(fetches))
+        if leads:
+            leads = np.array(leads)
+            result.update(lead_min_s=float(leads.min()), lead_mean_s=float(leads.mean()),
+                          lead_p10_s=float(np.percentile(leads, 10)))
+        return result
+
+
+class FlightPlayer:
+    """
+    Uçuş yolunu sabit zaman adımıyla oynatır.
+
+    REALTIME açıkken geçen duvar saati TIMESTEP adımlarına bölünür (geciken
+    frame'lerde en fazla MAX_CATCHUP_STEPS); kapalıyken her frame tam bir
+    adım ilerler, böylece kaydedilen video frame'leri arasındaki süre sabittir.
+
+    Önceden yükleyici varsa saat, başlangıç karoları GPU'ya gelene kadar
+    (en fazla PREROLL_TIMEOUT_S) başlamaz.
+    """
+
+    def __init__(self, path, prefetcher=None, timestep=None, realtime=None):
+        self.path = path
+        self.prefetcher = prefetcher
+        self.timestep = timestep or FLIGHT_SETTINGS['TIMESTEP']
+        self.realtime = FLIGHT_SETTINGS['REALTIME'] if realtime is None else realtime
+
+        self.time = 0.0
+        self.paused = False
+        self.dropped_steps = 0  # Telafi sınırı yüzünden atlanan adımlar
+        self._accumulator = 0.0
+        self._last_wall = None
+        self._preroll_until = None
+        self._prerolled = prefetcher is None
+
+    @property
+    def finished(self):
+        return self.time >= self.path.duration
+
+    @property
+    def prerolling(self):
+        return not self._prerolled
+
+    def set_paused(self, paused):
+        self.paused = paused
+        self._last_wall = None
+
+    def advance(self, now=None):
+        """Bir frame ilerletir; kamera sözlüğünü döndürür"""
+        now = time.perf_counter() if now is None else now
+        steps = 0
+        if not self._prerolled and not self.paused:
+            if self._preroll_until is None:
+                self._preroll_until = now + FLIGHT_SETTINGS['PREROLL_TIMEOUT_S']
+            if self.prefetcher.initial_ready() or now >= self._preroll_until:
+                self._preroll_until = None
+                self._prerolled = True
+            else:
+                self.prefetcher.update(0.0)
+                return self.path.sample(0.0)
+
+        if not self.paused:
+            if not self.realtime:
+                steps = 1
+            elif self._last_wall is not None:
+                self._accumulator += now - self._last_wall
+                steps = int(self._accumulator / self.timestep)
+                self._accumulator -= steps * self.timestep
+                if steps > FLIGHT_SETTINGS['MAX_CATCHUP_STEPS']:
+                    self.dropped_steps += steps - FLIGHT_SETTINGS['MAX_CATCHUP_STEPS']
+                    steps = FLIGHT_SETTINGS['MAX_CATCHUP_STEPS']
+            self._last_wall = now
+
+        self.time = min(self.time + steps * self.timestep, self.path.duration)
+        if self.prefetcher is not None:
+            self.prefetcher.update(self.time)
+        return self.path.sample(self.time)
+
+    def observe_frame(self):
+        """Çizimden sonra çağrılır; ön yükleme sırasında ölçüm yapılmaz"""
+        if self.prefetcher is not None and not self.prerolling:
+            self.prefetcher.observe_frame()
+
+    def metrics(self):
+        result = {'time_s': self.time, 'duration_s': self.path.duration,
+                  'dropped_steps': self.dropped_steps}
+        if self.prefetcher is not None:
+            result.update(self.prefetcher.metrics())
+        return result
+
+    def format_summary(self):
+        """Performans overlay'i için kısa metin"""
+        m = self.metrics()
+        line = f"Uçuş: {m['time_s']:.1f}/{m['duration_s']:.1f} sn"
+        if self.prefetcher is not None:
+            line += f"  ıska {m['misses']}/{m['needed']}  pencere {m['lookahead_s']:.1f} sn"
+            if 'lead_min_s' in m:
+                line += f"  öncelik min {m['lead_min_s']:.1f} sn"
+        return line
+
+    def log_metrics(self):
+        m = self.metrics()
+        logger.info("Uçuş tamamlandı: " + ", ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in m.items()))
@@ -2,11 +2,15 @@
 3D Harita Görüntüleyici - Konfigürasyon Dosyası
 """
 
-# API Ayarları
+import os
+
+# API Ayarları (uç noktalar ortam değişkenleriyle değiştirilebilir, örn. yerel test sunucusu)
 API_SETTINGS = {
-    'ELEVATION_API_URL': 'https://api.open-elevation.com/api/v1/lookup',
-    'OSM_TILE_URL': 'https://tile.openstreetmap.org/{z}/{x}/{y}.png',
+    'ELEVATION_API_URL': os.environ.get('MAP_ELEVATION_API_URL',
+                                        'https://api.open-elevation.com/api/v1/lookup'),
+    'OSM_TILE_URL': os.environ.get('MAP_TILE_URL', 'https://tile.openstreetmap.org/{z}/{x}/{y}.png'),
     'REQUEST_TIMEOUT': 30,
+    'TILE_TIMEOUT': 10,
     'MAX_RETRIES': 3,
     'BATCH_SIZE': 100,  # Elevation API için batch boyutu
     'RATE_LIMIT_DELAY': 0.1,  # Saniye cinsinden
@@ -24,7 +28,79 @@ RENDER_SETTINGS = {
     'DEFAULT_TERRAIN_SIZE': 50,  # Grid boyutu
     'HEIGHT_SCALE': 0.1,  # Yükseklik çarpanı
     'TILE_CACHE_SIZE': 100,  # MB cinsinden
+    'MAX_TILE_GRID': 4,  # Arazi texture'ı için eksen başına en fazla tile; zoom buna göre düşürülür
     'TERRAIN_QUALITY': 'medium',  # low, medium, high
+    'LOD_PIXELS_PER_SAMPLE': 2.0,  # Piramit varken ekranda örnek başına hedef piksel
+}
+
+# Uyarlanabilir Kalite Ayarları
+QUALITY_SETTINGS = {
+    'ADAPTIVE': True,  # Kapalıysa TERRAIN_QUALITY kademesi sabit kalır
+    'LOAD_BUDGET_S': 3.0,  # Bir konumun yüklenmesi için hedef süre
+    'IDLE_DELAY_MS': 250,  # Son etkileşimden sonra tam detaya dönme gecikmesi
+    'INTERACTION_LOD_BIAS': 2.0,  # Etkileşim sırasında en az bu kadar kaba LOD
+    'MAX_LOD_BIAS': 8.0,
+    'SETTLE_FRAMES': 5,  # Kararlar arasında beklenen frame sayısı
+    'SMOOTHING': 0.2,  # Ölçümlerin üstel ortalama katsayısı
+    'SIZE_STEP': 10,  # Enterpolasyonla seçilen grid boyutu bu adıma yuvarlanır (cache isabeti için)
+    # API'den ölçüm yokken örnek başına elevation maliyeti (sn); RATE_LIMIT_DELAY / BATCH_SIZE alt sınırı
+    'ELEVATION_COST_PRIOR_S': 0.001,
+}
+
+# Akışlı Arazi (kamera hedefi çevresinde karo karo yükleme)
+STREAMING_SETTINGS = {
+    'CHUNK_SIZE': 50,  # Karo başına elevation grid boyutu
+    'TILE_ZOOM': 0,  # 0: karoyu kaplayan en yüksek zoom otomatik seçilir
+    'VIEW_RADIUS': 1,  # Çizilen karo halkası (1: 3x3)
+    'PREFETCH_RADIUS': 2,  # Önceden yüklenen halka (2: 5x5)
+    'WORKERS': 2,  # Arka plan yükleme thread'i sayısı
+    'MAX_CPU_CHUNKS': 49,  # Bellekte tutulan en fazla karo (mesh + görüntü)
+    'MAX_GPU_CHUNKS': 25,  # GPU'da tutulan en fazla karo (buffer + texture)
+    'UPLOADS_PER_FRAME': 1,  # Frame başına GPU'ya aktarılan karo sayısı
+}
+
+# Işık Haritası (önceden hesaplanmış hillshade + ortam kapatması)
+LIGHTMAP_SETTINGS = {
+    'ENABLED': True,  # Kapalıysa fixed-function GL_LIGHT0 aydınlatması kullanılır
+    'LIGHT_DIRECTION': (1.0, 1.0, 1.0),  # Yüzeyden ışığa yön (GL_LIGHT0 ile aynı)
+    'AMBIENT': 0.3,
+    'DIFFUSE': 0.8,
+    'AO_DIRECTIONS': 8,  # Ufuk aranan yön sayısı
+    'AO_RADIUS': 16,  # Örnek cinsinden en uzak ufuk mesafesi
+    'AO_STEPS': 6,  # Yön başına geometrik aralıklı adım sayısı
+}
+
+# Eş Yükselti Eğrileri (yalnızca tek parça yüklenen terrain için)
+CONTOUR_SETTINGS = {
+    'INTERVAL': 0,  # Metre cinsinden aralık; 0 kapalı
+    'INTERVAL_CHOICES': (10, 20, 50, 100, 250),  # Arayüzdeki seçenekler
+    'MAX_LEVELS': 200,  # Aşılırsa aralık katlarına çıkılır
+    'COLOR': (0.25, 0.15, 0.05),
+    'LINE_WIDTH': 1.0,
+    'Z_OFFSET': 0.003,  # Çizgilerin yüzeyin içinde kalmaması için dünya birimi
+}
+
+# Arazi Dışa Aktarma (glTF/OBJ/STL)
+EXPORT_SETTINGS = {
+    'FORMAT': 'glb',  # Uzantıdan anlaşılamazsa: glb, obj veya stl
+    'UNITS': 'meters',  # 'meters' gerçek ölçek, 'scene' görüntüleyicideki ölçek
+    'VERTICAL_EXAGGERATION': 1.0,  # 'meters' biriminde yükseklik çarpanı
+    'STEP': 1,  # Basitleştirme: her n'inci örnek alınır
+    'TILE_SIZE': 0,  # Tile başına kenar örnek sayısı (0: tek dosya)
+    'BAND_VERTICES': 1_000_000,  # Tek seferde bellekte tutulan vertex sayısı
+}
+
+# Elevation Veri Tipi
+ELEVATION_SETTINGS = {
+    'DTYPE': 'float32',  # Bellekte kullanılan tip (float32 veya float64)
+    'CACHE_ENCODING': 'quantized',  # Cache/aktarım: 'quantized' (int16) veya 'float32'
+    'QUANTIZATION_STEP': 0.1,  # Metre; 0.1 = desimetre hassasiyeti
+    'GRID_SPACING_DEG': 0.01,  # Grid örnekleri arası derece (~1 km)
+}
+
+# Yerel DEM (ham raster veya sıkıştırmasız GeoTIFF, np.memmap ile açılır)
+DEM_SETTINGS = {
+    'LOCAL_DEM_PATH': '',  # Boş ise çevrimiçi elevation API kullanılır
 }
 
 # Kamera Ayarları
@@ -38,6 +114,55 @@ CAMERA_SETTINGS = {
     'MAX_DISTANCE': 20.0,
 }
 
+# Hazır kamera açıları (headless snapshot ve flyover için)
+CAMERA_PRESETS = {
+    'default': {'distance': 8.0, 'rotation_x': -30.0, 'rotation_y': 0.0},
+    'oblique': {'distance': 6.5, 'rotation_x': -45.0, 'rotation_y': 35.0},
+    'top': {'distance': 7.0, 'rotation_x': -89.0, 'rotation_y': 0.0},
+    'low': {'distance': 5.0, 'rotation_x': -15.0, 'rotation_y': 60.0},
+}
+
+# Kamera uçuşu (anahtar kare yolu oynatma ve önceden yükleme)
+FLIGHT_SETTINGS = {
+    'TIMESTEP': 1.0 / 30.0,  # Sabit simülasyon adımı (sn)
+    'REALTIME': True,  # False: her frame tam bir adım ilerler (video kaydı için)
+    'MAX_CATCHUP_STEPS': 4,  # Geciken frame'de en fazla bu kadar adım telafi edilir
+    'SAMPLE_STEP_S': 0.1,  # Yol üzerinde gereken karoların arandığı aralık
+    'MIN_LOOKAHEAD_S': 2.0,  # Önceden yükleme penceresi sınırları
+    'MAX_LOOKAHEAD_S': 30.0,
+    'LEAD_SAFETY': 2.0,  # Ölçülen karo yükleme süresine uygulanan pay
+    'PREROLL_TIMEOUT_S': 10.0,  # Başlangıç karoları için en fazla bekleme
+    'DEFAULT_SPEED_KMH': 300.0,  # Rota verilirse kamera hızı
+}
+
+# Headless (ekransız) render ayarları
+HEADLESS_SETTINGS = {
+    'IMAGE_WIDTH': 800,
+    'IMAGE_HEIGHT': 600,
+    'SAMPLES': 4,  # Multisampling
+    'OUTPUT_DIR': 'snapshots',
+    'PREFETCH_DEPTH': 4,  # Render'dan önce hazırlanan konum sayısı
+}
+
+# Benchmark Ayarları
+BENCHMARK_SETTINGS = {
+    'GRID_SIZE': 512,  # Kernel ve mesh ölçümlerinde elevation grid boyutu
+    'REPEATS': 5,
+    'STUB_LATENCY': 0.02,  # Yerel test sunucusunda istek başına gecikme (sn)
+    'STUB_FAILURE_RATE': 0.0,
+    'RESULTS_FILE': 'benchmark_results.json',
+    'BASELINE_FILE': 'benchmark_baseline.json',
+    'TOLERANCE': 0.2,  # Baseline'a göre bu orandan fazla yavaşlama gerileme sayılır
+}
+
+# Toplu Ön Hesaplama Ayarları
+PRECOMPUTE_SETTINGS = {
+    'WORKERS': 0,  # 0: CPU sayısı
+    'CHECKPOINT_FILE': 'precompute_checkpoint.json',
+    'MAX_IN_FLIGHT': 2,  # Worker başına aynı anda işlenen konum sayısı
+    'SMOOTH_ITERATIONS': 0,  # 0: widget'ın kullandığı ham grid ile aynı mesh
+}
+
 # Renk Ayarları
 COLOR_SETTINGS = {
     'WATER_COLOR': (0.2, 0.4, 0.8),      # Mavi
@@ -65,6 +190,19 @@ APP_SETTINGS = {
     'LOG_LEVEL': 'INFO',  # DEBUG, INFO, WARNING, ERROR
 }
 
+# Disk Cache Ayarları (tile ve elevation cache'i ortak)
+CACHE_SETTINGS = {
+    'MAX_SIZE_MB': RENDER_SETTINGS['TILE_CACHE_SIZE'],  # İndirilen veri (tile, elevation)
+    # Hesaplanan dosyalar (mesh, ışık haritası, kontur) ayrı bütçeyle sınırlanır;
+    # toplu ön hesaplama/dışa aktarma yazdıklarını hemen silmesin
+    'ARTIFACT_MAX_SIZE_MB': 2048,
+    'ARTIFACT_PREFIXES': ('mesh_', 'lightmap_', 'contours_'),
+    'MAX_AGE_DAYS': 30,
+    'INDEX_FILE': 'cache_index.json',
+    'EVICTION_INTERVAL': 30,  # Saniye; bütçe aşılınca beklemeden çalışır
+    'EVICTION_BATCH': 64,  # Tek adımda silinecek en fazla dosya
+}
+
 # Varsayılan Konumlar
 DEFAULT_LOCATIONS = {
     'Istanbul': (41.0082, 28.9784),
@@ -81,6 +219,7 @@ DEFAULT_LOCATIONS = {
 PERFORMANCE_SETTINGS = {
     'USE_DISPLAY_LISTS': True,
     'USE_VBO': False,  # Vertex Buffer Objects (gelişmiş)
+    'USE_PBO': False,  # Tile güncellemeleri için Pixel Buffer Objects
     'MULTISAMPLING': True,
     'VSYNC': True,
     'THREAD_COUNT': 4,  # Veri yükleme için
@@ -92,7 +231,10 @@ DEBUG_SETTINGS = {
     'SHOW_NORMALS': False,
     'SHOW_GRID': True,
     'PRINT_FPS': False,
+    'SHOW_STATS_OVERLAY': False,  # F tuşu ile açılıp kapatılır
     'VERBOSE_LOGGING': False,
+    'TRACE_PIPELINE': False,  # Veri yükleme aşamalarının süre/bayt/cache izlemesi
+    'TRACE_EXPORT_PATH': '',  # Doluysa her yüklemeden sonra Chrome trace JSON yazılır
 }
 
 # Gelişmiş API Ayarları
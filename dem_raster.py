@@ -0,0 +1,289 @@
+"""
+Yerel DEM Raster Kaynağı - Büyük yükseklik dosyalarına np.memmap ile pencereli erişim
+
+Desteklenen biçimler:
+- Ham (raw) raster: yanında aynı isimli .json tanım dosyası bulunur
+  {"width", "height", "dtype", "west", "south", "east", "north",
+   "offset" (ops.), "nodata" (ops.), "byteorder" (ops., "<" veya ">")}
+- Basit GeoTIFF/BigTIFF: sıkıştırmasız, tek bantlı, satırları ardışık
+  yerleştirilmiş (tek strip veya art arda strip'ler), ModelPixelScale ve
+  ModelTiepoint etiketleri ile coğrafi konumlandırılmış
+
+Dosya açmak yalnızca başlığı okur; pencere okumaları memmap üzerinde
+view döndürür, böylece sadece dokunulan sayfalar diskten yüklenir.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+# TIFF etiketleri
+_TAG_IMAGE_WIDTH = 256
+_TAG_IMAGE_LENGTH = 257
+_TAG_BITS_PER_SAMPLE = 258
+_TAG_COMPRESSION = 259
+_TAG_STRIP_OFFSETS = 273
+_TAG_SAMPLES_PER_PIXEL = 277
+_TAG_ROWS_PER_STRIP = 278
+_TAG_STRIP_BYTE_COUNTS = 279
+_TAG_TILE_WIDTH = 322
+_TAG_SAMPLE_FORMAT = 339
+_TAG_MODEL_PIXEL_SCALE = 33550
+_TAG_MODEL_TIEPOINT = 33922
+_TAG_GDAL_NODATA = 42113
+
+# TIFF alan tipi -> (struct kodu, byte)
+_TIFF_TYPES = {
+    1: ('B', 1), 2: ('s', 1), 3: ('H', 2), 4: ('I', 4), 5: ('II', 8),
+    6: ('b', 1), 7: ('B', 1), 8: ('h', 2), 9: ('i', 4), 10: ('ii', 8),
+    11: ('f', 4), 12: ('d', 8), 16: ('Q', 8), 17: ('q', 8), 18: ('Q', 8),
+}
+
+# (SampleFormat, BitsPerSample) -> numpy tipi
+_SAMPLE_DTYPES = {
+    (1, 8): 'u1', (1, 16): 'u2', (1, 32): 'u4',
+    (2, 8): 'i1', (2, 16): 'i2', (2, 32): 'i4',
+    (3, 32): 'f4', (3, 64): 'f8',
+}
+
+
+def _read_tiff_header(path):
+    """Basit GeoTIFF başlığını okur, memmap parametrelerini döndürür"""
+    with open(path, 'rb') as f:
+        byte_order = f.read(2)
+        if byte_order == b'II':
+            endian = '<'
+        elif byte_order == b'MM':
+            endian = '>'
+        else:
+            raise ValueError(f"TIFF dosyası değil: {path}")
+
+        version = struct.unpack(endian + 'H', f.read(2))[0]
+        if version == 42:
+            ifd_offset = struct.unpack(endian + 'I', f.read(4))[0]
+            count_fmt, entry_fmt, entry_size, inline_size = 'H', 'HHI4s', 12, 4
+        elif version == 43:  # BigTIFF
+            f.read(4)
+            ifd_offset = struct.unpack(endian + 'Q', f.read(8))[0]
+            count_fmt, entry_fmt, entry_size, inline_size = 'Q', 'HHQ8s', 20, 8
+        else:
+            raise ValueError(f"Desteklenmeyen TIFF sürümü: {version}")
+
+        f.seek(ifd_offset)
+        count_size = struct.calcsize(endian + count_fmt)
+        entry_count = struct.unpack(endian + count_fmt, f.read(count_size))[0]
+        raw_entries = [struct.unpack(endian + entry_fmt, f.read(entry_size)) for _ in range(entry_count)]
+
+        tags = {}
+        for tag, field_type, count, value in raw_entries:
+            if field_type not in _TIFF_TYPES:
+                continue
+            code, size = _TIFF_TYPES[field_type]
+            total = size * count
+            if total <= inline_size:
+                data = value[:total]
+            else:
+                pointer = struct.unpack(endian + ('I' if inline_size == 4 else 'Q'), value)[0]
+                f.seek(pointer)
+                data = f.read(total)
+
+            if field_type == 2:
+                tags[tag] = data.rstrip(b'\x00').decode('ascii', errors='ignore')
+            else:
+                tags[tag] = struct.unpack(endian + code * count, data)
+
+    def first(tag, default=None):
+        value = tags.get(tag)
+        return value[0] if value else default
+
+    if first(_TAG_COMPRESSION, 1) != 1:
+        raise ValueError("Sıkıştırılmış TIFF memory-map edilemez")
+    if _TAG_TILE_WIDTH in tags:
+        raise ValueError("Tile'lı TIFF desteklenmiyor, strip düzeni gerekli")
+    if first(_TAG_SAMPLES_PER_PIXEL, 1) != 1:
+        raise ValueError("Yalnızca tek bantlı DEM desteklenir")
+
+    width = first(_TAG_IMAGE_WIDTH)
+    height = first(_TAG_IMAGE_LENGTH)
+    bits = first(_TAG_BITS_PER_SAMPLE, 16)
+    sample_format = first(_TAG_SAMPLE_FORMAT, 1)
+    dtype = np.dtype(endian + _SAMPLE_DTYPES[(sample_format, bits)])
+
+    # Strip'ler ardışık olmalı ki tüm raster tek bir memmap olsun
+    offsets = tags[_TAG_STRIP_OFFSETS]
+    byte_counts = tags[_TAG_STRIP_BYTE_COUNTS]
+    for i in range(1, len(offsets)):
+        if offsets[i] != offsets[i - 1] + byte_counts[i - 1]:
+            raise ValueError("Strip'leri ardışık olmayan TIFF memory-map edilemez")
+
+    scale = tags.get(_TAG_MODEL_PIXEL_SCALE)
+    tiepoint = tags.get(_TAG_MODEL_TIEPOINT)
+    if not scale or not tiepoint:
+        raise ValueError("GeoTIFF konum etiketleri (ModelPixelScale/ModelTiepoint) eksik")
+
+    # Tiepoint: (i, j, k, x, y, z) -> piksel (i, j) köşesinin coğrafi konumu
+    west = tiepoint[3] - tiepoint[0] * scale[0]
+    north = tiepoint[4] + tiepoint[1] * scale[1]
+
+    nodata = tags.get(_TAG_GDAL_NODATA)
+    return {
+        'width': width,
+        'height': height,
+        'dtype': dtype,
+        'offset': offsets[0],
+        'west': west,
+        'north': north,
+        'east': west + width * scale[0],
+        'south': north - height * scale[1],
+        'nodata': float(nodata) if nodata else None,
+    }
+
+
+def _read_raw_header(path):
+    """Ham raster için .json tanım dosyasını okur"""
+    meta_path = os.path.splitext(path)[0] + '.json'
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    return {
+        'width': int(meta['width']),
+        'height': int(meta['height']),
+        'dtype': np.dtype(meta.get('byteorder', '<') + np.dtype(meta['dtype']).str[1:]),
+        'offset': int(meta.get('offset', 0)),
+        'west': float(meta['west']),
+        'south': float(meta['south']),
+        'east': float(meta['east']),
+        'north': float(meta['north']),
+        # JSON NaN taşıyamaz; "nan" dizgesi de kabul edilir
+        'nodata': float(meta['nodata']) if meta.get('nodata') is not None else None,
+    }
+
+
+class LocalDEMSource:
+    """
+    Diskteki büyük bir DEM'e lat/lon penceresi ile erişim.
+
+    Raster kuzeyden güneye satır düzenindedir (satır 0 = kuzey). Okuma
+    metodları uygulamanın grid düzeninde (satır 0 = güney, enlemler artan)
+    view döndürür; dikey çevirme negatif stride ile yapılır, kopya oluşmaz.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.tif', '.tiff'):
+            header = _read_tiff_header(path)
+        else:
+            header = _read_raw_header(path)
+
+        self.width = header['width']
+        self.height = header['height']
+        self.dtype = header['dtype']
+        self.nodata = header['nodata']
+        self.bounds = {
+            'south': header['south'],
+            'north': header['north'],
+            'west': header['west'],
+            'east': header['east'],
+        }
+        self.pixel_width = (self.bounds['east'] - self.bounds['west']) / self.width
+        self.pixel_height = (self.bounds['north'] - self.bounds['south']) / self.height
+
+        # Açılış yalnızca sanal bellek eşlemesi yapar, veri okunmaz
+        self.data = np.memmap(path, dtype=self.dtype, mode='r',
+                              offset=header['offset'], shape=(self.height, self.width))
+
+    def _window_indices(self, south, west, north, east):
+        """Coğrafi pencereyi (satır0, satır1, sütun0, sütun1) raster indekslerine çevirir"""
+        c0 = int(np.floor((west - self.bounds['west']) / self.pixel_width))
+        c1 = int(np.ceil((east - self.bounds['west']) / self.pixel_width))
+        r0 = int(np.floor((self.bounds['north'] - north) / self.pixel_height))
+        r1 = int(np.ceil((self.bounds['north'] - south) / self.pixel_height))
+
+        c0, c1 = max(0, c0), min(self.width, max(c1, c0 + 1))
+        r0, r1 = max(0, r0), min(self.height, max(r1, r0 + 1))
+        if c0 >= c1 or r0 >= r1:
+            raise ValueError("İstenen pencere DEM sınırlarının dışında")
+        return r0, r1, c0, c1
+
+    def _window_bounds(self, r0, r1, c0, c1, step):
+        """Okunan pencerenin örnek noktalarının coğrafi sınırları (piksel merkezleri)"""
+        last_row = r0 + ((r1 - 1 - r0) // step) * step
+        last_col = c0 + ((c1 - 1 - c0) // step) * step
+        return {
+            'north': self.bounds['north'] - (r0 + 0.5) * self.pixel_height,
+            'south': self.bounds['north'] - (last_row + 0.5) * self.pixel_height,
+            'west': self.bounds['west'] + (c0 + 0.5) * self.pixel_width,
+            'east': self.bounds['west'] + (last_col + 0.5) * self.pixel_width,
+        }
+
+    def read_window(self, south, west, north, east, step=1):
+        """
+        Lat/lon kutusunu okur. step > 1 ise her step'inci örnek alınır.
+        (view, bounds) döndürür; view memmap üzerinde kopyasız bir dilimdir.
+        """
+        r0, r1, c0, c1 = self._window_indices(south, west, north, east)
+        view = self.data[r0:r1:step, c0:c1:step][::-1]
+        return view, self._window_bounds(r0, r1, c0, c1, step)
+
+    def read_grid(self, south, west, north, east, max_size):
+        """Pencereyi her kenarda en fazla max_size örnek olacak şekilde stride ile okur"""
+        r0, r1, c0, c1 = self._window_indices(south, west, north, east)
+        step = max(1, int(np.ceil(max(r1 - r0, c1 - c0) / max_size)))
+        return self.read_window(south, west, north, east, step)
+
+    def read_overview(self, max_size, method='stride', chunk_rows=1024):
+        """
+        Tüm raster'ın küçük bir önizlemesini döndürür.
+
+        method='stride': kopyasız, her n'inci örnek.
+        method='mean' / 'max': n x n bloklar üzerinde indirgeme; raster
+        chunk_rows'luk şeritler halinde işlenir, bellek kullanımı sınırlıdır.
+        nodata örnekleri indirgemeye katılmaz; yalnızca tamamı nodata olan
+        bloklar nodata olur.
+        """
+        factor = max(1, int(np.ceil(max(self.width, self.height) / max_size)))
+        if method == 'stride':
+            return self.data[::factor, ::factor][::-1]
+
+        reducer = {'mean': np.mean, 'max': np.max}[method]
+        out_rows = self.height // factor
+        out_cols = self.width // factor
+        out = np.empty((out_rows, out_cols), dtype=np.float32)
+        nodata = None if self.nodata is None else np.float32(self.nodata)
+
+        band_rows = max(1, chunk_rows // factor) * factor
+        for start in range(0, out_rows * factor, band_rows):
+            stop = min(start + band_rows, out_rows * factor)
+            band = np.asarray(self.data[start:stop, :out_cols * factor], dtype=np.float32)
+            blocks = band.reshape((stop - start) // factor, factor, out_cols, factor)
+            target = out[start // factor:stop // factor]
+
+            if nodata is None:
+                target[...] = reducer(blocks, axis=(1, 3))
+                continue
+
+            valid = ~np.isnan(blocks) if np.isnan(nodata) else blocks != nodata
+            count = np.count_nonzero(valid, axis=(1, 3))
+            if method == 'mean':
+                total = np.where(valid, blocks, 0.0).sum(axis=(1, 3), dtype=np.float64)
+                target[...] = total / np.maximum(count, 1)
+            else:
+                target[...] = np.where(valid, blocks, -np.inf).max(axis=(1, 3))
+            target[count == 0] = nodata
+
+        return out[::-1]
+
+    def contains(self, lat, lon):
+        """Koordinat DEM kapsamında mı"""
+        return (self.bounds['south'] <= lat <= self.bounds['north'] and
+                self.bounds['west'] <= lon <= self.bounds['east'])
+
+    def close(self):
+        """
+        Memory map referansını bırakır; dışarıya verilmiş view'lar kullanımdayken
+        eşleme onlar serbest kalınca kapanır
+        """
+        self.data = None
@@ -0,0 +1,145 @@
+"""
+Elevation Piramidi - 2x küçültülmüş overview seviyeleri ve çözünürlüğe göre seviye seçimi
+"""
+
+import hashlib
+import io
+import math
+
+import numpy as np
+
+from utils import as_elevation_array, quantize_elevation, dequantize_elevation
+
+METERS_PER_DEGREE = 111320.0
+
+
+def level_digest(elevation_data):
+    """Grid içeriğinin özeti; overview cache'i hangi seviye 0'dan üretildiğini bununla bilir"""
+    digest = hashlib.blake2b(digest_size=16)
+    data = np.ascontiguousarray(as_elevation_array(elevation_data))
+    digest.update(str(data.shape).encode())
+    digest.update(memoryview(data).cast('B'))
+    return digest.hexdigest()
+
+
+def downsample_2x(data, method='mean'):
+    """
+    Grid'i her eksende yarıya indirir (2x2 blok ortalaması veya maksimumu).
+
+    Tek sayılı kenarlarda son satır/sütunun blokları yalnızca var olan
+    örnekler üzerinden (2x1, 1x2 veya 1x1) indirgenir; kenar tekrarlanmaz.
+    """
+    if method == 'max':
+        def reduce(blocks, axis):
+            return blocks.max(axis=axis)
+    elif method == 'mean':
+        acc_dtype = np.float32 if data.dtype == np.float32 else None
+
+        def reduce(blocks, axis):
+            return blocks.mean(axis=axis, dtype=acc_dtype)
+    else:
+        raise ValueError(f"Bilinmeyen indirgeme yöntemi: {method}")
+
+    rows, cols = data.shape
+    half_rows, half_cols = rows // 2, cols // 2
+    out = np.empty(((rows + 1) // 2, (cols + 1) // 2), dtype=data.dtype)
+
+    even = data[:half_rows * 2, :half_cols * 2]
+    out[:half_rows, :half_cols] = reduce(even.reshape(half_rows, 2, half_cols, 2), (1, 3))
+    if cols % 2:
+        out[:half_rows, -1] = reduce(data[:half_rows * 2, -1].reshape(half_rows, 2), 1)
+    if rows % 2:
+        out[-1, :half_cols] = reduce(data[-1, :half_cols * 2].reshape(half_cols, 2), 1)
+    if rows % 2 and cols % 2:
+        out[-1, -1] = data[-1, -1]
+    return out
+
+
+class ElevationPyramid:
+    """
+    Seviye 0 tam çözünürlüklü grid, her üst seviye bir öncekinin 2x küçültülmüşü.
+
+    Tüm seviyeler aynı coğrafi alanı (bounds) kapsar; seviye k'nın örnek
+    aralığı yaklaşık 2^k kat büyüktür.
+    """
+
+    def __init__(self, levels, bounds=None, method='mean'):
+        self.levels = levels
+        self.bounds = bounds
+        self.method = method
+
+    @classmethod
+    def build(cls, elevation_data, bounds=None, method='mean', min_size=8):
+        """En küçük kenar min_size'ın altına inene kadar overview seviyeleri oluşturur"""
+        levels = [as_elevation_array(elevation_data)]
+        while min(levels[-1].shape) // 2 >= min_size:
+            levels.append(downsample_2x(levels[-1], method))
+        return cls(levels, bounds, method)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, level):
+        return self.levels[level]
+
+    def ground_resolution(self, level):
+        """Seviyenin yaklaşık örnek aralığı (metre); bounds yoksa örnek başına 1 birim"""
+        rows, cols = self.levels[level].shape
+        if self.bounds is None:
+            return float(2 ** level)
+
+        mid_lat = math.radians((self.bounds['south'] + self.bounds['north']) / 2)
+        lat_span = (self.bounds['north'] - self.bounds['south']) * METERS_PER_DEGREE
+        lon_span = (self.bounds['east'] - self.bounds['west']) * METERS_PER_DEGREE * math.cos(mid_lat)
+        return max(lat_span / max(rows - 1, 1), lon_span / max(cols - 1, 1))
+
+    def level_for_resolution(self, meters_per_sample):
+        """İstenen zemin çözünürlüğünü hâlâ karşılayan en kaba seviyenin indeksi"""
+        for level in range(len(self.levels) - 1, -1, -1):
+            if self.ground_resolution(level) <= meters_per_sample:
+                return level
+        return 0
+
+    def level_for_samples(self, max_samples):
+        """En uzun kenarı max_samples'ı aşmayan en ince seviyenin indeksi (thumbnail için)"""
+        for level, data in enumerate(self.levels):
+            if max(data.shape) <= max_samples:
+                return level
+        return len(self.levels) - 1
+
+    def level_for_min_samples(self, min_samples):
+        """En uzun kenarında en az min_samples örnek bulunan en kaba seviyenin indeksi"""
+        for level in range(len(self.levels) - 1, -1, -1):
+            if max(self.levels[level].shape) >= min_samples:
+                return level
+        return 0
+
+    def query(self, meters_per_sample):
+        """(grid, seviye) döndürür"""
+        level = self.level_for_resolution(meters_per_sample)
+        return self.levels[level], level
+
+    def to_bytes(self):
+        """Overview seviyelerini (seviye 0 hariç) int16 kuantize .npz olarak serileştirir"""
+        arrays = {'method': np.array(self.method), 'count': np.array(len(self.levels))}
+        for level in range(1, len(self.levels)):
+            q, offset, step = quantize_elevation(self.levels[level])
+            arrays[f'q{level}'] = q
+            arrays[f'offset{level}'] = np.array(offset)
+            arrays[f'step{level}'] = np.array(step)
+
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_file(cls, file, base_level, bounds=None):
+        """to_bytes ile yazılmış overview'ları yükler, seviye 0 olarak base_level kullanılır"""
+        levels = [as_elevation_array(base_level)]
+        with np.load(file) as archive:
+            method = str(archive['method'])
+            for level in range(1, int(archive['count'])):
+                levels.append(dequantize_elevation(archive[f'q{level}'],
+                                                   float(archive[f'offset{level}']),
+                                                   float(archive[f'step{level}'])))
+        return cls(levels, bounds, method)
@@ -0,0 +1,81 @@
+"""
+Frame Zamanlayıcı - Sahneyi yalnızca bir şey değiştiğinde yeniden çizer
+"""
+
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+from config import APP_SETTINGS
+
+
+class FrameScheduler(QObject):
+    """
+    Sabit aralıklı repaint timer'ı yerine talep üzerine çizim yapar.
+
+    - request_frame(): kamera, veri veya ayar değiştiğinde çağrılır. Aynı
+      frame'e denk gelen istekler (ör. fare olay yağmuru) tek bir çizimde
+      birleştirilir.
+    - Etkileşim sırasında çizim hızı APP_SETTINGS['FPS_TARGET'] ile sınırlanır.
+    - start_continuous()/stop_continuous(): animasyonlar için sürekli mod.
+      Birden fazla animasyon aynı anda sürekli mod isteyebilir; son sahip
+      bıraktığında zamanlayıcı tekrar boşta kalır.
+    """
+
+    def __init__(self, widget, fps_target=None):
+        super().__init__(widget)
+        self.widget = widget
+        self.set_fps_target(fps_target or APP_SETTINGS['FPS_TARGET'])
+
+        self._pending = False
+        self._last_frame_time = 0.0
+        self._continuous_owners = set()
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def set_fps_target(self, fps_target):
+        """Çizim hızı üst sınırını ayarlar (FPS)"""
+        self.fps_target = max(1, int(fps_target))
+        self.min_frame_interval = 1.0 / self.fps_target
+
+    @property
+    def is_continuous(self):
+        return bool(self._continuous_owners)
+
+    def request_frame(self):
+        """Bir sonraki uygun zamanda tek frame çizilmesini ister"""
+        if self._pending:
+            # Zaten planlanmış bir frame var, istek onunla birleşir
+            return
+
+        self._pending = True
+        elapsed = time.perf_counter() - self._last_frame_time
+        delay = max(0.0, self.min_frame_interval - elapsed)
+        self._timer.start(int(delay * 1000))
+
+    def start_continuous(self, owner='default'):
+        """Animasyon için sürekli çizim modunu açar"""
+        self._continuous_owners.add(owner)
+        self.request_frame()
+
+    def stop_continuous(self, owner='default'):
+        """Sürekli çizim modunu kapatır"""
+        self._continuous_owners.discard(owner)
+
+    def frame_rendered(self):
+        """paintGL tarafından her frame sonunda çağrılır"""
+        self._last_frame_time = time.perf_counter()
+
+        if self._continuous_owners:
+            self.request_frame()
+
+    def _on_timeout(self):
+        self._pending = False
+        self.widget.update()
+
+    def stop(self):
+        """Zamanlayıcıyı tamamen durdurur"""
+        self._continuous_owners.clear()
+        self._timer.stop()
+        self._pending = False
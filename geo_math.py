@@ -0,0 +1,130 @@
+"""
+Coğrafi Hesaplamalar - Web Mercator tile matematiği ve mesafeler (NumPy dizileri ile)
+
+Tüm fonksiyonlar skaler veya dizi girdi kabul eder ve NumPy yayınlama
+(broadcasting) kurallarına uyar. utils.py'daki skaler fonksiyonlar ve
+MapDataLoader bu modülü kullanır.
+"""
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Web Mercator'ın tanımlı olduğu en büyük enlem
+MAX_MERCATOR_LAT = 85.05112877980659
+
+
+def deg2rad(degrees):
+    """Derece to radyan çevirici"""
+    return np.radians(degrees)
+
+
+def rad2deg(radians):
+    """Radyan to derece çevirici"""
+    return np.degrees(radians)
+
+
+def lat_lon_to_tile_fraction(lat, lon, zoom):
+    """Lat/lon'u kesirli tile koordinatlarına (x, y) çevirir"""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT)
+    lon = np.asarray(lon, dtype=np.float64)
+    n = 2.0 ** zoom
+
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2.0 * n
+    return x, y
+
+
+def lat_lon_to_tile(lat, lon, zoom):
+    """Lat/lon'u tam sayı tile koordinatlarına (x, y) çevirir"""
+    x, y = lat_lon_to_tile_fraction(lat, lon, zoom)
+    return np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+
+
+def tile_to_lat_lon(x, y, zoom):
+    """Tile koordinatlarını (kesirli olabilir) tile'ın sol üst köşesinin lat/lon'una çevirir"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = 2.0 ** zoom
+
+    lon = x / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * y / n))))
+    return lat, lon
+
+
+def lat_lon_to_pixel(lat, lon, zoom, tile_size=256):
+    """Lat/lon'u zoom seviyesindeki global kesirli piksel koordinatlarına çevirir"""
+    x, y = lat_lon_to_tile_fraction(lat, lon, zoom)
+    return x * tile_size, y * tile_size
+
+
+def pixel_to_lat_lon(px, py, zoom, tile_size=256):
+    """Global piksel koordinatlarını lat/lon'a çevirir"""
+    return tile_to_lat_lon(np.asarray(px) / tile_size, np.asarray(py) / tile_size, zoom)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """İki koordinat (dizisi) arası mesafeyi hesaplar (km), girdiler yayınlanır"""
+    lat1 = np.radians(lat1)
+    lat2 = np.radians(lat2)
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lon2) - np.asarray(lon1))
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_pairwise(lats1, lons1, lats2, lons2):
+    """İlk kümedeki her nokta ile ikinci kümedeki her nokta arası mesafe matrisi (N x M, km)"""
+    lats1 = np.asarray(lats1, dtype=np.float64)[:, np.newaxis]
+    lons1 = np.asarray(lons1, dtype=np.float64)[:, np.newaxis]
+    lats2 = np.asarray(lats2, dtype=np.float64)[np.newaxis, :]
+    lons2 = np.asarray(lons2, dtype=np.float64)[np.newaxis, :]
+    return haversine(lats1, lons1, lats2, lons2)
+
+
+def path_lengths(lats, lons):
+    """Bir rota boyunca ardışık noktalar arası mesafeler (km, uzunluk N-1)"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    return haversine(lats[:-1], lons[:-1], lats[1:], lons[1:])
+
+
+def tile_range_for_bbox(south, west, north, east, zoom):
+    """Sınır kutusunu kapsayan tile aralığını (x_min, y_min, x_max, y_max) döndürür"""
+    n = 2 ** zoom
+    x_min, y_min = lat_lon_to_tile(north, west, zoom)
+    x_max, y_max = lat_lon_to_tile(south, east, zoom)
+    x_min, x_max = (int(np.clip(v, 0, n - 1)) for v in (x_min, x_max))
+    y_min, y_max = (int(np.clip(v, 0, n - 1)) for v in (y_min, y_max))
+    return x_min, y_min, x_max, y_max
+
+
+def tiles_for_bbox(south, west, north, east, zoom):
+    """Sınır kutusunu kapsayan tüm tile'ları (N, 2) [x, y] dizisi olarak döndürür"""
+    x_min, y_min, x_max, y_max = tile_range_for_bbox(south, west, north, east, zoom)
+    xs, ys = np.meshgrid(np.arange(x_min, x_max + 1), np.arange(y_min, y_max + 1))
+    return np.column_stack((xs.ravel(), ys.ravel()))
+
+
+def coverage_zoom(south, west, north, east, max_tiles, max_zoom):
+    """
+    Sınır kutusunu kapsayan tile aralığının her eksende en fazla max_tiles
+    tile olduğu en yüksek zoom (max_zoom'u aşmaz)
+    """
+    for zoom in range(int(max_zoom), -1, -1):
+        x_min, y_min, x_max, y_max = tile_range_for_bbox(south, west, north, east, zoom)
+        if x_max - x_min < max_tiles and y_max - y_min < max_tiles:
+            return zoom
+    return 0
+
+
+def span_zoom(span_deg, max_tiles, max_zoom):
+    """
+    span_deg genişliğindeki bir alanın, hizalamadan bağımsız olarak max_tiles
+    tile'a sığdığı en yüksek zoom (boylam yönünde; enlem coverage_zoom ile sınırlanır)
+    """
+    for zoom in range(int(max_zoom), -1, -1):
+        if span_deg <= (max_tiles - 1) * 360.0 / 2 ** zoom:
+            return zoom
+    return 0
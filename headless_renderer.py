@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Headless Renderer - Pencere açmadan çok sayıda konum için 3D harita görüntüsü üretir
+
+Örnek:
+    python headless_renderer.py --all --preset oblique --out snapshots
+    python headless_renderer.py --coord 41.0082,28.9784 --coord 39.9334,32.8597
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (DEFAULT_LOCATIONS, CAMERA_PRESETS, HEADLESS_SETTINGS,
+                    LIGHTMAP_SETTINGS, PERFORMANCE_SETTINGS, RENDER_SETTINGS)
+from utils import logger, setup_logging
+
+
+class HeadlessRenderer:
+    """
+    Map3DWidget'ın çizim kodunu ekran dışı bir framebuffer'a uygular.
+
+    Widget hiç gösterilmez; QOffscreenSurface üzerindeki bir GL context
+    aktif edilip FBO bağlanır ve widget'ın initializeGL/resizeGL/paintGL
+    metodları doğrudan çağrılır.
+    """
+
+    def __init__(self, width=None, height=None, samples=None):
+        from PyQt6.QtGui import QOffscreenSurface, QOpenGLContext, QSurfaceFormat
+        from PyQt6.QtOpenGL import QOpenGLFramebufferObject, QOpenGLFramebufferObjectFormat
+        from map_widget import Map3DWidget
+
+        self.width = width or HEADLESS_SETTINGS['IMAGE_WIDTH']
+        self.height = height or HEADLESS_SETTINGS['IMAGE_HEIGHT']
+        samples = HEADLESS_SETTINGS['SAMPLES'] if samples is None else samples
+
+        # Fixed-function pipeline için compatibility profile
+        surface_format = QSurfaceFormat()
+        surface_format.setVersion(2, 1)
+        surface_format.setProfile(QSurfaceFormat.OpenGLContextProfile.CompatibilityProfile)
+        surface_format.setDepthBufferSize(24)
+
+        self.context = QOpenGLContext()
+        self.context.setFormat(surface_format)
+        if not self.context.create():
+            raise RuntimeError("Offscreen OpenGL context oluşturulamadı")
+
+        self.surface = QOffscreenSurface()
+        self.surface.setFormat(self.context.format())
+        self.surface.create()
+
+        if not self.context.makeCurrent(self.surface):
+            raise RuntimeError("Offscreen OpenGL context aktif edilemedi")
+
+        fbo_format = QOpenGLFramebufferObjectFormat()
+        fbo_format.setAttachment(QOpenGLFramebufferObject.Attachment.CombinedDepthStencil)
+        fbo_format.setSamples(samples)
+        self.fbo = QOpenGLFramebufferObject(self.width, self.height, fbo_format)
+
+        self.scene = Map3DWidget()
+        self.scene.show_stats_overlay = False
+
+        self.fbo.bind()
+        self.scene.initializeGL()
+        self.scene.resizeGL(self.width, self.height)
+
+    def render(self, elevation_data, texture_data=None, terrain_bounds=None,
+               tile_bounds=None, camera=None, lightmap=None):
+        """Tek bir arazi için görüntü üretir ve QImage döndürür"""
+        self.context.makeCurrent(self.surface)
+        self.fbo.bind()
+
+        self.scene.load_terrain_data(elevation_data, texture_data,
+                                     terrain_bounds=terrain_bounds, tile_bounds=tile_bounds)
+        if lightmap is not None:
+            self.scene.set_lightmap(lightmap)
+        if camera:
+            self.scene.apply_camera_preset(camera)
+
+        self.scene.paintGL()
+        from OpenGL.GL import glFinish
+        glFinish()
+
+        return self.fbo.toImage()
+
+    def cleanup(self):
+        """GL kaynaklarını serbest bırakır"""
+        self.context.makeCurrent(self.surface)
+        self.scene.cleanup()
+        self.fbo.release()
+        self.context.doneCurrent()
+
+
+class _LoaderPool:
+    """Her worker thread'e ayrı MapDataLoader (ayrı HTTP session) verir"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self):
+        loader = getattr(self._local, 'loader', None)
+        if loader is None:
+            from map_data_loader import MapDataLoader
+            loader = MapDataLoader()
+            self._local.loader = loader
+        return loader
+
+
+def _load_job_data(loader_pool, job, size, zoom_level):
+    """Bir konum için elevation, tile ve ışık haritası verisini yükler (worker thread'de)"""
+    loader = loader_pool.get()
+    lat, lon = job['lat'], job['lon']
+
+    elevation_data = loader.get_elevation_data(lat, lon, size)
+    texture_data = loader.get_map_tiles(lat, lon, zoom_level, size=size)
+    terrain_bounds = loader.last_elevation_bounds
+    tile_bounds = loader.get_tile_bounds(lat, lon, zoom_level, size)
+
+    lightmap = None
+    if LIGHTMAP_SETTINGS['ENABLED']:
+        from terrain_lightmap import load_or_bake_lightmap
+        lightmap = load_or_bake_lightmap(elevation_data, RENDER_SETTINGS['HEIGHT_SCALE'])
+
+    return elevation_data, texture_data, terrain_bounds, tile_bounds, lightmap
+
+
+def make_jobs(locations, presets=('default',)):
+    """
+    (isim, (lat, lon)) çiftlerinden ve kamera preset isimlerinden iş listesi oluşturur.
+    locations bir sözlük (DEFAULT_LOCATIONS gibi) veya çift listesi olabilir.
+    """
+    if isinstance(locations, dict):
+        locations = locations.items()
+
+    jobs = []
+    for name, (lat, lon) in locations:
+        for preset in presets:
+            if preset not in CAMERA_PRESETS:
+                raise ValueError(f"Bilinmeyen kamera preset'i: {preset}")
+            jobs.append({'name': name, 'lat': lat, 'lon': lon, 'preset': preset})
+    return jobs
+
+
+def render_batch(jobs, output_dir=None, renderer=None, size=50, zoom_level=14,
+                 workers=None, prefetch_depth=None):
+    """
+    İş listesini render eder ve PNG olarak kaydeder.
+
+    Veri yükleme bir thread havuzunda render ile paralel yürür: GL thread'i
+    bir konumu çizerken sonraki `prefetch_depth` konumun verisi indirilir.
+    Aynı konumun farklı preset'leri veriyi bir kez yükler.
+
+    Üretim hızını (görüntü/saniye) içeren bir özet sözlüğü döndürür.
+    """
+    output_dir = output_dir or HEADLESS_SETTINGS['OUTPUT_DIR']
+    workers = workers or PERFORMANCE_SETTINGS['THREAD_COUNT']
+    prefetch_depth = prefetch_depth or HEADLESS_SETTINGS['PREFETCH_DEPTH']
+    os.makedirs(output_dir, exist_ok=True)
+
+    owns_renderer = renderer is None
+    if owns_renderer:
+        renderer = HeadlessRenderer()
+
+    loader_pool = _LoaderPool()
+    futures = {}  # (lat, lon) -> Future
+    pending = deque(jobs)
+    in_flight = deque()
+
+    written = []
+    render_time = 0.0
+    wait_time = 0.0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit_next():
+            job = pending.popleft()
+            key = (job['lat'], job['lon'])
+            if key not in futures:
+                futures[key] = executor.submit(_load_job_data, loader_pool, job, size, zoom_level)
+            in_flight.append((job, futures[key]))
+
+        while pending and len(in_flight) < prefetch_depth:
+            submit_next()
+
+        while in_flight:
+            job, future = in_flight.popleft()
+            if pending:
+                submit_next()
+
+            wait_start = time.perf_counter()
+            try:
+                elevation_data, texture_data, terrain_bounds, tile_bounds, lightmap = future.result()
+            except Exception as e:
+                logger.error(f"{job['name']} verisi yüklenemedi: {e}")
+                continue
+            wait_time += time.perf_counter() - wait_start
+
+            render_start = time.perf_counter()
+            image = renderer.render(elevation_data, texture_data, terrain_bounds, tile_bounds,
+                                    camera=CAMERA_PRESETS[job['preset']], lightmap=lightmap)
+            path = os.path.join(output_dir, f"{job['name']}_{job['preset']}.png")
+            image.save(path, 'PNG')
+            render_time += time.perf_counter() - render_start
+            written.append(path)
+
+            # Aynı konumu bekleyen başka preset yoksa veriyi bırak
+            key = (job['lat'], job['lon'])
+            if not any((j['lat'], j['lon']) == key for j, _ in in_flight):
+                futures.pop(key, None)
+
+    if owns_renderer:
+        renderer.cleanup()
+
+    total_time = time.perf_counter() - start
+    stats = {
+        'images': len(written),
+        'failed': len(jobs) - len(written),
+        'total_seconds': total_time,
+        'render_seconds': render_time,
+        'data_wait_seconds': wait_time,
+        'images_per_second': len(written) / total_time if total_time > 0 else 0.0,
+        'files': written,
+    }
+    logger.info(f"{stats['images']} görüntü {total_time:.2f} sn'de üretildi "
+                f"({stats['images_per_second']:.2f} görüntü/sn, veri bekleme {wait_time:.2f} sn)")
+    return stats
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Ekransız toplu 3D harita görüntüsü üretimi")
+    parser.add_argument('--all', action='store_true', help="DEFAULT_LOCATIONS'taki tüm konumlar")
+    parser.add_argument('--location', action='append', default=[],
+                        help="DEFAULT_LOCATIONS'tan konum ismi (tekrarlanabilir)")
+    parser.add_argument('--coord', action='append', default=[],
+                        help="lat,lon biçiminde koordinat (tekrarlanabilir)")
+    parser.add_argument('--preset', action='append', default=[],
+                        help=f"Kamera preset'i: {', '.join(CAMERA_PRESETS)} (tekrarlanabilir)")
+    parser.add_argument('--out', default=HEADLESS_SETTINGS['OUTPUT_DIR'], help="Çıktı dizini")
+    parser.add_argument('--width', type=int, default=HEADLESS_SETTINGS['IMAGE_WIDTH'])
+    parser.add_argument('--height', type=int, default=HEADLESS_SETTINGS['IMAGE_HEIGHT'])
+    parser.add_argument('--size', type=int, default=50, help="Elevation grid boyutu")
+    parser.add_argument('--zoom', type=int, default=14, help="Tile zoom seviyesi")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    setup_logging()
+
+    locations = []
+    if args.all:
+        locations.extend(DEFAULT_LOCATIONS.items())
+    for name in args.location:
+        if name not in DEFAULT_LOCATIONS:
+            raise SystemExit(f"Bilinmeyen konum: {name}")
+        locations.append((name, DEFAULT_LOCATIONS[name]))
+    for coord in args.coord:
+        lat, lon = (float(v) for v in coord.split(','))
+        locations.append((f"{lat:.4f}_{lon:.4f}", (lat, lon)))
+
+    if not locations:
+        raise SystemExit("En az bir konum verin (--all, --location veya --coord)")
+
+    jobs = make_jobs(locations, args.preset or ['default'])
+
+    # Ekran yoksa Qt'yi offscreen platformunda başlat
+    if not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from PyQt6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    renderer = HeadlessRenderer(args.width, args.height)
+    try:
+        stats = render_batch(jobs, args.out, renderer=renderer, size=args.size, zoom_level=args.zoom)
+    finally:
+        renderer.cleanup()
+
+    print(f"{stats['images']} görüntü yazıldı -> {args.out} "
+          f"({stats['images_per_second']:.2f} görüntü/sn)")
+    return 0 if stats['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
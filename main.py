@@ -2,48 +2,131 @@
 """
 3D Harita Görüntüleyici - Ana Uygulama
 PyQt6, OpenGL ve OpenStreetMap kullanarak 3D harita görüntüleme
+
+Pencere yalnızca Qt widget'larıyla hemen gösterilir; OpenGL widget'ı ilk
+çizimden sonra oluşturulur, veri yükleme modülleri arka planda ısıtılır.
 """
 
 import sys
 import os
+import threading
+import time
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                              QHBoxLayout, QWidget, QPushButton, QLineEdit, 
-                             QLabel, QStatusBar, QMessageBox, QProgressBar)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+                             QLabel, QStatusBar, QMessageBox, QProgressBar,
+                             QFileDialog, QComboBox)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont
 
-from map_widget import Map3DWidget
-from map_data_loader import MapDataLoader
+from config import CONTOUR_SETTINGS, DEBUG_SETTINGS
+
+
+def warm_up_imports():
+    """Veri yükleme için gereken ağır modülleri önceden import eder (arka plan thread'i)"""
+    import map_data_loader
+    import requests
+    from PIL import Image
 
 
 class DataLoadingThread(QThread):
     """Harita verilerini arka planda yüklemek için thread"""
     data_loaded = pyqtSignal(object)  # elevation_data, texture_data
+    elevation_loaded = pyqtSignal(object)  # elevation_data, terrain_bounds, tile_bounds, pyramid
+    tile_loaded = pyqtSignal(int, int, object)  # grid_col, grid_row, image
+    lightmap_loaded = pyqtSignal(object)  # (rows, cols) uint8 ışık haritası
     progress_updated = pyqtSignal(int)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, lat, lon, zoom_level=14):
+    def __init__(self, lat, lon, zoom_level=14, terrain_size=50, height_scale=None):
         super().__init__()
         self.lat = lat
         self.lon = lon
         self.zoom_level = zoom_level
+        self.terrain_size = terrain_size
+        self.height_scale = height_scale
+        
+        # Kalite seçimi için ölçülen süreler
+        self.elevation_seconds = 0.0
+        self.tiles_seconds = 0.0
+        self.elevation_source = None
+        
+        from map_data_loader import MapDataLoader
         self.loader = MapDataLoader()
     
     def run(self):
+        from pipeline_trace import tracer
+        
         try:
-            # Elevation verilerini yükle
-            self.progress_updated.emit(25)
-            elevation_data = self.loader.get_elevation_data(self.lat, self.lon)
-            
-            # Texture verilerini yükle
-            self.progress_updated.emit(50)
-            texture_data = self.loader.get_map_tiles(self.lat, self.lon, self.zoom_level)
-            
-            self.progress_updated.emit(100)
-            self.data_loaded.emit((elevation_data, texture_data))
-            
+            with tracer.span('load', lat=self.lat, lon=self.lon):
+                self.load_data()
         except Exception as e:
             self.error_occurred.emit(str(e))
+    
+    def load_data(self):
+        from pipeline_trace import tracer
+        
+        # Elevation verilerini yükle
+        self.progress_updated.emit(25)
+        start = time.perf_counter()
+        with tracer.span('load.elevation'):
+            pyramid = self.loader.get_elevation_pyramid(self.lat, self.lon, self.terrain_size)
+        elevation_data = pyramid[0]
+        self.elevation_seconds = time.perf_counter() - start
+        self.elevation_source = self.loader.last_elevation_source
+        
+        # Arazi tile'lardan önce gösterilir, tile'lar geldikçe texture'a yazılır
+        terrain_bounds = self.loader.last_elevation_bounds
+        tile_bounds = self.loader.get_tile_bounds(self.lat, self.lon, self.zoom_level, self.terrain_size)
+        self.elevation_loaded.emit((elevation_data, terrain_bounds, tile_bounds, pyramid))
+        
+        # Işık haritası (cache'te yoksa hesaplanır; küçük grid'lerde milisaniyeler)
+        from config import LIGHTMAP_SETTINGS
+        if LIGHTMAP_SETTINGS['ENABLED'] and self.height_scale:
+            from terrain_lightmap import load_or_bake_lightmap
+            with tracer.span('load.lightmap'):
+                lightmap = load_or_bake_lightmap(elevation_data, self.height_scale)
+            self.lightmap_loaded.emit(lightmap)
+        
+        # Texture verilerini yükle
+        self.progress_updated.emit(50)
+        start = time.perf_counter()
+        with tracer.span('load.tiles'):
+            texture_data = self.loader.get_map_tiles(self.lat, self.lon, self.zoom_level,
+                                                     tile_callback=self.tile_loaded.emit,
+                                                     size=self.terrain_size)
+        self.tiles_seconds = time.perf_counter() - start
+        
+        self.progress_updated.emit(100)
+        self.data_loaded.emit((elevation_data, texture_data))
+
+
+class ExportThread(QThread):
+    """Yüklü araziyi arka planda dosyaya aktarır (terrain_export.export_terrain)"""
+    export_finished = pyqtSignal(object)  # yazılan dosya yolları
+    progress_updated = pyqtSignal(int)
+    error_occurred = pyqtSignal(str)
+    
+    def __init__(self, path, map_widget):
+        super().__init__()
+        self.path = path
+        # Aktarım sürerken yeni harita yüklenebilir; o anki veriler tutulur
+        self.elevation_data = map_widget.elevation_data
+        self.terrain_bounds = map_widget.terrain_bounds
+        self.texture_data = map_widget.texture_data
+        self.tile_bounds = map_widget.tile_bounds
+        self.height_scale = map_widget.height_scale
+    
+    def run(self):
+        from terrain_export import export_terrain
+        
+        try:
+            written = export_terrain(self.path, self.elevation_data, self.terrain_bounds,
+                                     self.texture_data, self.tile_bounds,
+                                     height_scale=self.height_scale,
+                                     progress=lambda fraction: self.progress_updated.emit(int(fraction * 100)))
+            self.export_finished.emit(written)
+        except (OSError, ValueError) as e:
+            self.error_occurred.emit(str(e))
 
 
 class MainWindow(QMainWindow):
@@ -56,13 +139,16 @@ class MainWindow(QMainWindow):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
+        self.main_layout = main_layout
         
         # Üst kontrol paneli
         self.setup_control_panel(main_layout)
         
-        # 3D Harita widget'ı
-        self.map_widget = Map3DWidget()
-        main_layout.addWidget(self.map_widget)
+        # 3D Harita widget'ı pencere gösterildikten sonra oluşturulur (init_map_widget)
+        self.map_widget = None
+        self.map_placeholder = QLabel("3D görünüm hazırlanıyor...")
+        self.map_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(self.map_placeholder, 1)
         
         # Status bar
         self.setup_status_bar()
@@ -73,6 +159,7 @@ class MainWindow(QMainWindow):
         
         # Data loading thread
         self.loading_thread = None
+        self.export_thread = None
     
     def setup_control_panel(self, main_layout):
         """Kontrol panelini oluşturur"""
@@ -98,11 +185,42 @@ class MainWindow(QMainWindow):
         self.lon_input.setMaximumWidth(100)
         control_layout.addWidget(self.lon_input)
         
-        # Haritayı yükle butonu
+        # Haritayı yükle butonu (3D widget hazır olunca etkinleşir)
         self.load_button = QPushButton("3D Haritayı Yükle")
+        self.load_button.setEnabled(False)
         self.load_button.clicked.connect(self.load_map)
         control_layout.addWidget(self.load_button)
         
+        # Akışlı gezinme: yükleme butonu olmadan kaydırdıkça çevre karolar yüklenir
+        self.stream_button = QPushButton("Akışlı Gezinme")
+        self.stream_button.setCheckable(True)
+        self.stream_button.setEnabled(False)
+        self.stream_button.toggled.connect(self.toggle_streaming)
+        control_layout.addWidget(self.stream_button)
+        
+        # Kamera uçuşu: anahtar kare veya rota dosyası (JSON)
+        self.flight_button = QPushButton("Uçuş Yolu...")
+        self.flight_button.setEnabled(False)
+        self.flight_button.clicked.connect(self.play_flight)
+        control_layout.addWidget(self.flight_button)
+        
+        # Yüklü araziyi glTF/OBJ/STL olarak dışa aktar
+        self.export_button = QPushButton("Dışa Aktar...")
+        self.export_button.setEnabled(False)
+        self.export_button.clicked.connect(self.export_terrain)
+        control_layout.addWidget(self.export_button)
+        
+        # Eş yükselti eğrileri aralığı (metre)
+        control_layout.addWidget(QLabel("Eş Yükselti:"))
+        self.contour_combo = QComboBox()
+        self.contour_combo.addItem("Kapalı", 0)
+        for interval in CONTOUR_SETTINGS['INTERVAL_CHOICES']:
+            self.contour_combo.addItem(f"{interval} m", interval)
+        self.contour_combo.setCurrentIndex(max(0, self.contour_combo.findData(CONTOUR_SETTINGS['INTERVAL'])))
+        self.contour_combo.setEnabled(False)
+        self.contour_combo.currentIndexChanged.connect(self.change_contour_interval)
+        control_layout.addWidget(self.contour_combo)
+        
         # Progress bar
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -117,23 +235,126 @@ class MainWindow(QMainWindow):
         
         main_layout.addWidget(control_panel)
     
+    def init_map_widget(self):
+        """OpenGL widget'ını oluşturur ve yer tutucunun yerine koyar (ilk çizimden sonra)"""
+        if self.map_widget is not None:
+            return
+        
+        from map_widget import Map3DWidget
+        
+        self.map_widget = Map3DWidget()
+        self.map_widget.terrain_picked.connect(self.on_terrain_picked)
+        self.main_layout.replaceWidget(self.map_placeholder, self.map_widget)
+        self.main_layout.setStretchFactor(self.map_widget, 1)
+        self.map_placeholder.deleteLater()
+        self.map_placeholder = None
+        self.load_button.setEnabled(True)
+        self.stream_button.setEnabled(True)
+        self.flight_button.setEnabled(True)
+        self.contour_combo.setEnabled(True)
+        self.export_button.setEnabled(True)
+    
     def setup_status_bar(self):
         """Status bar'ı oluşturur"""
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Koordinat girin ve '3D Haritayı Yükle' butonuna tıklayın")
     
+    def read_coordinates(self):
+        """Girilen enlem/boylamı doğrular; geçersizse ValueError"""
+        lat = float(self.lat_input.text())
+        lon = float(self.lon_input.text())
+        
+        # Koordinat doğrulaması
+        if not (-90 <= lat <= 90):
+            raise ValueError("Enlem -90 ile 90 arasında olmalıdır")
+        if not (-180 <= lon <= 180):
+            raise ValueError("Boylam -180 ile 180 arasında olmalıdır")
+        return lat, lon
+    
+    def toggle_streaming(self, enabled):
+        """Akışlı gezinme modunu girilen koordinattan başlatır veya kapatır"""
+        if not enabled:
+            self.map_widget.disable_streaming()
+            self.status_bar.clearMessage()
+            return
+        
+        try:
+            lat, lon = self.read_coordinates()
+        except ValueError as e:
+            QMessageBox.warning(self, "Hata", f"Geçersiz koordinat: {str(e)}")
+            self.stream_button.setChecked(False)
+            return
+        
+        self.map_widget.enable_streaming(lat, lon)
+        self.status_bar.showMessage("Akışlı gezinme: sağ tık+sürükle ile kaydırdıkça çevre yüklenir")
+    
+    def change_contour_interval(self, index):
+        """Seçilen aralıkla konturlar arka planda yeniden hesaplanır; çizim beklemez"""
+        self.map_widget.set_contour_interval(self.contour_combo.itemData(index))
+    
+    def export_terrain(self):
+        """Yüklü araziyi seçilen dosyaya arka planda aktarır"""
+        if self.map_widget.elevation_data is None:
+            QMessageBox.information(self, "Dışa Aktar", "Önce '3D Haritayı Yükle' ile arazi yükleyin")
+            return
+        
+        path, _ = QFileDialog.getSaveFileName(self, "Dışa Aktar", "terrain.glb",
+                                              "glTF (*.glb);;OBJ (*.obj);;STL (*.stl)")
+        if not path:
+            return
+        
+        self.export_button.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.status_bar.showMessage("Arazi dışa aktarılıyor...")
+        
+        self.export_thread = ExportThread(path, self.map_widget)
+        self.export_thread.progress_updated.connect(self.progress_bar.setValue)
+        self.export_thread.export_finished.connect(self.on_export_finished)
+        self.export_thread.error_occurred.connect(self.on_export_error)
+        self.export_thread.start()
+    
+    def on_export_finished(self, written):
+        self.export_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.status_bar.showMessage(f"Dışa aktarıldı: {', '.join(written)}")
+    
+    def on_export_error(self, message):
+        self.export_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.status_bar.clearMessage()
+        QMessageBox.critical(self, "Hata", f"Dışa aktarma başarısız: {message}")
+    
+    def play_flight(self):
+        """Seçilen uçuş dosyasını oynatır (P: duraklat, Esc: durdur)"""
+        from camera_flight import load_flight_keyframes
+        
+        path, _ = QFileDialog.getOpenFileName(self, "Uçuş Yolu", "", "JSON (*.json)")
+        if not path:
+            return
+        
+        try:
+            keyframes = load_flight_keyframes(path)
+            self.map_widget.play_flight(keyframes)
+        except (OSError, ValueError, KeyError) as e:
+            QMessageBox.warning(self, "Hata", f"Uçuş yolu okunamadı: {str(e)}")
+            return
+        
+        # Coğrafi yollar akış modunu açar; butonu yeniden başlatmadan eşitle
+        self.stream_button.blockSignals(True)
+        self.stream_button.setChecked(self.map_widget.streamer is not None)
+        self.stream_button.blockSignals(False)
+        self.map_widget.setFocus()
+        self.status_bar.showMessage("Uçuş oynatılıyor (P: duraklat, Esc: durdur)")
+    
     def load_map(self):
         """Harita verilerini yükler"""
         try:
-            lat = float(self.lat_input.text())
-            lon = float(self.lon_input.text())
+            lat, lon = self.read_coordinates()
             
-            # Koordinat doğrulaması
-            if not (-90 <= lat <= 90):
-                raise ValueError("Enlem -90 ile 90 arasında olmalıdır")
-            if not (-180 <= lon <= 180):
-                raise ValueError("Boylam -180 ile 180 arasında olmalıdır")
+            # Tek parça yükleme akış modunu kapatır
+            self.stream_button.setChecked(False)
             
             # UI'yi loading moduna al
             self.load_button.setEnabled(False)
@@ -142,7 +363,14 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Harita verileri yükleniyor...")
             
             # Loading thread'i başlat
-            self.loading_thread = DataLoadingThread(lat, lon)
+            # Grid boyutu ve tile zoom'u ölçülen yükleme sürelerine göre seçilir
+            quality = self.map_widget.quality_governor.load_settings()
+            self.loading_thread = DataLoadingThread(lat, lon, quality['tile_zoom'],
+                                                    quality['terrain_size'],
+                                                    self.map_widget.height_scale)
+            self.loading_thread.elevation_loaded.connect(self.on_elevation_loaded)
+            self.loading_thread.tile_loaded.connect(self.map_widget.update_texture_tile)
+            self.loading_thread.lightmap_loaded.connect(self.map_widget.set_lightmap)
             self.loading_thread.data_loaded.connect(self.on_data_loaded)
             self.loading_thread.progress_updated.connect(self.progress_bar.setValue)
             self.loading_thread.error_occurred.connect(self.on_loading_error)
@@ -151,17 +379,60 @@ class MainWindow(QMainWindow):
         except ValueError as e:
             QMessageBox.warning(self, "Hata", f"Geçersiz koordinat: {str(e)}")
     
+    def on_elevation_loaded(self, data):
+        """Elevation verisi geldiğinde araziyi gösterir, texture tile'ları sonradan akar"""
+        elevation_data, terrain_bounds, tile_bounds, pyramid = data
+        
+        # 3D widget'a verileri gönder
+        self.map_widget.load_terrain_data(elevation_data, terrain_bounds=terrain_bounds,
+                                          tile_bounds=tile_bounds)
+        self.map_widget.set_elevation_pyramid(pyramid)
+    
     def on_data_loaded(self, data):
         """Veri yükleme tamamlandığında çağrılır"""
+        # Arazi on_elevation_loaded'da yüklendi, tile'lar texture'a yerinde yazıldı;
+        # birleştirilmiş görüntü yeniden yüklenmez
         elevation_data, texture_data = data
+        self.map_widget.texture_data = texture_data
         
-        # 3D widget'a verileri gönder
-        self.map_widget.load_terrain_data(elevation_data, texture_data)
+        thread = self.loading_thread
+        self.map_widget.quality_governor.record_load(thread.elevation_seconds, thread.tiles_seconds,
+                                                     thread.terrain_size, thread.elevation_source)
         
         # UI'yi normal moda al
         self.load_button.setEnabled(True)
         self.progress_bar.setVisible(False)
         self.status_bar.showMessage("3D harita yüklendi. Fare ile etkileşime geçebilirsiniz.")
+        self.report_trace()
+    
+    def report_trace(self):
+        """İzleme açıksa yükleme özetini loglar ve istenirse Chrome trace yazar"""
+        from pipeline_trace import tracer
+        
+        if not tracer.enabled:
+            return
+        tracer.log_summary("Yükleme aşamaları")
+        export_path = DEBUG_SETTINGS['TRACE_EXPORT_PATH']
+        if export_path:
+            try:
+                tracer.export_chrome_trace(export_path)
+            except OSError as e:
+                print(f"Trace dosyası yazılamadı: {e}")
+        # Henüz çizilmemiş mesh aşamaları bir sonraki özete kalır
+        tracer.reset()
+    
+    def on_terrain_picked(self, picked):
+        """Fare altındaki noktanın konum ve yüksekliğini status bar'da gösterir"""
+        if picked is None:
+            self.status_bar.clearMessage()
+            return
+        
+        if picked['lat'] is not None:
+            self.status_bar.showMessage(
+                f"Enlem: {picked['lat']:.5f}  Boylam: {picked['lon']:.5f}  "
+                f"Yükseklik: {picked['elevation']:.1f} m")
+        else:
+            self.status_bar.showMessage(f"Yükseklik: {picked['elevation']:.1f} m")
     
     def on_loading_error(self, error_message):
         """Veri yükleme hatası durumunda çağrılır"""
@@ -175,9 +446,16 @@ def main():
     app = QApplication(sys.argv)
     app.setApplicationName("3D Harita Görüntüleyici")
     
-    # Ana pencereyi oluştur ve göster
+    # Ana pencereyi oluştur, göster ve ilk çizimi hemen yap
     window = MainWindow()
     window.show()
+    app.processEvents()
+    
+    # Ağır modüller (numpy, OpenGL, requests, PIL) pencere ekrana geldikten sonra yüklenir
+    from utils import setup_logging
+    setup_logging()
+    threading.Thread(target=warm_up_imports, name='import-warmup', daemon=True).start()
+    QTimer.singleShot(0, window.init_map_widget)
     
     sys.exit(app.exec())
 
@@ -1,43 +1,90 @@
 """
 Harita Veri Yükleyici - Elevation ve texture verilerini çevrimiçi kaynaklardan alır
+
+requests ve PIL ilk kullanımda import edilir; modül Qt/GL olmadan ve hızlı yüklenir.
 """
 
-import requests
 import numpy as np
-from PIL import Image
 import io
-import math
 import time
 import os
 from concurrent.futures import ThreadPoolExecutor
 import threading
 
+import geo_math
+from cache_manager import get_cache_manager
+from config import API_SETTINGS, APP_SETTINGS, DEM_SETTINGS, ELEVATION_SETTINGS, RENDER_SETTINGS
+from dem_raster import LocalDEMSource
+from elevation_pyramid import ElevationPyramid, level_digest
+from pipeline_trace import tracer
+from utils import elevation_dtype, save_elevation, load_elevation
+
 
 class MapDataLoader:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'PyQt6-3D-Map-Viewer/1.0'
-        })
+    def __init__(self, cache_dir=None):
+        # HTTP session ilk istekte oluşturulur
+        self._session = None
+        
+        # Uç noktalar oluşturma anında API_SETTINGS'ten okunur
+        self.elevation_api_url = API_SETTINGS['ELEVATION_API_URL']
+        self.tile_url = API_SETTINGS['OSM_TILE_URL']
         
         # Cache dizini
-        self.cache_dir = "cache"
+        self.cache_dir = cache_dir or APP_SETTINGS['CACHE_DIR']
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.cache = get_cache_manager(self.cache_dir)
+        
+        # Yerel DEM (yapılandırılmışsa ilk kullanımda açılır)
+        self.local_dem = None
+        self.local_dem_path = DEM_SETTINGS['LOCAL_DEM_PATH']
+        
+        # Son get_elevation_data çağrısının gerçek coğrafi sınırları ve kaynağı
+        # ('local', 'cache', 'api' veya 'fake')
+        self.last_elevation_bounds = None
+        self.last_elevation_source = None
+    
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({
+                'User-Agent': 'PyQt6-3D-Map-Viewer/1.0'
+            })
+        return self._session
     
     def get_elevation_data(self, lat, lon, size=50):
         """
         Elevation verilerini alır
-        Open-Elevation API kullanır (ücretsiz)
+        Open-Elevation API kullanır (ücretsiz); yerel DEM yapılandırılmışsa
+        ve konumu kapsıyorsa önce oradan okur
         """
+        with tracer.span('elevation', size=size) as span:
+            elevation_data = self._fetch_elevation_data(lat, lon, size)
+            span.annotate(source=self.last_elevation_source, bytes=elevation_data.nbytes)
+        return elevation_data
+    
+    def _fetch_elevation_data(self, lat, lon, size):
+        """Kaynak sırası: yerel DEM, cache, Open-Elevation API, sahte veri"""
+        self.last_elevation_bounds = self.get_terrain_bounds(lat, lon, size)
+        
+        with tracer.span('elevation.local'):
+            local_data = self.get_local_elevation_data(lat, lon, size)
+        if local_data is not None:
+            self.last_elevation_source = 'local'
+            return local_data
+        
+        cache_key = f"elev_{lat:.5f}_{lon:.5f}_{size}.npz"
+        cached = self._load_cached_elevation(cache_key)
+        if cached is not None:
+            self.last_elevation_source = 'cache'
+            return cached
+        
         try:
             # Grid oluştur
-            grid_size = 0.01  # Yaklaşık 1km
-            half_size = grid_size * size / 2
-            
-            lats = np.linspace(lat - half_size, lat + half_size, size)
-            lons = np.linspace(lon - half_size, lon + half_size, size)
+            lats, lons = self._elevation_grid_axes(lat, lon, size)
             
-            elevation_data = np.zeros((size, size))
+            elevation_data = np.zeros((size, size), dtype=elevation_dtype())
             
             # Batch istekleri için koordinatları hazırla
             coordinates = []
@@ -51,7 +98,7 @@ class MapDataLoader:
                     })
             
             # Batch olarak elevation verilerini al
-            batch_size = 100  # API limitlerini aşmamak için
+            batch_size = API_SETTINGS['BATCH_SIZE']  # API limitlerini aşmamak için
             
             for batch_start in range(0, len(coordinates), batch_size):
                 batch_coords = coordinates[batch_start:batch_start + batch_size]
@@ -61,11 +108,15 @@ class MapDataLoader:
                            for coord in batch_coords]
                 
                 try:
-                    response = self.session.post(
-                        'https://api.open-elevation.com/api/v1/lookup',
-                        json={'locations': locations},
-                        timeout=30
-                    )
+                    with tracer.span('elevation.api', points=len(locations)) as span:
+                        response = self.session.post(
+                            self.elevation_api_url,
+                            json={'locations': locations},
+                            timeout=API_SETTINGS['REQUEST_TIMEOUT']
+                        )
+                        # elapsed: bağlantı + sunucu yanıt başlıklarına kadar geçen süre
+                        span.annotate(status=response.status_code, bytes=len(response.content),
+                                      headers_ms=response.elapsed.total_seconds() * 1000)
                     
                     if response.status_code == 200:
                         results = response.json()['results']
@@ -85,61 +136,223 @@ class MapDataLoader:
                     return self._generate_fake_elevation_data(lat, lon, size)
                 
                 # API rate limiting için kısa bekleme
-                time.sleep(0.1)
+                if API_SETTINGS['RATE_LIMIT_DELAY']:
+                    time.sleep(API_SETTINGS['RATE_LIMIT_DELAY'])
             
+            self._store_cached_elevation(cache_key, elevation_data)
+            self.last_elevation_source = 'api'
             return elevation_data
             
         except Exception as e:
             print(f"Elevation veri yükleme hatası: {e}")
             return self._generate_fake_elevation_data(lat, lon, size)
     
+    def get_elevation_pyramid(self, lat, lon, size=50, method='mean'):
+        """
+        Elevation grid'ini ve 2x küçültülmüş overview seviyelerini döndürür.
+        
+        Overview'lar elevation cache'inin yanında, seviye 0'ın içerik özetiyle
+        anahtarlanarak saklanır; yalnızca aynı grid'den üretilmiş overview'lar
+        tekrar kullanılır. Sahte veri için cache kullanılmaz.
+        """
+        elevation_data = self.get_elevation_data(lat, lon, size)
+        bounds = self.last_elevation_bounds
+        if self.last_elevation_source == 'fake':
+            with tracer.span('elevation.pyramid_build'):
+                return ElevationPyramid.build(elevation_data, bounds, method)
+        
+        cache_key = self._pyramid_cache_key(lat, lon, size, method, level_digest(elevation_data))
+        with tracer.span('elevation.pyramid_cache') as span:
+            cache_file = self.cache.lookup(cache_key)
+            span.annotate(cache='miss' if cache_file is None else 'hit')
+            if cache_file is not None:
+                try:
+                    pyramid = ElevationPyramid.from_file(cache_file, elevation_data, bounds)
+                    if len(pyramid) > 1:
+                        return pyramid
+                except Exception:
+                    pass
+                self.cache.invalidate(cache_key)
+                span.annotate(cache='miss', invalid=True)
+        
+        with tracer.span('elevation.pyramid_build'):
+            pyramid = ElevationPyramid.build(elevation_data, bounds, method)
+        self.store_elevation_pyramid(lat, lon, size, pyramid)
+        return pyramid
+    
+    def _pyramid_cache_key(self, lat, lon, size, method, digest):
+        return f"elev_{lat:.5f}_{lon:.5f}_{size}_pyr_{method}_{digest}.npz"
+    
+    def store_elevation_pyramid(self, lat, lon, size, pyramid):
+        """Overview seviyelerini seviye 0'ın içerik özetiyle elevation cache'inin yanına yazar"""
+        if len(pyramid) < 2:
+            return
+        key = self._pyramid_cache_key(lat, lon, size, pyramid.method, level_digest(pyramid[0]))
+        try:
+            self.cache.store_bytes(key, pyramid.to_bytes())
+        except OSError as e:
+            print(f"Elevation piramidi cache'e yazılamadı: {e}")
+    
+    def get_local_elevation_data(self, lat, lon, size=50):
+        """
+        Yerel DEM'den en fazla size x size örneklik pencere okur.
+        
+        Dönen dizi memory-mapped dosya üzerinde bir view'dır (nodata yoksa
+        kopya oluşmaz); DEM yoksa veya konumu kapsamıyorsa None.
+        """
+        if not self.local_dem_path:
+            return None
+        
+        try:
+            if self.local_dem is None:
+                self.local_dem = LocalDEMSource(self.local_dem_path)
+            
+            bounds = self.get_terrain_bounds(lat, lon, size)
+            if not self.local_dem.contains(lat, lon):
+                return None
+            
+            view, window_bounds = self.local_dem.read_grid(
+                bounds['south'], bounds['west'], bounds['north'], bounds['east'], size)
+        except (OSError, ValueError) as e:
+            print(f"Yerel DEM okunamadı: {e}")
+            return None
+        
+        self.last_elevation_bounds = window_bounds
+        
+        nodata = self.local_dem.nodata
+        if nodata is not None:
+            mask = np.isnan(view) if np.isnan(nodata) else view == nodata
+            if mask.any():
+                # Sadece nodata içeren pencereler kopyalanır
+                view = np.where(mask, 0, view).astype(elevation_dtype())
+        return view
+    
+    def _load_cached_elevation(self, cache_key):
+        """Cache'teki elevation grid'ini döndürür, yoksa None"""
+        with tracer.span('elevation.cache') as span:
+            cache_file = self.cache.lookup(cache_key)
+            if cache_file is None:
+                span.annotate(cache='miss')
+                return None
+            
+            try:
+                elevation_data = load_elevation(cache_file)
+            except Exception:
+                self.cache.invalidate(cache_key)  # Bozuk cache dosyasını sil
+                span.annotate(cache='miss', invalid=True)
+                return None
+            span.annotate(cache='hit', bytes=os.path.getsize(cache_file))
+            return elevation_data
+    
+    def _store_cached_elevation(self, cache_key, elevation_data):
+        """Elevation grid'ini ortak cache'e (varsayılan olarak int16 kuantize) yazar"""
+        buffer = io.BytesIO()
+        save_elevation(buffer, elevation_data)
+        try:
+            self.cache.store_bytes(cache_key, buffer.getvalue())
+        except OSError as e:
+            print(f"Elevation cache yazılamadı: {e}")
+    
+    def _elevation_grid_axes(self, lat, lon, size):
+        """Elevation grid'inin enlem/boylam eksenlerini döndürür"""
+        half_size = ELEVATION_SETTINGS['GRID_SPACING_DEG'] * size / 2
+        
+        lats = np.linspace(lat - half_size, lat + half_size, size)
+        lons = np.linspace(lon - half_size, lon + half_size, size)
+        return lats, lons
+    
+    def get_terrain_bounds(self, lat, lon, size=50):
+        """Elevation grid'inin kapsadığı coğrafi sınırları döndürür"""
+        lats, lons = self._elevation_grid_axes(lat, lon, size)
+        return {
+            'south': float(lats[0]),
+            'north': float(lats[-1]),
+            'west': float(lons[0]),
+            'east': float(lons[-1]),
+        }
+    
+    def get_tile_bounds(self, lat, lon, zoom_level=14, size=50, tile_size=256):
+        """
+        get_map_tiles'ın birleştirdiği tile grid'inin Web Mercator sınırları.
+        
+        Grid, size boyutlu elevation grid'inin sınırlarını kapsayan tile
+        aralığıdır. Aralık her eksende MAX_TILE_GRID tile'ı aşacaksa zoom
+        düşürülür; kullanılan zoom sonuçtaki 'zoom' değeridir.
+        """
+        return self.tile_bounds_for(self.get_terrain_bounds(lat, lon, size), zoom_level, tile_size)
+    
+    def tile_bounds_for(self, terrain_bounds, zoom_level=14, tile_size=256):
+        """Coğrafi sınırları kapsayan tile grid'i (get_tile_bounds)"""
+        box = (terrain_bounds['south'], terrain_bounds['west'],
+               terrain_bounds['north'], terrain_bounds['east'])
+        zoom = geo_math.coverage_zoom(*box, RENDER_SETTINGS['MAX_TILE_GRID'], zoom_level)
+        x_min, y_min, x_max, y_max = geo_math.tile_range_for_bbox(*box, zoom)
+        return {
+            'zoom': zoom,
+            'x0': x_min,
+            'y0': y_min,
+            'cols': x_max - x_min + 1,
+            'rows': y_max - y_min + 1,
+            'tile_size': tile_size,
+        }
+    
     def _generate_fake_elevation_data(self, lat, lon, size):
         """Gerçek veri alınamazsa sahte elevation verisi oluşturur"""
+        self.last_elevation_source = 'fake'
         print("Sahte elevation verisi oluşturuluyor...")
+        with tracer.span('elevation.fake'):
+            return self._build_fake_elevation_data(size)
+    
+    def _build_fake_elevation_data(self, size):
         
-        # Perlin noise benzeri sahte veri
-        elevation_data = np.zeros((size, size))
+        # Perlin noise benzeri sahte veri (birden fazla frekans ile)
+        dtype = elevation_dtype()
+        x = (np.arange(size, dtype=dtype) / size * 4)[:, np.newaxis]
+        y = (np.arange(size, dtype=dtype) / size * 4)[np.newaxis, :]
         
-        for i in range(size):
-            for j in range(size):
-                # Birden fazla frekans ile noise
-                x = i / size * 4
-                y = j / size * 4
-                
-                elevation = 0
-                elevation += 50 * math.sin(x * 2) * math.cos(y * 2)
-                elevation += 25 * math.sin(x * 4) * math.cos(y * 4)
-                elevation += 10 * math.sin(x * 8) * math.cos(y * 8)
-                elevation += np.random.normal(0, 5)  # Noise
-                
-                # Deniz seviyesinin altına inmemesi için
-                elevation = max(0, elevation + 100)
-                elevation_data[i, j] = elevation
+        elevation_data = 50 * np.sin(x * 2) * np.cos(y * 2)
+        elevation_data += 25 * np.sin(x * 4) * np.cos(y * 4)
+        elevation_data += 10 * np.sin(x * 8) * np.cos(y * 8)
+        elevation_data += np.random.normal(0, 5, (size, size)).astype(dtype)  # Noise
+        
+        # Deniz seviyesinin altına inmemesi için
+        elevation_data += 100
+        np.maximum(elevation_data, 0, out=elevation_data)
         
         return elevation_data
     
-    def get_map_tiles(self, lat, lon, zoom_level=14):
+    def get_map_tiles(self, lat, lon, zoom_level=14, tile_callback=None, size=50):
         """
         OpenStreetMap tile'larını alır ve birleştirir
+        
+        Birleştirilen grid, size boyutlu elevation grid'ini kapsar
+        (get_tile_bounds). tile_callback verilirse her tile geldiğinde
+        (grid_col, grid_row, image) ile çağrılır; widget tile'ı texture'a
+        yerinde yazabilir.
         """
+        tile_bounds = self.get_tile_bounds(lat, lon, zoom_level, size)
+        with tracer.span('tiles', zoom=tile_bounds['zoom']):
+            return self._fetch_map_tiles(tile_bounds, tile_callback)
+    
+    def _fetch_map_tiles(self, tile_bounds, tile_callback):
+        from PIL import Image
+        
         try:
-            # Tile koordinatlarını hesapla
-            tile_x, tile_y = self._deg2tile(lat, lon, zoom_level)
-            
-            # 3x3 tile grid al
             tiles = []
-            tile_size = 256
-            grid_size = 3
+            tile_size = tile_bounds['tile_size']
+            zoom_level = tile_bounds['zoom']
             
-            for dy in range(-1, 2):
+            for grid_row in range(tile_bounds['rows']):
                 row = []
-                for dx in range(-1, 2):
-                    tx = tile_x + dx
-                    ty = tile_y + dy
+                for grid_col in range(tile_bounds['cols']):
+                    tx = tile_bounds['x0'] + grid_col
+                    ty = tile_bounds['y0'] + grid_row
                     
                     tile_data = self._get_tile(tx, ty, zoom_level)
                     if tile_data:
                         row.append(tile_data)
+                        if tile_callback is not None:
+                            tile_callback(grid_col, grid_row, tile_data)
                     else:
                         # Boş tile için placeholder
                         placeholder = Image.new('RGB', (tile_size, tile_size), (200, 200, 200))
@@ -148,7 +361,8 @@ class MapDataLoader:
                 tiles.append(row)
             
             # Tile'ları birleştir
-            combined_image = self._combine_tiles(tiles)
+            with tracer.span('tiles.combine'):
+                combined_image = self._combine_tiles(tiles)
             return combined_image
             
         except Exception as e:
@@ -158,33 +372,47 @@ class MapDataLoader:
     
     def _deg2tile(self, lat, lon, zoom):
         """Lat/lon'u tile koordinatlarına çevirir"""
-        lat_rad = math.radians(lat)
-        n = 2.0 ** zoom
-        x = int((lon + 180.0) / 360.0 * n)
-        y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
-        return x, y
+        x, y = geo_math.lat_lon_to_tile(lat, lon, zoom)
+        return int(x), int(y)
     
     def _get_tile(self, x, y, z):
         """Tek bir OSM tile'ını indirir"""
-        cache_file = os.path.join(self.cache_dir, f"tile_{z}_{x}_{y}.png")
+        with tracer.span('tile', x=x, y=y, z=z) as span:
+            return self._fetch_tile(x, y, z, span)
+    
+    def _fetch_tile(self, x, y, z, span):
+        from PIL import Image
+        
+        cache_key = f"tile_{z}_{x}_{y}.png"
         
         # Cache'den kontrol et
-        if os.path.exists(cache_file):
+        cache_file = self.cache.lookup(cache_key)
+        if cache_file is not None:
             try:
-                return Image.open(cache_file)
-            except:
-                os.remove(cache_file)  # Bozuk cache dosyasını sil
+                with tracer.span('tile.decode'):
+                    image = Image.open(cache_file)
+                    image.load()  # Dosya arka planda silinmeden önce oku
+                span.annotate(cache='hit')
+                return image
+            except Exception:
+                self.cache.invalidate(cache_key)  # Bozuk cache dosyasını sil
+        span.annotate(cache='miss')
         
         # OSM sunucusundan indir
-        url = f"https://tile.openstreetmap.org/{z}/{x}/{y}.png"
+        url = self.tile_url.format(z=z, x=x, y=y)
         
         try:
-            response = self.session.get(url, timeout=10)
+            with tracer.span('tile.download') as download_span:
+                response = self.session.get(url, timeout=API_SETTINGS['TILE_TIMEOUT'])
+                download_span.annotate(status=response.status_code, bytes=len(response.content),
+                                       headers_ms=response.elapsed.total_seconds() * 1000)
             if response.status_code == 200:
-                image = Image.open(io.BytesIO(response.content))
+                with tracer.span('tile.decode'):
+                    image = Image.open(io.BytesIO(response.content))
+                    image.load()
                 
-                # Cache'e kaydet
-                image.save(cache_file)
+                # Cache'e kaydet (indirilen PNG olduğu gibi yazılır)
+                self.cache.store_bytes(cache_key, response.content)
                 return image
             else:
                 print(f"Tile indirme hatası: {response.status_code} for {url}")
@@ -196,6 +424,8 @@ class MapDataLoader:
     
     def _combine_tiles(self, tiles):
         """Tile'ları birleştirerek tek görüntü oluşturur"""
+        from PIL import Image
+        
         if not tiles or not tiles[0]:
             return self._generate_gradient_texture()
         
@@ -220,6 +450,8 @@ class MapDataLoader:
     
     def _generate_gradient_texture(self):
         """Basit gradient texture oluşturur"""
+        from PIL import Image
+        
         size = 512
         image = Image.new('RGB', (size, size))
         pixels = []
@@ -3,15 +3,138 @@
 """
 
 import numpy as np
-from PyQt6.QtOpenGL import QOpenGLWidget
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QMouseEvent, QWheelEvent
+from PIL import Image
+from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+from PyQt6.QtCore import QObject, Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QGuiApplication, QMouseEvent, QWheelEvent, QPainter, QColor, QFont
 from OpenGL.GL import *
-from OpenGL.GLU import *
+from OpenGL.GLU import gluLookAt, gluPerspective
 import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import (PERFORMANCE_SETTINGS, DEBUG_SETTINGS, RENDER_SETTINGS, QUALITY_SETTINGS,
+                    LIGHTMAP_SETTINGS, CONTOUR_SETTINGS)
+from frame_scheduler import FrameScheduler
+from quality_governor import QualityGovernor
+from render_stats import RenderStats
+from terrain_picking import HeightfieldPicker
+from utils import as_elevation_array, logger
+from terrain_mesh import build_terrain_mesh, compute_terrain_uvs, TERRAIN_EXTENT
+from mesh_cache import MeshCache, mesh_cache_key
+from pipeline_trace import tracer
+from terrain_texture import TerrainTexture, LightmapTexture
+from terrain_streaming import TerrainStreamer
+from camera_flight import FlightPath, FlightPlayer, FlightPrefetcher
+from terrain_contours import ContourBuilder
+
+
+class TerrainLevelBuilder(QObject):
+    """
+    LOD seviyesi değişince yeni seviyenin mesh'ini (cache'ten okuma veya
+    oluşturma) tek bir arka plan thread'inde hazırlar; çizim eski seviyeyle
+    sürer. Hazır olunca level_ready (istek numarası, seviye, TerrainMesh)
+    ana thread'e iletilir, paintGL yalnızca GPU'ya aktarır.
+    """
+
+    level_ready = pyqtSignal(int, int, object)
+
+    def __init__(self):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='terrain-lod')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._closed = False
+
+    def request(self, level, build):
+        """build() ile seviye mesh'ini hazırlatır; önceki istekleri geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._executor.submit(self._run_job, generation, level, build)
+
+    def cancel(self):
+        """Bekleyen sonuçları geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation and not self._closed
+
+    def _run_job(self, generation, level, build):
+        if not self.is_current(generation):
+            return
+        try:
+            mesh = build()
+        except Exception as e:
+            logger.warning(f"LOD seviyesi {level} hazırlanamadı: {e}")
+            return
+        if self.is_current(generation):
+            self.level_ready.emit(generation, level, mesh)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class PickerBuilder(QObject):
+    """
+    Yüklenen grid'in picking piramidini tek bir arka plan thread'inde
+    oluşturur (4k² grid'de ~1 sn); hazır olunca picker_ready (istek
+    numarası, HeightfieldPicker) ana thread'e iletilir.
+    """
+
+    picker_ready = pyqtSignal(int, object)
+
+    def __init__(self):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='terrain-picker')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._closed = False
+
+    def request(self, elevation_data):
+        """Grid için picker hazırlatır; önceki istekleri geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._executor.submit(self._run_job, generation, elevation_data)
+
+    def cancel(self):
+        """Bekleyen sonuçları geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation and not self._closed
+
+    def _run_job(self, generation, elevation_data):
+        if not self.is_current(generation):
+            return
+        try:
+            picker = HeightfieldPicker(elevation_data)
+        except Exception as e:
+            logger.warning(f"Picking piramidi oluşturulamadı: {e}")
+            return
+        if self.is_current(generation):
+            self.picker_ready.emit(generation, picker)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 class Map3DWidget(QOpenGLWidget):
+    # Fare altındaki nokta: {'lat', 'lon', 'elevation'} veya arazi dışındaysa None
+    terrain_picked = pyqtSignal(object)
+    
+    FOV_Y = 45.0
+    TERRAIN_EXTENT = TERRAIN_EXTENT
+    
     def __init__(self):
         super().__init__()
         
@@ -25,35 +148,107 @@ class Map3DWidget(QOpenGLWidget):
         # Mouse kontrolü
         self.last_mouse_pos = None
         self.mouse_sensitivity = 0.5
+        self.wireframe = False  # W/S tuşları; setup_gl_state her frame uygular
+        self._viewport_size = None  # resizeGL'deki (device pixel) boyut
+        self.setMouseTracking(True)  # Tuşa basmadan picking için
         
         # Terrain verileri
         self.elevation_data = None
         self.texture_data = None
-        self.terrain_size = 50  # Grid boyutu
-        self.height_scale = 0.1  # Yükseklik ölçeği
+        self.terrain_bounds = None
+        self.tile_bounds = None
+        self.terrain_uvs = None
+        self.terrain_texture = TerrainTexture(use_pbo=PERFORMANCE_SETTINGS['USE_PBO'])
+        self.terrain_size = None  # Yüklü grid boyutu (QualityGovernor.load_settings ile seçilir)
         
-        # Render listesi
+        # Önceden hesaplanmış ışık haritası varsa GL_LIGHT0 yerine kullanılır (L tuşu)
+        self.lightmap = LightmapTexture()
+        self.use_lightmap = LIGHTMAP_SETTINGS['ENABLED']
+        self.height_scale = RENDER_SETTINGS['HEIGHT_SCALE']  # Yükseklik ölçeği
+        
+        # Picking için max yükseklik piramidi; yükleme sonrası arka planda
+        # oluşturulur, hazır olana kadar pick None döndürür
+        self.picker = None
+        self.picker_builder = PickerBuilder()
+        self.picker_builder.picker_ready.connect(self.set_picker)
+        
+        # Uzaklaşınca kaba seviyeler çizilir (set_elevation_pyramid)
+        self.elevation_pyramid = None
+        self.terrain_list_level = 0
+        
+        # Seviye değişimi: yeni seviye arka planda hazırlanır, hazır olunca değiştirilir
+        self.level_builder = TerrainLevelBuilder()
+        self.level_builder.level_ready.connect(self.set_terrain_level)
+        self._building_level = None  # Arka planda hazırlanan seviye
+        self._ready_level = None  # (seviye, TerrainMesh): bir sonraki çizimde GPU'ya aktarılır
+        
+        # Render listesi (USE_VBO açıksa display list yerine vertex buffer'lar)
         self.terrain_list = None
+        self.terrain_vbos = None
+        self.terrain_index_count = 0
+        self.terrain_mesh = None
+        self.mesh_cache = MeshCache()
+        self._stale_lists = []  # Context aktifken silinecek eski display list'ler
+        self._stale_buffers = []  # Context aktifken silinecek eski vertex buffer'lar
+        self._stale_textures = []  # Context aktifken silinecek akış karosu texture'ları
+        self.terrain_triangle_count = 0
+        
+        # Eş yükselti eğrileri: arka planda hesaplanır, tek statik buffer'dan çizilir
+        self.contour_interval = CONTOUR_SETTINGS['INTERVAL']
+        self.contour_lines = None
+        self.contour_buffer = None  # {'vbo' veya 'list', 'firsts', 'counts'}
+        self._contours_dirty = False
+        self.contour_builder = ContourBuilder()
+        self.contour_builder.contours_ready.connect(self.set_contours)
+        
+        # Akış modu: kamera hedefi çevresindeki karolar (enable_streaming)
+        self.streamer = None
         
-        # Animation timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update)
-        self.timer.start(16)  # ~60 FPS
+        # Oynatılan kamera uçuşu (play_flight)
+        self.flight = None
+        
+        # Performans ölçümü
+        self.render_stats = RenderStats()
+        self.show_stats_overlay = DEBUG_SETTINGS['SHOW_STATS_OVERLAY']
+        
+        # Talep üzerine çizim; sahne değişmedikçe repaint yapılmaz
+        self.frame_scheduler = FrameScheduler(self)
+        
+        # Etkileşimde kaba LOD, boşta tam detay; yükleme kalitesi seçimi
+        self.quality_governor = QualityGovernor()
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.setInterval(QUALITY_SETTINGS['IDLE_DELAY_MS'])
+        self._idle_timer.timeout.connect(self.on_interaction_idle)
     
     def initializeGL(self):
         """OpenGL başlatma"""
+        self.setup_gl_state()
+        self.render_stats.initialize_gl()
+    
+    def setup_gl_state(self):
+        """
+        Terrain çiziminin beklediği GL durumu. QPainter (stats overlay) bitince
+        GL durumunu sıfırlayabildiğinden her frame başında yeniden kurulur.
+        """
         # Arka plan rengi
         glClearColor(0.5, 0.7, 0.9, 1.0)  # Açık mavi gökyüzü
         
         # Depth testing
         glEnable(GL_DEPTH_TEST)
         glDepthFunc(GL_LESS)
+        glDepthMask(GL_TRUE)
+        glDisable(GL_BLEND)
+        glDisable(GL_SCISSOR_TEST)
+        glDisable(GL_STENCIL_TEST)
         
         # Lighting
         glEnable(GL_LIGHTING)
         glEnable(GL_LIGHT0)
         
-        # Light pozisyonu ve özellikleri
+        # Light pozisyonu ve özellikleri (birim modelview ile: göz koordinatlarında)
+        glMatrixMode(GL_MODELVIEW)
+        glLoadIdentity()
         light_pos = [1.0, 1.0, 1.0, 0.0]
         glLightfv(GL_LIGHT0, GL_POSITION, light_pos)
         glLightfv(GL_LIGHT0, GL_AMBIENT, [0.3, 0.3, 0.3, 1.0])
@@ -66,35 +261,47 @@ class Map3DWidget(QOpenGLWidget):
         # Smooth shading
         glShadeModel(GL_SMOOTH)
         
-        # Wireframe veya solid toggle için
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+        # Wireframe (W) / solid (S)
+        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE if self.wireframe else GL_FILL)
     
     def resizeGL(self, width, height):
         """Pencere boyutu değiştiğinde çağrılır"""
         if height == 0:
             height = 1
-        
+        self._viewport_size = (width, height)
+        self.apply_projection()
+    
+    def apply_projection(self):
+        """Son resizeGL boyutu ile viewport ve perspektif matrisini kurar"""
+        if self._viewport_size is None:
+            return
+        width, height = self._viewport_size
         glViewport(0, 0, width, height)
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
         
         aspect_ratio = width / height
-        gluPerspective(45.0, aspect_ratio, 0.1, 100.0)
+        gluPerspective(self.FOV_Y, aspect_ratio, 0.1, 100.0)
         
         glMatrixMode(GL_MODELVIEW)
         glLoadIdentity()
     
     def paintGL(self):
         """Çizim fonksiyonu"""
+        self.render_stats.begin_frame()
+        
+        self.setup_gl_state()
+        self.apply_projection()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glLoadIdentity()
         
-        # Kamera pozisyonu
-        cam_x = self.camera_distance * math.cos(math.radians(self.camera_rotation_y)) * math.cos(math.radians(self.camera_rotation_x))
-        cam_y = self.camera_distance * math.sin(math.radians(self.camera_rotation_x))
-        cam_z = self.camera_distance * math.sin(math.radians(self.camera_rotation_y)) * math.cos(math.radians(self.camera_rotation_x))
+        # Uçuş oynatılıyorsa kamera sabit adımla yol üzerinde ilerler
+        if self.flight is not None:
+            self.set_camera(self.flight.advance())
         
-        gluLookAt(cam_x + self.camera_target_x, cam_y + self.camera_target_y, cam_z,
+        # Kamera pozisyonu
+        eye = self.camera_eye()
+        gluLookAt(eye[0], eye[1], eye[2],
                   self.camera_target_x, self.camera_target_y, 0,
                   0, 1, 0)
         
@@ -102,27 +309,173 @@ class Map3DWidget(QOpenGLWidget):
         self.draw_grid()
         
         # Terrain çiz
-        if self.elevation_data is not None:
+        texture_memory = self.terrain_texture.memory_bytes
+        if self.streamer is not None:
+            self.draw_streamed_terrain()
+            texture_memory += sum(chunk.gpu['texture'].memory_bytes + chunk.gpu['lightmap'].memory_bytes
+                                  for chunk in self.streamer.gpu_resident.values())
+        elif self.elevation_data is not None:
             self.draw_terrain()
+            self.draw_contours()
         else:
             self.draw_placeholder()
+        
+        if self.flight is not None:
+            self.flight.observe_frame()
+            if self.flight.finished:
+                self.stop_flight()
+        
+        self.render_stats.set_texture_memory(texture_memory + self.lightmap.memory_bytes)
+        self.render_stats.end_frame()
+        last_frame = self.render_stats.last_frame
+        self.quality_governor.record_frame(last_frame['cpu_ms'], last_frame['gpu_ms'])
+        
+        if self.show_stats_overlay:
+            self.draw_stats_overlay()
+        
+        self.frame_scheduler.frame_rendered()
+    
+    def camera_eye(self):
+        """Kameranın dünya koordinatlarındaki konumu"""
+        cam_x = self.camera_distance * math.cos(math.radians(self.camera_rotation_y)) * math.cos(math.radians(self.camera_rotation_x))
+        cam_y = self.camera_distance * math.sin(math.radians(self.camera_rotation_x))
+        cam_z = self.camera_distance * math.sin(math.radians(self.camera_rotation_y)) * math.cos(math.radians(self.camera_rotation_x))
+        return (cam_x + self.camera_target_x, cam_y + self.camera_target_y, cam_z)
+    
+    def camera_ray(self, px, py):
+        """Ekran pikselinden geçen ray'i (origin, direction) dünya koordinatlarında döndürür"""
+        width = max(1, self.width())
+        height = max(1, self.height())
+        
+        eye = np.array(self.camera_eye())
+        target = np.array([self.camera_target_x, self.camera_target_y, 0.0])
+        
+        forward = target - eye
+        forward /= np.linalg.norm(forward)
+        right = np.cross(forward, [0.0, 1.0, 0.0])
+        right /= np.linalg.norm(right)
+        up = np.cross(right, forward)
+        
+        # Normalize cihaz koordinatları (-1..1), y ekseni yukarı
+        ndc_x = 2.0 * (px + 0.5) / width - 1.0
+        ndc_y = 1.0 - 2.0 * (py + 0.5) / height
+        tan_half = math.tan(math.radians(self.FOV_Y) / 2)
+        
+        direction = forward + ndc_x * tan_half * (width / height) * right + ndc_y * tan_half * up
+        return eye, direction
+    
+    def pick(self, px, py):
+        """
+        Ekran pikselinin altındaki arazi noktasını döndürür:
+        {'lat', 'lon', 'elevation', 'row', 'col'} veya None
+        """
+        if self.streamer is not None:
+            return self.pick_streamed(px, py)
+        
+        if self.elevation_data is None or self.picker is None:
+            return None
+        
+        origin, direction = self.camera_ray(px, py)
+        return self._pick_heightfield(self.picker, self.elevation_data.shape,
+                                      self.terrain_bounds, origin, direction)
+    
+    def pick_streamed(self, px, py):
+        """Akış modunda GPU'daki karolar arasında, kameraya yakın olandan başlayarak arar"""
+        origin, direction = self.camera_ray(px, py)
+        chunks = sorted(self.streamer.drawable(),
+                        key=lambda c: (c.offset[0] - origin[0]) ** 2 + (c.offset[1] - origin[1]) ** 2)
+        
+        for chunk in chunks:
+            # Picker karo ile birlikte worker thread'inde oluşturulur
+            if chunk.elevation is None or chunk.picker is None:
+                continue
+            ox, oy = chunk.offset
+            local_origin = (origin[0] - ox, origin[1] - oy, origin[2])
+            result = self._pick_heightfield(chunk.picker, chunk.elevation.shape,
+                                            chunk.terrain_bounds, local_origin, direction)
+            if result is not None:
+                return result
+        return None
+    
+    def _pick_heightfield(self, picker, shape, bounds, origin, direction):
+        """Merkezi dünya orijininde olan tek bir grid için ray kesişimi"""
+        rows, cols = shape
+        
+        # Dünya koordinatlarından grid uzayına (sütun, satır, ham yükseklik)
+        sx = (cols - 1) / self.TERRAIN_EXTENT
+        sy = (rows - 1) / self.TERRAIN_EXTENT
+        sz = 1.0 / self.height_scale
+        grid_origin = ((origin[0] / self.TERRAIN_EXTENT + 0.5) * (cols - 1),
+                       (origin[1] / self.TERRAIN_EXTENT + 0.5) * (rows - 1),
+                       origin[2] * sz)
+        grid_direction = (direction[0] * sx, direction[1] * sy, direction[2] * sz)
+        
+        hit = picker.intersect(grid_origin, grid_direction)
+        if hit is None:
+            return None
+        
+        col, row, elevation = hit
+        result = {'row': row, 'col': col, 'elevation': elevation, 'lat': None, 'lon': None}
+        
+        if bounds is not None:
+            result['lat'] = bounds['south'] + row / (rows - 1) * (bounds['north'] - bounds['south'])
+            result['lon'] = bounds['west'] + col / (cols - 1) * (bounds['east'] - bounds['west'])
+        return result
     
     def draw_grid(self):
-        """Referans grid çizer"""
+        """Referans grid çizer (akış modunda kamera hedefinin karosuna ortalanır)"""
+        ox = oy = 0.0
+        if self.streamer is not None:
+            i, j = self.streamer.grid.chunk_at(self.camera_target_x, self.camera_target_y)
+            ox, oy = i * self.TERRAIN_EXTENT, j * self.TERRAIN_EXTENT
+        
         glDisable(GL_LIGHTING)
         glColor3f(0.3, 0.3, 0.3)
         glBegin(GL_LINES)
         
         for i in range(-10, 11):
             # X ekseni çizgileri
-            glVertex3f(i * 0.5, -5.0, 0.0)
-            glVertex3f(i * 0.5, 5.0, 0.0)
+            glVertex3f(ox + i * 0.5, oy - 5.0, 0.0)
+            glVertex3f(ox + i * 0.5, oy + 5.0, 0.0)
             # Z ekseni çizgileri
-            glVertex3f(-5.0, i * 0.5, 0.0)
-            glVertex3f(5.0, i * 0.5, 0.0)
+            glVertex3f(ox - 5.0, oy + i * 0.5, 0.0)
+            glVertex3f(ox + 5.0, oy + i * 0.5, 0.0)
         
         glEnd()
         glEnable(GL_LIGHTING)
+        self.render_stats.record_draw()
+    
+    def draw_stats_overlay(self):
+        """Performans istatistiklerini sol üst köşede gösterir"""
+        # QPainter'ın GL paint engine'i durumu değiştirir; fixed-function durum korunur
+        glPushAttrib(GL_ALL_ATTRIB_BITS)
+        glPushClientAttrib(GL_CLIENT_ALL_ATTRIB_BITS)
+        glMatrixMode(GL_PROJECTION)
+        glPushMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPushMatrix()
+        
+        painter = QPainter(self)
+        painter.setPen(QColor(255, 255, 255))
+        painter.setFont(QFont("Monospace", 9))
+        
+        lines = (self.render_stats.format_summary().split('\n') +
+                 self.quality_governor.format_summary().split('\n'))
+        if self.streamer is not None:
+            lines.append(self.streamer.format_summary())
+        if self.flight is not None:
+            lines.append(self.flight.format_summary())
+        painter.fillRect(5, 5, 360, 16 * len(lines) + 8, QColor(0, 0, 0, 150))
+        for i, line in enumerate(lines):
+            painter.drawText(10, 20 + i * 16, line)
+        painter.end()
+        
+        glMatrixMode(GL_PROJECTION)
+        glPopMatrix()
+        glMatrixMode(GL_MODELVIEW)
+        glPopMatrix()
+        glPopClientAttrib()
+        glPopAttrib()
     
     def draw_placeholder(self):
         """Veri yüklenmeden önce placeholder çizer"""
@@ -145,90 +498,364 @@ class Map3DWidget(QOpenGLWidget):
             glNormal3f(math.cos(angle2), math.sin(angle2), 0.5)
             glVertex3f(math.cos(angle2), math.sin(angle2), 0)
         glEnd()
+        self.render_stats.record_draw(8)
     
     def draw_terrain(self):
         """Terrain verilerini çizer"""
-        if self.terrain_list is None:
-            self.generate_terrain_display_list()
+        # Eski display list ve buffer'ları context aktifken sil
+        self.delete_stale_geometry()
+        
+        # Bekleyen texture yükleme/tile güncellemelerini uygula
+        self.terrain_texture.sync()
+        self.lightmap.sync()
         
+        # Arka planda hazırlanan seviye geldiyse eski geometriyle değiştir
+        if self._ready_level is not None:
+            level, mesh = self._ready_level
+            self._ready_level = None
+            self.release_terrain_geometry()
+            self.terrain_list_level = level
+            self.upload_terrain_mesh(mesh)
+        
+        # Kamera uzaklığına göre piramit seviyesi değiştiyse yenisini arka planda
+        # hazırlat; o zamana kadar mevcut seviye çizilir
+        level = self.select_lod_level()
+        if not self.has_terrain_geometry():
+            # İlk çizimde gösterilecek geometri yok, beklemeden oluşturulur
+            self.cancel_level_build()
+            self.terrain_list_level = level
+            self.upload_terrain_mesh(self.terrain_mesh_job(self.level_grid(level))())
+        elif level == self.terrain_list_level:
+            if self._building_level is not None:
+                self.cancel_level_build()
+        elif level != self._building_level:
+            self._building_level = level
+            self.level_builder.request(level, self.terrain_mesh_job(self.level_grid(level)))
+        
+        if self.has_terrain_geometry():
+            textured = self.terrain_texture.is_ready and self.terrain_uvs is not None
+            lit = self.use_lightmap and self.lightmap.is_ready
+            if textured:
+                self.terrain_texture.bind()
+            if lit:
+                self.bind_lightmap(self.lightmap)
+            if self.terrain_vbos is not None:
+                self.draw_terrain_buffers()
+            else:
+                glCallList(self.terrain_list)
+            self.render_stats.record_draw(self.terrain_triangle_count)
+            if lit:
+                self.unbind_lightmap(self.lightmap)
+            if textured:
+                self.terrain_texture.unbind()
+    
+    def draw_contours(self):
+        """Eş yükselti eğrilerini tek glMultiDrawArrays çağrısıyla çizer"""
+        if self._contours_dirty:
+            self.release_contour_buffer()
+            if self.contour_lines is not None and self.contour_lines.polyline_count:
+                self.upload_contour_buffer(self.contour_lines)
+            self._contours_dirty = False
+        
+        buffer = self.contour_buffer
+        if buffer is None:
+            return
+        
+        glDisable(GL_LIGHTING)
+        glColor3f(*CONTOUR_SETTINGS['COLOR'])
+        glLineWidth(CONTOUR_SETTINGS['LINE_WIDTH'])
+        if 'vbo' in buffer:
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, buffer['vbo'])
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glMultiDrawArrays(GL_LINE_STRIP, buffer['firsts'], buffer['counts'], len(buffer['counts']))
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDisableClientState(GL_VERTEX_ARRAY)
+        else:
+            glCallList(buffer['list'])
+        glLineWidth(1.0)
+        glEnable(GL_LIGHTING)
+        self.render_stats.record_draw()
+    
+    def upload_contour_buffer(self, lines):
+        """Kontur noktalarını dünya koordinatlarında tek vertex buffer'a (veya display list'e) aktarır"""
+        vertices = lines.world_vertices(self.height_scale, CONTOUR_SETTINGS['Z_OFFSET'], self.TERRAIN_EXTENT)
+        firsts = lines.firsts()
+        counts = np.ascontiguousarray(lines.counts, dtype=np.int32)
+        buffer = {'firsts': firsts, 'counts': counts}
+        
+        with tracer.span('contours.upload', bytes=vertices.nbytes):
+            if PERFORMANCE_SETTINGS['USE_VBO']:
+                buffer['vbo'] = glGenBuffers(1)
+                glBindBuffer(GL_ARRAY_BUFFER, buffer['vbo'])
+                glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+                glBindBuffer(GL_ARRAY_BUFFER, 0)
+            else:
+                buffer['list'] = glGenLists(1)
+                glNewList(buffer['list'], GL_COMPILE)
+                glEnableClientState(GL_VERTEX_ARRAY)
+                glVertexPointer(3, GL_FLOAT, 0, vertices)
+                glMultiDrawArrays(GL_LINE_STRIP, firsts, counts, len(counts))
+                glDisableClientState(GL_VERTEX_ARRAY)
+                glEndList()
+        self.contour_buffer = buffer
+    
+    def release_contour_buffer(self):
+        """Kontur buffer'ını bir sonraki çizimde silinmek üzere bırakır"""
+        buffer = self.contour_buffer
+        if buffer is None:
+            return
+        if 'vbo' in buffer:
+            self._stale_buffers.append(buffer['vbo'])
+        else:
+            self._stale_lists.append(buffer['list'])
+        self.contour_buffer = None
+    
+    def set_contour_interval(self, interval):
+        """Kontur aralığını (metre) ayarlar; 0/None kapatır. Hesaplama arka planda yapılır."""
+        self.contour_interval = interval or 0
+        self.request_contours()
+    
+    def request_contours(self):
+        """Yüklü elevation verisi için konturları worker thread'de hesaplatır"""
+        self.contour_lines = None
+        self._contours_dirty = True
+        if self.contour_interval and self.elevation_data is not None:
+            self.contour_builder.request(self.elevation_data, self.contour_interval)
+        else:
+            self.contour_builder.cancel()
+        self.request_frame()
+    
+    def set_contours(self, generation, lines):
+        """ContourBuilder sonucu (ana thread); bu arada yeni istek geldiyse atılır"""
+        if not self.contour_builder.is_current(generation):
+            return
+        self.contour_lines = lines
+        self._contours_dirty = True
+        self.request_frame()
+    
+    def bind_lightmap(self, lightmap):
+        """Işık haritası aydınlatmayı taşır; fixed-function ışık hesabı kapatılır"""
+        glDisable(GL_LIGHTING)
+        lightmap.bind(self.TERRAIN_EXTENT)
+    
+    def unbind_lightmap(self, lightmap):
+        lightmap.unbind()
+        glEnable(GL_LIGHTING)
+    
+    def has_terrain_geometry(self):
+        return self.terrain_list is not None or self.terrain_vbos is not None
+    
+    def release_terrain_geometry(self):
+        """Mevcut GPU geometrisini bir sonraki çizimde silinmek üzere bırakır"""
         if self.terrain_list is not None:
-            glCallList(self.terrain_list)
+            self._stale_lists.append(self.terrain_list)
+            self.terrain_list = None
+        if self.terrain_vbos is not None:
+            self._stale_buffers.extend(self.terrain_vbos.values())
+            self.terrain_vbos = None
+    
+    def delete_stale_geometry(self):
+        """Bırakılmış display list ve buffer'ları siler (context aktif olmalı)"""
+        for display_list in self._stale_lists:
+            glDeleteLists(display_list, 1)
+        self._stale_lists = []
+        if self._stale_buffers:
+            glDeleteBuffers(len(self._stale_buffers), self._stale_buffers)
+            self._stale_buffers = []
+        for texture in self._stale_textures:
+            texture.delete()
+        self._stale_textures = []
+    
+    def select_lod_level(self):
+        """Ekranda görünen terrain boyutuna yetecek en kaba piramit seviyesini seçer"""
+        if self.elevation_pyramid is None or len(self.elevation_pyramid) < 2:
+            return 0
+        
+        visible_height = 2 * self.camera_distance * math.tan(math.radians(self.FOV_Y) / 2)
+        terrain_pixels = max(1, self.height()) * self.TERRAIN_EXTENT / visible_height
+        pixels_per_sample = RENDER_SETTINGS['LOD_PIXELS_PER_SAMPLE'] * self.quality_governor.lod_bias
+        needed_samples = terrain_pixels / pixels_per_sample
+        return self.elevation_pyramid.level_for_min_samples(needed_samples)
+    
+    def level_grid(self, level):
+        """Piramit seviyesinin grid'i (0: yüklü tam çözünürlüklü grid)"""
+        if level == 0:
+            return self.elevation_data
+        return self.elevation_pyramid[level]
+    
+    def cancel_level_build(self):
+        """Arka planda hazırlanan veya aktarılmayı bekleyen seviyeyi bırakır"""
+        self.level_builder.cancel()
+        self._building_level = None
+        self._ready_level = None
     
-    def generate_terrain_display_list(self):
-        """Terrain için display list oluşturur"""
-        if self.elevation_data is None:
+    def set_picker(self, generation, picker):
+        """PickerBuilder sonucu (ana thread); bu arada yeni grid yüklendiyse atılır"""
+        if self.picker_builder.is_current(generation):
+            self.picker = picker
+    
+    def set_terrain_level(self, generation, level, mesh):
+        """TerrainLevelBuilder sonucu (ana thread); bu arada yeni istek geldiyse atılır"""
+        if not self.level_builder.is_current(generation):
             return
+        self._building_level = None
+        self._ready_level = (level, mesh)
+        self.request_frame()
+    
+    def terrain_mesh_job(self, elevation_data):
+        """
+        Grid için mesh'i döndüren argümansız fonksiyon. Girdiler (UV'ler, cache
+        anahtarı kaynağı, height_scale) çağıran thread'de alınır; fonksiyon
+        arka plan thread'inde çalışabilir.
         
-        self.terrain_list = glGenLists(1)
-        glNewList(self.terrain_list, GL_COMPILE)
+        Mesh dizileri elevation içeriği, height_scale, kalite ve palete göre
+        disk cache'inden memory-map ile alınır; yoksa vektörize oluşturulup
+        kaydedilir.
+        """
+        rows, cols = elevation_data.shape
+        height_scale = self.height_scale
+        mesh_cache = self.mesh_cache
         
-        rows, cols = self.elevation_data.shape
+        # Texture varsa renk bantları yerine harita görüntüsü kullanılır
+        uvs = self.terrain_uvs_for(rows, cols)
+        uv_source = None
+        if uvs is not None:
+            uv_source = [self.terrain_bounds, self.tile_bounds]
         
-        # Renk haritası için min/max yükseklik
-        min_height = np.min(self.elevation_data)
-        max_height = np.max(self.elevation_data)
-        height_range = max_height - min_height if max_height != min_height else 1
+        def build():
+            key = mesh_cache_key(elevation_data, height_scale, uv_source=uv_source)
+            return mesh_cache.get_or_build(
+                key, lambda: build_terrain_mesh(elevation_data, height_scale, uvs))
+        return build
+    
+    def generate_terrain_display_list(self, elevation_data=None):
+        """
+        Terrain geometrisini oluşturur (varsayılan: tam çözünürlüklü grid).
+        Diziler display list'e veya (USE_VBO) vertex buffer'lara aktarılır.
+        """
+        if elevation_data is None:
+            elevation_data = self.elevation_data
+        if elevation_data is None:
+            return
+        self.upload_terrain_mesh(self.terrain_mesh_job(elevation_data)())
+    
+    def upload_terrain_mesh(self, mesh):
+        """Hazır mesh'i GPU'ya aktarır (context aktif olmalı)"""
+        self.terrain_mesh = mesh
+        self.terrain_triangle_count = mesh.triangle_count
         
-        # Triangle strips ile terrain çiz
-        for i in range(rows - 1):
-            glBegin(GL_TRIANGLE_STRIP)
-            
-            for j in range(cols):
-                for row in [i, i + 1]:
-                    # Koordinatları normalize et
-                    x = (j / (cols - 1) - 0.5) * 4
-                    y = (row / (rows - 1) - 0.5) * 4
-                    z = self.elevation_data[row, j] * self.height_scale
-                    
-                    # Yükseklik bazlı renk
-                    height_ratio = (self.elevation_data[row, j] - min_height) / height_range
-                    
-                    if height_ratio < 0.3:  # Su seviyesi - mavi
-                        glColor3f(0.2, 0.4, 0.8)
-                    elif height_ratio < 0.6:  # Düşük - yeşil
-                        glColor3f(0.2, 0.7, 0.2)
-                    elif height_ratio < 0.8:  # Orta - kahverengi
-                        glColor3f(0.6, 0.4, 0.2)
-                    else:  # Yüksek - beyaz (kar)
-                        glColor3f(0.9, 0.9, 0.9)
-                    
-                    # Normal hesapla (basit)
-                    if row > 0 and row < rows - 1 and j > 0 and j < cols - 1:
-                        # Gradient hesapla
-                        dx = self.elevation_data[row, j + 1] - self.elevation_data[row, j - 1]
-                        dy = self.elevation_data[row + 1, j] - self.elevation_data[row - 1, j]
-                        
-                        # Normal vektör
-                        normal_x = -dx * self.height_scale * 2
-                        normal_y = -dy * self.height_scale * 2
-                        normal_z = 4.0 / max(rows, cols)
-                        
-                        # Normalize
-                        length = math.sqrt(normal_x**2 + normal_y**2 + normal_z**2)
-                        if length > 0:
-                            normal_x /= length
-                            normal_y /= length
-                            normal_z /= length
-                        
-                        glNormal3f(normal_x, normal_y, normal_z)
-                    else:
-                        glNormal3f(0, 0, 1)
-                    
-                    glVertex3f(x, y, z)
-            
-            glEnd()
+        with tracer.span('mesh.upload', bytes=mesh.nbytes):
+            if PERFORMANCE_SETTINGS['USE_VBO']:
+                self.upload_terrain_buffers(mesh)
+            else:
+                self.terrain_list = glGenLists(1)
+                glNewList(self.terrain_list, GL_COMPILE)
+                self.draw_mesh_arrays(mesh)
+                glEndList()
+    
+    def draw_mesh_arrays(self, mesh):
+        """Mesh'i istemci taraflı vertex dizileri ile tek glDrawElements çağrısında çizer"""
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, 0, mesh.vertices)
+        glNormalPointer(GL_FLOAT, 0, mesh.normals)
+        glColorPointer(3, GL_UNSIGNED_BYTE, 0, mesh.colors)
+        if mesh.uvs is not None:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glTexCoordPointer(2, GL_FLOAT, 0, mesh.uvs)
+        
+        glDrawElements(GL_TRIANGLES, len(mesh.indices), GL_UNSIGNED_INT, mesh.indices)
+        
+        if mesh.uvs is not None:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+    
+    def upload_terrain_buffers(self, mesh):
+        """Mesh dizilerini (memory-mapped olabilir) doğrudan vertex buffer'lara yükler"""
+        self.terrain_vbos = self.create_mesh_buffers(mesh)
+        self.terrain_index_count = len(mesh.indices)
+    
+    def create_mesh_buffers(self, mesh):
+        """Mesh dizilerinden vertex buffer'lar oluşturur: {dizi adı: buffer id}"""
+        vbos = {}
+        for name in mesh.ARRAY_NAMES:
+            array = getattr(mesh, name)
+            if array is None:
+                continue
+            target = GL_ELEMENT_ARRAY_BUFFER if name == 'indices' else GL_ARRAY_BUFFER
+            buffer_id = glGenBuffers(1)
+            glBindBuffer(target, buffer_id)
+            glBufferData(target, array.nbytes, array, GL_STATIC_DRAW)
+            glBindBuffer(target, 0)
+            vbos[name] = buffer_id
+        return vbos
+    
+    def draw_terrain_buffers(self, vbos=None, index_count=None):
+        """Vertex buffer'lardaki mesh'i çizer (varsayılan: yüklü terrain)"""
+        if vbos is None:
+            vbos = self.terrain_vbos
+            index_count = self.terrain_index_count
+        
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, vbos['vertices'])
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, vbos['normals'])
+        glNormalPointer(GL_FLOAT, 0, None)
+        
+        glEnableClientState(GL_COLOR_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, vbos['colors'])
+        glColorPointer(3, GL_UNSIGNED_BYTE, 0, None)
         
-        glEndList()
+        if 'uvs' in vbos:
+            glEnableClientState(GL_TEXTURE_COORD_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, vbos['uvs'])
+            glTexCoordPointer(2, GL_FLOAT, 0, None)
+        
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, vbos['indices'])
+        glDrawElements(GL_TRIANGLES, index_count, GL_UNSIGNED_INT, None)
+        
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        if 'uvs' in vbos:
+            glDisableClientState(GL_TEXTURE_COORD_ARRAY)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
     
-    def load_terrain_data(self, elevation_data, texture_data=None):
-        """Terrain verilerini yükler"""
-        self.elevation_data = elevation_data
+    def load_terrain_data(self, elevation_data, texture_data=None,
+                          terrain_bounds=None, tile_bounds=None):
+        """
+        Terrain verilerini yükler (akış modu açıksa kapatılır)
+        
+        terrain_bounds ve tile_bounds verilirse texture Web Mercator
+        koordinatlarına göre araziye oturtulur. texture_data olmadan
+        tile_bounds verilirse tile'lar update_texture_tile ile akıtılır.
+        """
+        self.disable_streaming()
+        self.elevation_data = as_elevation_array(elevation_data)
+        self.terrain_size = self.elevation_data.shape[0]
         self.texture_data = texture_data
+        self.picker = None
+        self.picker_builder.request(self.elevation_data)
+        self.terrain_bounds = terrain_bounds
+        self.tile_bounds = tile_bounds
         
-        # Eski display list'i sil
-        if self.terrain_list is not None:
-            glDeleteLists(self.terrain_list, 1)
-            self.terrain_list = None
+        # Eski geometri bir sonraki çizimde silinir; widget offscreen
+        # bir context ile çizilirken de (headless) doğru context kullanılır
+        self.release_terrain_geometry()
+        self.cancel_level_build()
+        self.terrain_mesh = None
+        self.lightmap.clear()
+        
+        self.elevation_pyramid = None
+        self.setup_terrain_texture()
+        self.request_contours()
         
         # Kamerayı resetle
         self.camera_distance = 8.0
@@ -237,14 +864,233 @@ class Map3DWidget(QOpenGLWidget):
         self.camera_target_x = 0.0
         self.camera_target_y = 0.0
         
-        self.update()
+        self.request_frame()
+    
+    def setup_terrain_texture(self):
+        """Texture görüntüsünü ve vertex UV'lerini hazırlar"""
+        self.terrain_uvs = None
+        
+        if self.texture_data is None and self.tile_bounds is None:
+            return
+        
+        rows, cols = self.elevation_data.shape
+        
+        image = self.texture_data
+        tile_size = 256
+        if self.tile_bounds is not None:
+            tile_size = self.tile_bounds['tile_size']
+            if image is None:
+                # Tile'lar geldikçe doldurulacak gri zemin
+                width = self.tile_bounds['cols'] * tile_size
+                height = self.tile_bounds['rows'] * tile_size
+                image = Image.new('RGB', (width, height), (200, 200, 200))
+        
+        self.terrain_texture.set_image(image, tile_size)
+        self.terrain_uvs = self._compute_uvs(rows, cols)
+    
+    def _compute_uvs(self, rows, cols):
+        """rows x cols boyutlu grid için texture koordinatları"""
+        if self.terrain_bounds is not None and self.tile_bounds is not None:
+            return compute_terrain_uvs(self.terrain_bounds, self.tile_bounds, rows, cols)
+        
+        # Sınır bilgisi yoksa görüntüyü grid'e düz yay
+        u, v = np.meshgrid(np.linspace(0.0, 1.0, cols, dtype=np.float32),
+                           np.linspace(1.0, 0.0, rows, dtype=np.float32))
+        return u, v
+    
+    def terrain_uvs_for(self, rows, cols):
+        """Texture varsa verilen grid boyutu için UV'leri döndürür (LOD seviyeleri için)"""
+        if self.terrain_uvs is None:
+            return None
+        if self.terrain_uvs[0].shape == (rows, cols):
+            return self.terrain_uvs
+        return self._compute_uvs(rows, cols)
+    
+    def set_lightmap(self, lightmap):
+        """Yüklü terrain için ışık haritasını (terrain_lightmap.load_or_bake_lightmap) ayarlar"""
+        self.lightmap.set_array(lightmap)
+        self.request_frame()
+    
+    def set_elevation_pyramid(self, pyramid):
+        """Yüklü terrain için overview piramidini ayarlar; uzaklaşınca kaba seviyeler çizilir"""
+        self.elevation_pyramid = pyramid
+        self.cancel_level_build()
+        self.request_frame()
+    
+    def update_texture_tile(self, grid_col, grid_row, image):
+        """Gelen tek bir tile'ı texture üzerinde yerinde günceller"""
+        self.terrain_texture.queue_tile(grid_col, grid_row, image)
+        self.request_frame()
+    
+    def enable_streaming(self, lat, lon, size=None):
+        """
+        Akış modunu açar: (lat, lon) dünya orijini olur, sağ tıkla kaydırdıkça
+        kamera hedefi çevresindeki karolar arka planda yüklenip çizilir
+        """
+        self.disable_streaming()
+        self.streamer = TerrainStreamer(lat, lon, size, height_scale=self.height_scale,
+                                        release_gpu=self.release_chunk_gpu)
+        self.streamer.chunk_ready.connect(self.request_frame)
+        
+        self.camera_distance = 8.0
+        self.camera_target_x = 0.0
+        self.camera_target_y = 0.0
+        self.request_frame()
+    
+    def disable_streaming(self):
+        """Akış modunu kapatır; karoların GPU kaynakları bir sonraki çizimde silinir"""
+        if self.streamer is None:
+            return
+        if self.flight is not None and self.flight.prefetcher is not None:
+            self.stop_flight()
+        self.streamer.chunk_ready.disconnect(self.request_frame)
+        self.streamer.close()
+        self.streamer = None
+        self.request_frame()
+    
+    def draw_streamed_terrain(self):
+        """Akış karolarını çizer; frame başına sınırlı sayıda hazır karoyu GPU'ya aktarır"""
+        self.delete_stale_geometry()
+        
+        streamer = self.streamer
+        for chunk in streamer.update(self.camera_target_x, self.camera_target_y):
+            self.upload_stream_chunk(chunk)
+        
+        for chunk in streamer.drawable():
+            gpu = chunk.gpu
+            lit = self.use_lightmap and gpu['lightmap'].is_ready
+            glPushMatrix()
+            glTranslatef(chunk.offset[0], chunk.offset[1], 0.0)
+            gpu['texture'].bind()
+            if lit:
+                self.bind_lightmap(gpu['lightmap'])
+            if 'vbos' in gpu:
+                self.draw_terrain_buffers(gpu['vbos'], gpu['index_count'])
+            else:
+                glCallList(gpu['list'])
+            if lit:
+                self.unbind_lightmap(gpu['lightmap'])
+            gpu['texture'].unbind()
+            glPopMatrix()
+            self.render_stats.record_draw(gpu['triangles'])
+        
+        # Kalan karolar sonraki frame'lerde aktarılır (tek frame'de takılma olmaz)
+        if streamer.has_pending_uploads:
+            self.request_frame()
+    
+    def upload_stream_chunk(self, chunk):
+        """Arka planda hazırlanan mesh dizilerini ve görüntüyü GPU'ya aktarır"""
+        mesh = chunk.mesh
+        with tracer.span('stream.upload', bytes=mesh.nbytes + chunk.pixels.nbytes):
+            texture = TerrainTexture(use_pbo=PERFORMANCE_SETTINGS['USE_PBO'])
+            texture.set_image(chunk.pixels, chunk.tile_bounds['tile_size'])
+            texture.sync()
+            
+            lightmap = LightmapTexture()
+            if chunk.lightmap is not None:
+                lightmap.set_array(chunk.lightmap)
+                lightmap.sync()
+            
+            gpu = {'texture': texture, 'lightmap': lightmap, 'triangles': mesh.triangle_count,
+                   'index_count': len(mesh.indices)}
+            if PERFORMANCE_SETTINGS['USE_VBO']:
+                gpu['vbos'] = self.create_mesh_buffers(mesh)
+            else:
+                gpu['list'] = glGenLists(1)
+                glNewList(gpu['list'], GL_COMPILE)
+                self.draw_mesh_arrays(mesh)
+                glEndList()
+        
+        chunk.gpu = gpu
+        self.streamer.mark_uploaded(chunk)
+    
+    def release_chunk_gpu(self, chunk):
+        """Karonun GPU kaynaklarını bir sonraki çizimde silinmek üzere bırakır"""
+        gpu = chunk.gpu
+        if 'vbos' in gpu:
+            self._stale_buffers.extend(gpu['vbos'].values())
+        else:
+            self._stale_lists.append(gpu['list'])
+        self._stale_textures.append(gpu['texture'])
+        self._stale_textures.append(gpu['lightmap'])
+    
+    def play_flight(self, keyframes):
+        """
+        Anahtar kare yolunu sabit adımla oynatır (camera_flight.load_flight_keyframes).
+        lat/lon içeren yollar akış modunda oynatılır; yolun önündeki karolar
+        kamera oraya varmadan önce yüklenir.
+        """
+        self.stop_flight()
+        
+        geographic = [frame for frame in keyframes if 'lat' in frame]
+        if geographic and self.streamer is None:
+            start = min(geographic, key=lambda frame: frame['t'])
+            self.enable_streaming(start['lat'], start['lon'])
+        
+        grid = self.streamer.grid if self.streamer is not None else None
+        path = FlightPath(keyframes, grid)
+        prefetcher = FlightPrefetcher(path, self.streamer) if self.streamer is not None else None
+        self.flight = FlightPlayer(path, prefetcher)
+        self.frame_scheduler.start_continuous('flight')
+    
+    def stop_flight(self):
+        """Uçuşu durdurur ve ölçümleri loglar"""
+        if self.flight is None:
+            return
+        self.flight.log_metrics()
+        if self.flight.prefetcher is not None:
+            self.streamer.set_prefetch([])
+        self.flight = None
+        self.frame_scheduler.stop_continuous('flight')
+        self.request_frame()
+    
+    def set_camera(self, camera):
+        """CAMERA_KEYS sözlüğündeki kamera değerlerini uygular"""
+        self.camera_target_x = camera['target_x']
+        self.camera_target_y = camera['target_y']
+        self.camera_distance = camera['distance']
+        self.camera_rotation_x = camera['rotation_x']
+        self.camera_rotation_y = camera['rotation_y']
+    
+    def apply_camera_preset(self, preset):
+        """CAMERA_PRESETS'teki gibi bir kamera sözlüğünü uygular"""
+        self.camera_distance = preset.get('distance', self.camera_distance)
+        self.camera_rotation_x = preset.get('rotation_x', self.camera_rotation_x)
+        self.camera_rotation_y = preset.get('rotation_y', self.camera_rotation_y)
+        self.camera_target_x = preset.get('target_x', self.camera_target_x)
+        self.camera_target_y = preset.get('target_y', self.camera_target_y)
+        self.request_frame()
+    
+    def request_frame(self):
+        """Sahne değiştiğinde yeni frame ister; aynı frame'deki istekler birleşir"""
+        self.frame_scheduler.request_frame()
+    
+    def begin_interaction(self):
+        """Kamera etkileşimi sürerken kalite düşürülür; bitince on_interaction_idle"""
+        self.quality_governor.begin_interaction()
+        self._idle_timer.start()
+    
+    def on_interaction_idle(self):
+        """Etkileşim bitti: tam detayla bir frame daha çiz"""
+        if QGuiApplication.mouseButtons() != Qt.MouseButton.NoButton:
+            # Sürükleme devam ediyor ama fare durdu
+            self._idle_timer.start()
+            return
+        self.quality_governor.end_interaction()
+        self.request_frame()
     
     def mousePressEvent(self, event: QMouseEvent):
         """Mouse basma eventi"""
         self.last_mouse_pos = event.pos()
+        self.begin_interaction()
     
     def mouseMoveEvent(self, event: QMouseEvent):
         """Mouse hareket eventi"""
+        if not event.buttons():
+            # Tuş basılı değil: kamera değişmez, sadece altındaki noktayı raporla
+            self.terrain_picked.emit(self.pick(event.position().x(), event.position().y()))
+            return
+        
         if self.last_mouse_pos is None:
             self.last_mouse_pos = event.pos()
             return
@@ -267,7 +1113,8 @@ class Map3DWidget(QOpenGLWidget):
             self.camera_target_y += dy * move_speed
         
         self.last_mouse_pos = event.pos()
-        self.update()
+        self.begin_interaction()
+        self.request_frame()
     
     def wheelEvent(self, event: QWheelEvent):
         """Mouse tekerlek eventi - Zoom"""
@@ -277,7 +1124,8 @@ class Map3DWidget(QOpenGLWidget):
         self.camera_distance -= delta * zoom_speed
         self.camera_distance = max(1.0, min(20.0, self.camera_distance))
         
-        self.update()
+        self.begin_interaction()
+        self.request_frame()
     
     def keyPressEvent(self, event):
         """Klavye eventi"""
@@ -288,17 +1136,42 @@ class Map3DWidget(QOpenGLWidget):
             self.camera_rotation_y = 0.0
             self.camera_target_x = 0.0
             self.camera_target_y = 0.0
-            self.update()
+            self.request_frame()
         elif event.key() == Qt.Key.Key_W:
             # Wireframe toggle
-            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-            self.update()
+            self.wireframe = True
+            self.request_frame()
         elif event.key() == Qt.Key.Key_S:
             # Solid mode
-            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-            self.update()
+            self.wireframe = False
+            self.request_frame()
+        elif event.key() == Qt.Key.Key_F:
+            # Performans overlay toggle
+            self.show_stats_overlay = not self.show_stats_overlay
+            self.request_frame()
+        elif event.key() == Qt.Key.Key_L:
+            # Işık haritası / GL_LIGHT0 aydınlatması karşılaştırması
+            self.use_lightmap = not self.use_lightmap
+            self.request_frame()
+        elif event.key() == Qt.Key.Key_P and self.flight is not None:
+            # Uçuşu duraklat/devam ettir
+            self.flight.set_paused(not self.flight.paused)
+        elif event.key() == Qt.Key.Key_Escape:
+            self.stop_flight()
     
     def cleanup(self):
         """Temizlik"""
-        if self.terrain_list is not None:
-            glDeleteLists(self.terrain_list, 1)
\ No newline at end of file
+        self.stop_flight()
+        self.frame_scheduler.stop()
+        self._idle_timer.stop()
+        self.render_stats.cleanup()
+        self.disable_streaming()
+        self.contour_builder.close()
+        self.level_builder.close()
+        self.picker_builder.close()
+        self.cancel_level_build()
+        self.release_contour_buffer()
+        self.release_terrain_geometry()
+        self.delete_stale_geometry()
+        self.terrain_texture.delete()
+        self.lightmap.delete()
\ No newline at end of file
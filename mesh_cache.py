@@ -0,0 +1,133 @@
+"""
+Mesh Cache - Oluşturulmuş terrain mesh dizilerini diskte saklar, memory-map ile geri yükler
+
+Dosya biçimi: 8 byte sihirli değer, 4 byte başlık uzunluğu, JSON başlık
+({isim: {dtype, shape, offset}}) ve 64 byte hizalı ham dizi verileri.
+Yükleme dosyayı np.memmap ile açar; diziler GPU buffer'larına kopyasız aktarılır.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from cache_manager import get_cache_manager
+from config import COLOR_SETTINGS, HEIGHT_THRESHOLDS, RENDER_SETTINGS
+from pipeline_trace import tracer
+from terrain_mesh import TerrainMesh
+from utils import logger
+
+MESH_MAGIC = b'TMESH001'
+_ALIGNMENT = 64
+
+
+def mesh_cache_key(elevation_data, height_scale, quality=None, uv_source=None):
+    """
+    Elevation grid'inin içerik özeti + height_scale + kalite + palet (+ texture
+    yerleşimi) üzerinden cache anahtarı üretir
+    """
+    if quality is None:
+        quality = RENDER_SETTINGS['TERRAIN_QUALITY']
+
+    digest = hashlib.blake2b(digest_size=16)
+    data = np.ascontiguousarray(elevation_data)
+    digest.update(str((data.shape, data.dtype.str)).encode())
+    digest.update(memoryview(data).cast('B'))
+    digest.update(repr((float(height_scale), quality,
+                        sorted(COLOR_SETTINGS.items()),
+                        sorted(HEIGHT_THRESHOLDS.items()))).encode())
+    if uv_source is not None:
+        digest.update(json.dumps(uv_source, sort_keys=True).encode())
+    return f"mesh_{digest.hexdigest()}.bin"
+
+
+def write_mesh(path, mesh):
+    """Mesh dizilerini hizalı ham buffer'lar olarak dosyaya yazar"""
+    header = {}
+    offset = 0
+    arrays = []
+    for name in TerrainMesh.ARRAY_NAMES:
+        array = getattr(mesh, name)
+        if array is None:
+            continue
+        array = np.ascontiguousarray(array)
+        offset = (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+        header[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        arrays.append((offset, array))
+        offset += array.nbytes
+
+    header_bytes = json.dumps({'arrays': header, 'shape': list(mesh.shape)}).encode()
+    data_start = (len(MESH_MAGIC) + 4 + len(header_bytes) + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MESH_MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for array_offset, array in arrays:
+            f.seek(data_start + array_offset)
+            f.write(memoryview(array).cast('B'))
+    os.replace(tmp_path, path)
+
+
+def read_mesh(path):
+    """Mesh dosyasını memory-map ile açar; diziler dosya üzerinde view'dır"""
+    with open(path, 'rb') as f:
+        if f.read(len(MESH_MAGIC)) != MESH_MAGIC:
+            raise ValueError(f"Geçersiz mesh dosyası: {path}")
+        header_length = struct.unpack('<I', f.read(4))[0]
+        header = json.loads(f.read(header_length))
+
+    data_start = (len(MESH_MAGIC) + 4 + header_length + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+    raw = np.memmap(path, dtype=np.uint8, mode='r', offset=data_start)
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype = np.dtype(info['dtype'])
+        count = int(np.prod(info['shape']))
+        start = info['offset']
+        arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(info['shape'])
+
+    return TerrainMesh(arrays['vertices'], arrays['normals'], arrays['colors'], arrays['indices'],
+                       arrays.get('uvs'), shape=tuple(header['shape']))
+
+
+class MeshCache:
+    """Ortak disk cache'i (CacheManager) üzerinde mesh saklama"""
+
+    def __init__(self, cache_dir=None):
+        self.cache = get_cache_manager(cache_dir)
+
+    def load(self, key):
+        """Mesh cache'te varsa memory-mapped olarak döndürür, yoksa None"""
+        path = self.cache.lookup(key)
+        if path is None:
+            return None
+        try:
+            return read_mesh(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Mesh cache okunamadı, siliniyor: {e}")
+            self.cache.invalidate(key)
+            return None
+
+    def store(self, key, mesh):
+        """Mesh'i cache'e yazar"""
+        try:
+            write_mesh(self.cache.path_for(key), mesh)
+            self.cache.record(key)
+        except OSError as e:
+            logger.warning(f"Mesh cache yazılamadı: {e}")
+
+    def get_or_build(self, key, build):
+        """Cache'te yoksa build() ile oluşturup kaydeder"""
+        with tracer.span('mesh.load') as span:
+            mesh = self.load(key)
+            span.annotate(cache='miss' if mesh is None else 'hit')
+        if mesh is None:
+            with tracer.span('mesh.build') as span:
+                mesh = build()
+                span.annotate(bytes=mesh.nbytes, triangles=mesh.triangle_count)
+            self.store(key, mesh)
+        return mesh
@@ -0,0 +1,156 @@
+"""
+Pipeline İzleme - Veri yükleme aşamaları için hafif span zamanlayıcıları,
+özet raporu ve Chrome trace (chrome://tracing, Perfetto) dışa aktarımı
+"""
+
+import json
+import os
+import threading
+import time
+
+from config import DEBUG_SETTINGS
+from utils import logger
+
+
+class _NullSpan:
+    """İzleme kapalıyken dönen, hiçbir şey yapmayan span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record(self.name, self.start, end, self.args)
+        return False
+
+    def annotate(self, **args):
+        """Span'e bayt sayısı, cache durumu gibi bilgiler ekler"""
+        self.args.update(args)
+
+
+class PipelineTracer:
+    """
+    Aşama sürelerini olay listesi olarak toplar.
+
+    Kullanım:
+        with tracer.span('tile', x=x, y=y) as span:
+            ...
+            span.annotate(bytes=len(data), cache='miss')
+
+    Kapalıyken span() paylaşılan boş bir nesne döndürür; maliyet tek bir
+    bayrak kontrolüdür. Olaylar farklı thread'lerden eklenebilir.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name, **args):
+        """Bir aşamayı ölçen context manager döndürür"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _record(self, name, start, end, args):
+        event = (name, start, end, threading.get_ident(), args)
+        with self._lock:
+            self._events.append(event)
+
+    def reset(self):
+        """Toplanan olayları siler"""
+        with self._lock:
+            self._events = []
+            self._origin = time.perf_counter()
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def summary(self):
+        """Aşama ismi başına sayı, toplam/maksimum süre, bayt ve cache isabet sayıları"""
+        stages = {}
+        for name, start, end, _, args in self.events():
+            stats = stages.get(name)
+            if stats is None:
+                stats = stages[name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                                        'bytes': 0, 'hits': 0, 'misses': 0, 'errors': 0}
+            duration = (end - start) * 1000.0
+            stats['count'] += 1
+            stats['total_ms'] += duration
+            stats['max_ms'] = max(stats['max_ms'], duration)
+            stats['bytes'] += args.get('bytes', 0)
+            cache = args.get('cache')
+            if cache == 'hit':
+                stats['hits'] += 1
+            elif cache == 'miss':
+                stats['misses'] += 1
+            if 'error' in args:
+                stats['errors'] += 1
+        return stages
+
+    def log_summary(self, title="Pipeline özeti"):
+        """Özeti utils.logger ile yazar (en uzun süren aşama başta)"""
+        stages = self.summary()
+        if not stages:
+            return
+        logger.info(f"{title}:")
+        for name, stats in sorted(stages.items(), key=lambda item: -item[1]['total_ms']):
+            line = (f"  {name:24s} {stats['count']:4d}x  toplam {stats['total_ms']:9.1f} ms  "
+                    f"maks {stats['max_ms']:8.1f} ms")
+            if stats['bytes']:
+                line += f"  {stats['bytes'] / 1024:9.1f} KB"
+            if stats['hits'] or stats['misses']:
+                line += f"  cache {stats['hits']}/{stats['hits'] + stats['misses']}"
+            if stats['errors']:
+                line += f"  hata {stats['errors']}"
+            logger.info(line)
+
+    def export_chrome_trace(self, path):
+        """Olayları Chrome trace JSON biçiminde (tam 'X' olayları) dosyaya yazar"""
+        pid = os.getpid()
+        trace_events = [{
+            'name': name,
+            'cat': name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': pid,
+            'tid': tid,
+            'args': args,
+        } for name, start, end, tid, args in self.events()]
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+
+tracer = PipelineTracer(DEBUG_SETTINGS['TRACE_PIPELINE'])
@@ -0,0 +1,199 @@
+"""
+Kalite Yöneticisi - Ölçülen frame ve veri yükleme sürelerine göre kalite seçimi
+"""
+
+import geo_math
+from config import (APP_SETTINGS, ELEVATION_SETTINGS, QUALITY_SETTINGS, RENDER_SETTINGS,
+                    get_terrain_quality_settings)
+
+QUALITY_TIERS = ('low', 'medium', 'high')
+
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+
+class QualityGovernor:
+    """
+    İki ayrı karar verir:
+
+    - Yükleme kalitesi (terrain_size, tile_zoom): low/medium/high kademeleri
+      arasında sürekli bir seviye (0-2). Her yüklemeden sonra ölçülen tile
+      süresi ve örnek başına elevation maliyetiyle, bir sonraki yüklemenin
+      LOAD_BUDGET_S içinde kalacağı en yüksek seviye seçilir.
+    - Çizim kalitesi (lod_bias): elevation piramidi seviye seçiminde örnek başına
+      piksel çarpanı. Etkileşim sırasında frame süresi FPS_TARGET bütçesini
+      aşarsa artırılır (daha kaba seviye), bütçenin çok altındaysa azaltılır.
+      Etkileşim bitip boşta kalınca 1'e (tam detay) döner.
+
+    height_scale görsel bir abartma ayarıdır, kalite ile değiştirilmez.
+    """
+
+    def __init__(self, fps_target=None, load_budget=None, base_quality=None, adaptive=None):
+        self.adaptive = QUALITY_SETTINGS['ADAPTIVE'] if adaptive is None else adaptive
+        self.fps_target = fps_target or APP_SETTINGS['FPS_TARGET']
+        self.frame_budget_ms = 1000.0 / self.fps_target
+        self.load_budget = load_budget or QUALITY_SETTINGS['LOAD_BUDGET_S']
+
+        base_quality = base_quality or RENDER_SETTINGS['TERRAIN_QUALITY']
+        self.tiers = [get_terrain_quality_settings(tier) for tier in QUALITY_TIERS]
+        self.level = float(QUALITY_TIERS.index(base_quality)) if base_quality in QUALITY_TIERS else 1.0
+
+        self.frame_ms = None  # Etkileşim frame'lerinin üstel ortalaması
+        self.render_bias = 1.0
+        self.interacting = False
+        self._frames_since_change = 0
+
+        self.elevation_cost = None  # Örnek başına saniye (yalnızca API'den gelen yüklemeler)
+        self.tile_seconds = None
+        self.last_load = None
+        self.reason = "başlangıç ayarı"
+
+    # --- Çizim ---
+
+    @property
+    def lod_bias(self):
+        """select_lod_level'da LOD_PIXELS_PER_SAMPLE ile çarpılan katsayı"""
+        if not self.interacting:
+            return 1.0
+        return max(self.render_bias, QUALITY_SETTINGS['INTERACTION_LOD_BIAS'])
+
+    def begin_interaction(self):
+        self.interacting = True
+
+    def end_interaction(self):
+        """Boşta: bir sonraki frame tam detayla çizilir"""
+        self.interacting = False
+
+    def record_frame(self, cpu_ms, gpu_ms=None):
+        """
+        Frame süresini kaydeder. Yalnızca etkileşim frame'leri kararı etkiler;
+        boştaki tek seferlik çizimlerde mesh oluşturma süreleri yanıltıcıdır.
+        """
+        if not self.interacting:
+            return
+
+        frame_ms = max(cpu_ms, gpu_ms or 0.0)
+        smoothing = QUALITY_SETTINGS['SMOOTHING']
+        self.frame_ms = frame_ms if self.frame_ms is None else _lerp(self.frame_ms, frame_ms, smoothing)
+        self._frames_since_change += 1
+
+        # Değişikliğin etkisi görülmeden tekrar karar verilmez
+        if not self.adaptive or self._frames_since_change < QUALITY_SETTINGS['SETTLE_FRAMES']:
+            return
+
+        if self.frame_ms > self.frame_budget_ms * 1.1 and self.render_bias < QUALITY_SETTINGS['MAX_LOD_BIAS']:
+            self.render_bias = min(QUALITY_SETTINGS['MAX_LOD_BIAS'], self.render_bias * 1.5)
+            self.reason = f"frame {self.frame_ms:.1f} ms > bütçe {self.frame_budget_ms:.1f} ms"
+            self._frames_since_change = 0
+        elif self.frame_ms < self.frame_budget_ms * 0.5 and self.render_bias > 1.0:
+            self.render_bias = max(1.0, self.render_bias / 1.25)
+            self.reason = f"frame {self.frame_ms:.1f} ms, bütçe altında"
+            self._frames_since_change = 0
+
+    # --- Yükleme ---
+
+    def settings_for_level(self, level):
+        """
+        Sürekli seviye için kademeler arası enterpolasyonla yükleme ayarları.
+        tile_zoom, grid'in kapladığı alanın MAX_TILE_GRID tile'a sığdığı zoom ile sınırlanır.
+        """
+        level = min(max(level, 0.0), len(self.tiers) - 1.0)
+        lower = min(int(level), len(self.tiers) - 2)
+        t = level - lower
+        low, high = self.tiers[lower], self.tiers[lower + 1]
+
+        step = QUALITY_SETTINGS['SIZE_STEP']
+        size = max(step, int(round(_lerp(low['terrain_size'], high['terrain_size'], t) / step) * step))
+        zoom = int(round(_lerp(low['tile_zoom'], high['tile_zoom'], t)))
+        span = size * ELEVATION_SETTINGS['GRID_SPACING_DEG']
+        return {
+            'terrain_size': size,
+            'tile_zoom': geo_math.span_zoom(span, RENDER_SETTINGS['MAX_TILE_GRID'], zoom),
+            'level': level,
+        }
+
+    def load_settings(self):
+        """Bir sonraki yükleme için terrain_size ve tile_zoom"""
+        return self.settings_for_level(self.level)
+
+    def predict_load_seconds(self, level):
+        """
+        Ölçümlerden tahmini yükleme süresi; ölçüm yoksa None.
+        Elevation henüz API'den ölçülmediyse ELEVATION_COST_PRIOR_S kullanılır.
+        """
+        if self.elevation_cost is None and self.tile_seconds is None:
+            return None
+        size = self.settings_for_level(level)['terrain_size']
+        cost = self.elevation_cost
+        if cost is None:
+            cost = QUALITY_SETTINGS['ELEVATION_COST_PRIOR_S']
+        return (self.tile_seconds or 0.0) + cost * size * size
+
+    def record_load(self, elevation_seconds, tile_seconds, terrain_size, elevation_source=None):
+        """
+        Tamamlanan yüklemenin sürelerini kaydeder ve sonraki yükleme seviyesini seçer.
+        Cache veya yerel DEM'den gelen elevation süresi ağ maliyetini temsil etmez.
+        """
+        smoothing = QUALITY_SETTINGS['SMOOTHING']
+        self.last_load = {'elevation_s': elevation_seconds, 'tiles_s': tile_seconds,
+                          'terrain_size': terrain_size, 'source': elevation_source}
+
+        self.tile_seconds = (tile_seconds if self.tile_seconds is None
+                             else _lerp(self.tile_seconds, tile_seconds, smoothing))
+        if elevation_source == 'api':
+            cost = elevation_seconds / max(1, terrain_size * terrain_size)
+            self.elevation_cost = cost if self.elevation_cost is None else _lerp(self.elevation_cost, cost, smoothing)
+
+        if not self.adaptive:
+            return
+
+        # Elevation maliyeti ölçülmeden (yalnızca cache/yerel yüklemeler) seviye artırılmaz
+        ceiling = len(self.tiers) - 1.0 if self.elevation_cost is not None else self.level
+
+        # Bütçeye sığan en yüksek seviye (0.05 adımlarla)
+        steps = int((len(self.tiers) - 1) / 0.05)
+        chosen = 0.0
+        for i in range(steps, -1, -1):
+            level = i * 0.05
+            if level > ceiling + 1e-6:
+                continue
+            if self.predict_load_seconds(level) <= self.load_budget:
+                chosen = level
+                break
+
+        if abs(chosen - self.level) > 1e-6:
+            predicted = self.predict_load_seconds(chosen)
+            self.reason = f"tahmini yükleme {predicted:.2f} sn, bütçe {self.load_budget:.1f} sn"
+            if self.elevation_cost is None:
+                self.reason += " (elevation ölçülmedi, varsayılan maliyet)"
+            self.level = chosen
+
+    # --- Tanılama ---
+
+    def decision(self):
+        """Geçerli kararı ve dayandığı ölçümleri döndürür"""
+        load = self.load_settings()
+        return {
+            'adaptive': self.adaptive,
+            'tier': QUALITY_TIERS[int(round(self.level))],
+            'level': round(self.level, 2),
+            'terrain_size': load['terrain_size'],
+            'tile_zoom': load['tile_zoom'],
+            'lod_bias': self.lod_bias,
+            'render_bias': self.render_bias,
+            'interacting': self.interacting,
+            'frame_ms': self.frame_ms,
+            'frame_budget_ms': self.frame_budget_ms,
+            'predicted_load_s': self.predict_load_seconds(self.level),
+            'load_budget_s': self.load_budget,
+            'last_load': self.last_load,
+            'reason': self.reason,
+        }
+
+    def format_summary(self):
+        """Performans overlay'i için kısa metin"""
+        d = self.decision()
+        return (f"Kalite: {d['tier']} ({d['level']:.2f}) grid {d['terrain_size']} z{d['tile_zoom']}\n"
+                f"LOD x{d['lod_bias']:.2f}{' (etkileşim)' if d['interacting'] else ''}\n"
+                f"Neden: {d['reason']}")
@@ -0,0 +1,233 @@
+"""
+Render İstatistikleri - Frame başına CPU/GPU süresi, draw call ve bellek ölçümleri
+"""
+
+import ctypes
+import json
+import time
+from collections import deque
+
+import numpy as np
+from OpenGL.GL import *
+
+from config import DEBUG_SETTINGS
+from utils import logger
+
+
+def _gpu_timer_supported():
+    """GL_TIME_ELAPSED timer query desteğini kontrol eder (context aktif olmalı)"""
+    try:
+        if not bool(glGenQueries):
+            return False
+
+        version = glGetString(GL_VERSION)
+        if version:
+            major, minor = version.decode(errors='ignore').split()[0].split('.')[:2]
+            if (int(major), int(minor)) >= (3, 3):
+                return True
+
+        extensions = glGetString(GL_EXTENSIONS) or b''
+        return b'GL_ARB_timer_query' in extensions or b'GL_EXT_timer_query' in extensions
+    except Exception:
+        return False
+
+
+class RenderStats:
+    """
+    paintGL için hafif ölçüm katmanı.
+
+    Her frame begin_frame()/end_frame() arasında draw call, üçgen ve
+    texture belleği sayaçları toplanır. CPU süresi her zaman, GPU süresi
+    ise timer query desteği varsa ölçülür. Son `window` frame üzerinden
+    yüzdelikler hesaplanır.
+    """
+
+    QUERY_RING_SIZE = 4  # GPU sonuçları birkaç frame gecikmeli okunur, pipeline beklemez
+
+    def __init__(self, window=300):
+        self.window = window
+        self.cpu_times = deque(maxlen=window)
+        self.gpu_times = deque(maxlen=window)
+        self.frame_intervals = deque(maxlen=window)
+
+        self.frame_count = 0
+        self.draw_calls = 0
+        self.triangles = 0
+        self.texture_memory = 0
+        self.last_frame = {}
+
+        self.gpu_timing_available = False
+        self._free_queries = []
+        self._pending_queries = deque()
+        self._active_query = None
+
+        self._frame_start = None
+        self._last_frame_end = None
+        self._last_fps_print = time.perf_counter()
+
+    def initialize_gl(self):
+        """GPU timer query nesnelerini oluşturur (initializeGL içinde çağrılır)"""
+        self.gpu_timing_available = _gpu_timer_supported()
+        if not self.gpu_timing_available:
+            return
+
+        try:
+            queries = glGenQueries(self.QUERY_RING_SIZE)
+            self._free_queries = [int(q) for q in np.atleast_1d(queries)]
+        except Exception as e:
+            logger.debug(f"GPU timer query oluşturulamadı: {e}")
+            self.gpu_timing_available = False
+
+    def begin_frame(self):
+        """Frame ölçümünü başlatır"""
+        self.draw_calls = 0
+        self.triangles = 0
+        self._frame_start = time.perf_counter()
+
+        if self.gpu_timing_available and self._free_queries:
+            self._active_query = self._free_queries.pop()
+            glBeginQuery(GL_TIME_ELAPSED, self._active_query)
+
+    def record_draw(self, triangles=0):
+        """Bir draw call'u ve çizdiği üçgen sayısını kaydeder"""
+        self.draw_calls += 1
+        self.triangles += triangles
+
+    def set_texture_memory(self, num_bytes):
+        """Frame'de kullanılan texture belleğini (byte) ayarlar"""
+        self.texture_memory = num_bytes
+
+    def end_frame(self):
+        """Frame ölçümünü bitirir ve hazır GPU sonuçlarını toplar"""
+        if self._frame_start is None:
+            return
+
+        if self._active_query is not None:
+            glEndQuery(GL_TIME_ELAPSED)
+            self._pending_queries.append(self._active_query)
+            self._active_query = None
+
+        end = time.perf_counter()
+        cpu_ms = (end - self._frame_start) * 1000.0
+        self.cpu_times.append(cpu_ms)
+        if self._last_frame_end is not None:
+            self.frame_intervals.append((end - self._last_frame_end) * 1000.0)
+        self._last_frame_end = end
+        self._frame_start = None
+        self.frame_count += 1
+
+        self._collect_gpu_results()
+
+        self.last_frame = {
+            'cpu_ms': cpu_ms,
+            'gpu_ms': self.gpu_times[-1] if self.gpu_times else None,
+            'draw_calls': self.draw_calls,
+            'triangles': self.triangles,
+            'texture_memory': self.texture_memory,
+        }
+
+        if DEBUG_SETTINGS['PRINT_FPS'] and end - self._last_fps_print >= 1.0:
+            self._last_fps_print = end
+            logger.info(self.format_summary())
+
+    def _collect_gpu_results(self):
+        """Sonucu hazır olan timer query'leri bloklamadan okur"""
+        available = ctypes.c_int(0)
+        elapsed = ctypes.c_uint64(0)
+
+        while self._pending_queries:
+            query = self._pending_queries[0]
+            glGetQueryObjectiv(query, GL_QUERY_RESULT_AVAILABLE, ctypes.byref(available))
+            if not available.value:
+                break
+
+            glGetQueryObjectui64v(query, GL_QUERY_RESULT, ctypes.byref(elapsed))
+            self.gpu_times.append(elapsed.value / 1e6)
+            self._free_queries.append(self._pending_queries.popleft())
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return None
+        data = np.fromiter(values, dtype=np.float64, count=len(values))
+        p50, p90, p99 = np.percentile(data, [50, 90, 99])
+        return {
+            'mean': float(data.mean()),
+            'p50': float(p50),
+            'p90': float(p90),
+            'p99': float(p99),
+            'max': float(data.max()),
+        }
+
+    def fps(self):
+        """
+        Ortalama frame süresinden FPS: 1000 / max(ortalama CPU, ortalama GPU) ms.
+        Çizim talep üzerine yapıldığından frame aralıkları boşta beklemeyi içerir;
+        bu değer çizimin kaldırabileceği hızı gösterir.
+        """
+        if not self.cpu_times:
+            return 0.0
+        frame_ms = sum(self.cpu_times) / len(self.cpu_times)
+        if self.gpu_times:
+            frame_ms = max(frame_ms, sum(self.gpu_times) / len(self.gpu_times))
+        return 1000.0 / frame_ms if frame_ms > 0 else 0.0
+
+    def presentation_rate(self):
+        """Ardışık frame aralıklarından saniyedeki çizim sayısı (boşta beklemeler dahil)"""
+        if not self.frame_intervals:
+            return 0.0
+        mean_interval = sum(self.frame_intervals) / len(self.frame_intervals)
+        return 1000.0 / mean_interval if mean_interval > 0 else 0.0
+
+    def snapshot(self):
+        """Mevcut istatistikleri sözlük olarak döndürür"""
+        return {
+            'frame_count': self.frame_count,
+            'fps': self.fps(),
+            'presentation_rate': self.presentation_rate(),
+            'gpu_timing_available': self.gpu_timing_available,
+            'cpu_ms': self._percentiles(self.cpu_times),
+            'gpu_ms': self._percentiles(self.gpu_times),
+            'last_frame': dict(self.last_frame),
+        }
+
+    def export_json(self, path):
+        """İstatistikleri ve ham frame sürelerini JSON dosyasına yazar"""
+        data = self.snapshot()
+        data['samples'] = {
+            'cpu_ms': list(self.cpu_times),
+            'gpu_ms': list(self.gpu_times),
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def format_summary(self):
+        """Overlay ve log için kısa metin özeti"""
+        lines = [f"FPS: {self.fps():.1f} (frame süresi) | Çizim: {self.presentation_rate():.1f}/sn (boşta dahil)"]
+
+        cpu = self._percentiles(self.cpu_times)
+        if cpu:
+            lines.append(f"CPU: {cpu['p50']:.2f} ms (p90 {cpu['p90']:.2f}, p99 {cpu['p99']:.2f})")
+
+        gpu = self._percentiles(self.gpu_times)
+        if gpu:
+            lines.append(f"GPU: {gpu['p50']:.2f} ms (p90 {gpu['p90']:.2f}, p99 {gpu['p99']:.2f})")
+        elif not self.gpu_timing_available:
+            lines.append("GPU: n/a")
+
+        last = self.last_frame
+        if last:
+            lines.append(f"Draw calls: {last['draw_calls']} | Üçgen: {last['triangles']}")
+            lines.append(f"Texture: {last['texture_memory'] / (1024 * 1024):.1f} MB")
+
+        return '\n'.join(lines)
+
+    def cleanup(self):
+        """GPU query nesnelerini siler"""
+        queries = self._free_queries + list(self._pending_queries)
+        if queries:
+            glDeleteQueries(len(queries), queries)
+        self._free_queries = []
+        self._pending_queries.clear()
+        self.gpu_timing_available = False
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Yerel Test Sunucusu - OSM tile ve Open-Elevation uç noktalarının yerine geçen,
+gecikmesi ve hata oranı ayarlanabilir deterministik HTTP sunucusu
+
+Örnek:
+    python stub_map_server.py --port 8765 --latency 0.05 --failure-rate 0.1
+    MAP_TILE_URL=http://127.0.0.1:8765/tiles/{z}/{x}/{y}.png \\
+    MAP_ELEVATION_API_URL=http://127.0.0.1:8765/api/v1/lookup python main.py
+"""
+
+import argparse
+import io
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+_TILE_PATH = re.compile(r'^/tiles/(\d+)/(\d+)/(\d+)\.png$')
+
+
+def stub_elevation(lat, lon):
+    """Konuma bağlı, tekrarlanabilir sahte yükseklik (metre)"""
+    return (500.0 + 300.0 * math.sin(math.radians(lat) * 40.0) * math.cos(math.radians(lon) * 40.0)
+            + 80.0 * math.sin(math.radians(lat + lon) * 400.0))
+
+
+def stub_tile_png(z, x, y, tile_size=256):
+    """Tile koordinatından renk türetilmiş, sıkıştırılmış PNG baytları"""
+    image = Image.new('RGB', (tile_size, tile_size),
+                      ((x * 37) % 256, (y * 59) % 256, (z * 23) % 256))
+    # Gerçek tile'lara benzer PNG çözme maliyeti için basit bir desen
+    for offset in range(0, tile_size, 32):
+        image.paste((255, 255, 255), (offset, 0, offset + 2, tile_size))
+        image.paste((255, 255, 255), (0, offset, tile_size, offset + 2))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server_version = 'StubMapServer/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay_or_fail(self):
+        """Ayarlanan gecikmeyi uygular; hata oranına göre True (503 gönderildi) döndürür"""
+        stub = self.server.stub
+        if stub.latency > 0:
+            time.sleep(stub.latency + stub.random_uniform(0, stub.jitter))
+        if stub.should_fail():
+            self._send(503, b'stub failure', 'text/plain')
+            return True
+        return False
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.stub.count('tile')
+        match = _TILE_PATH.match(self.path)
+        if match is None:
+            self._send(404, b'not found', 'text/plain')
+            return
+        if self._delay_or_fail():
+            return
+        z, x, y = (int(v) for v in match.groups())
+        self._send(200, self.server.stub.tile(z, x, y), 'image/png')
+
+    def do_POST(self):
+        self.server.stub.count('elevation')
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        if self.path != '/api/v1/lookup':
+            self._send(404, b'not found', 'text/plain')
+            return
+        if self._delay_or_fail():
+            return
+        try:
+            locations = json.loads(body)['locations']
+        except (ValueError, KeyError):
+            self._send(400, b'bad request', 'text/plain')
+            return
+
+        results = [{'latitude': loc['latitude'], 'longitude': loc['longitude'],
+                    'elevation': stub_elevation(loc['latitude'], loc['longitude'])}
+                   for loc in locations]
+        self._send(200, json.dumps({'results': results}).encode(), 'application/json')
+
+
+class StubMapServer:
+    """
+    Tile (GET /tiles/{z}/{x}/{y}.png) ve elevation (POST /api/v1/lookup)
+    uç noktalarını ayrı bir thread'de sunar.
+
+    Üretilen tile'lar bellekte tutulur; istek sayıları `requests` ve
+    `failures` sözlüklerinde toplanır. Hata kararları seed'li bir rastgele
+    üreteçle verilir, böylece aynı ayarlarla aynı istek dizisi aynı sonucu verir.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 failure_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = {'tile': 0, 'elevation': 0}
+        self.failures = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tiles = {}
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tile_url(self):
+        return self.base_url + '/tiles/{z}/{x}/{y}.png'
+
+    @property
+    def elevation_url(self):
+        return self.base_url + '/api/v1/lookup'
+
+    def api_settings(self):
+        """API_SETTINGS'e uygulanacak uç nokta değerleri"""
+        return {'OSM_TILE_URL': self.tile_url, 'ELEVATION_API_URL': self.elevation_url}
+
+    def count(self, kind):
+        with self._lock:
+            self.requests[kind] += 1
+
+    def random_uniform(self, low, high):
+        if high <= low:
+            return low
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def should_fail(self):
+        if self.failure_rate <= 0:
+            return False
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        return failed
+
+    def tile(self, z, x, y):
+        key = (z, x, y)
+        data = self._tiles.get(key)
+        if data is None:
+            data = stub_tile_png(z, x, y)
+            self._tiles[key] = data
+        return data
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = {'tile': 0, 'elevation': 0}
+            self.failures = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name='stub-map-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Yerel tile/elevation test sunucusu")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="İstek başına gecikme (sn)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Gecikmeye eklenen rastgele süre (sn)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="503 dönen istek oranı (0-1)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = StubMapServer(args.host, args.port, args.latency, args.jitter,
+                           args.failure_rate, args.seed)
+    print(f"MAP_TILE_URL={server.tile_url}")
+    print(f"MAP_ELEVATION_API_URL={server.elevation_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Eş Yükselti Eğrileri - Elevation grid'inden vektörize marching squares ile
+kontur çizgileri çıkarır, segmentleri polyline'lara birleştirir ve sonucu cache'ler
+
+Noktalar grid koordinatlarında (sütun, satır) saklanır; dünya koordinatlarına
+çevirme height_scale'e bağlı olduğundan çizim tarafında yapılır. Böylece cache
+yalnızca elevation içeriği ve aralığa bağlıdır.
+"""
+
+import hashlib
+import io
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from cache_manager import get_cache_manager
+from config import CONTOUR_SETTINGS
+from pipeline_trace import tracer
+from terrain_mesh import TERRAIN_EXTENT
+from utils import logger
+
+# Hücre kenarları: 0 alt (a-b), 1 sağ (b-c), 2 üst (d-c), 3 sol (a-d)
+# a=(r, c), b=(r, c+1), c=(r+1, c+1), d=(r+1, c); her kenarın iki ucu (satır, sütun ofseti)
+_EDGE_ENDS = np.array([
+    [[0, 0], [0, 1]],
+    [[0, 1], [1, 1]],
+    [[1, 0], [1, 1]],
+    [[0, 0], [1, 0]],
+], dtype=np.int64)
+_EDGE_VERTICAL = np.array([0, 1, 0, 1], dtype=np.int64)
+
+# Durum (a=1, b=2, c=4, d=8 bitleri) -> en fazla iki segment (kenar, kenar).
+# 16 ve 17: merkezi eşiğin üstünde kalan 5 ve 10 numaralı eyer durumları
+_SEGMENTS = np.full((18, 2, 2), -1, dtype=np.int64)
+for _case, _pairs in {
+    1: [(3, 0)], 2: [(0, 1)], 3: [(3, 1)], 4: [(1, 2)],
+    5: [(3, 0), (1, 2)], 6: [(0, 2)], 7: [(3, 2)], 8: [(2, 3)],
+    9: [(0, 2)], 10: [(0, 1), (2, 3)], 11: [(1, 2)], 12: [(3, 1)],
+    13: [(0, 1)], 14: [(3, 0)],
+    16: [(0, 1), (2, 3)], 17: [(3, 0), (1, 2)],
+}.items():
+    for _slot, _pair in enumerate(_pairs):
+        _SEGMENTS[_case, _slot] = _pair
+
+
+class ContourLines:
+    """
+    Polyline listesi: points (N, 2) float32 (sütun, satır), counts (P,) int32
+    polyline başına nokta sayısı, levels (P,) float32 polyline'ın yüksekliği.
+    Kapalı eğrilerde son nokta ilk noktayı tekrarlar.
+    """
+
+    ARRAY_NAMES = ('points', 'counts', 'levels')
+
+    def __init__(self, points, counts, levels, shape, interval):
+        self.points = points
+        self.counts = counts
+        self.levels = levels
+        self.shape = tuple(shape)
+        self.interval = interval
+
+    @property
+    def polyline_count(self):
+        return len(self.counts)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_NAMES)
+
+    def firsts(self):
+        """Her polyline'ın ilk nokta indeksi (glMultiDrawArrays için)"""
+        firsts = np.zeros(len(self.counts), dtype=np.int32)
+        np.cumsum(self.counts[:-1], out=firsts[1:])
+        return firsts
+
+    def world_vertices(self, height_scale, z_offset=0.0, extent=TERRAIN_EXTENT):
+        """Noktaları build_terrain_mesh ile aynı dünya koordinatlarına çevirir: (N, 3) float32"""
+        rows, cols = self.shape
+        vertices = np.empty((len(self.points), 3), dtype=np.float32)
+        vertices[:, 0] = (self.points[:, 0] / (cols - 1) - 0.5) * extent
+        vertices[:, 1] = (self.points[:, 1] / (rows - 1) - 0.5) * extent
+        vertices[:, 2] = np.repeat(self.levels * np.float32(height_scale), self.counts)
+        vertices[:, 2] += np.float32(z_offset)
+        return vertices
+
+
+def contour_levels(elevation_data, interval, max_levels=None):
+    """Grid'in yükseklik aralığına düşen aralık katları (çok fazlaysa aralık büyütülür)"""
+    max_levels = max_levels or CONTOUR_SETTINGS['MAX_LEVELS']
+    low, high = float(np.nanmin(elevation_data)), float(np.nanmax(elevation_data))
+
+    count = math.floor(high / interval) - math.ceil(low / interval) + 1
+    if count > max_levels:
+        step = math.ceil(count / max_levels)
+        logger.warning(f"{count} kontur seviyesi fazla, aralık {interval * step} m'ye çıkarıldı")
+        interval *= step
+    start = math.ceil(low / interval) * interval
+    return np.arange(start, high + interval * 0.5, interval, dtype=np.float64)
+
+
+def marching_squares(elevation_data, level):
+    """
+    Tek bir seviye için tüm hücreleri aynı anda işler.
+    Dönüş: (p0, p1, e0, e1) - segment uç noktaları (S, 2) ve grid kenar kimlikleri (S,).
+    Komşu hücrelerin ortak kenarı aynı kimliği ve aynı noktayı verir.
+    """
+    z = np.asarray(elevation_data, dtype=np.float64)
+    rows, cols = z.shape
+
+    above = z >= level
+    case = (above[:-1, :-1] * 1 + above[:-1, 1:] * 2 +
+            above[1:, 1:] * 4 + above[1:, :-1] * 8).astype(np.int64)
+
+    # Eyer durumları hücre merkezi (dört köşe ortalaması) ile ayrılır
+    saddle = (case == 5) | (case == 10)
+    if saddle.any():
+        center = (z[:-1, :-1] + z[:-1, 1:] + z[1:, 1:] + z[1:, :-1]) * 0.25
+        high = saddle & (center >= level)
+        case[high] = np.where(case[high] == 5, 16, 17)
+
+    cell_r, cell_c = np.nonzero((case != 0) & (case != 15))
+    cell_case = case[cell_r, cell_c]
+
+    starts, ends, start_ids, end_ids = [], [], [], []
+    for slot in range(2):
+        pairs = _SEGMENTS[cell_case, slot]
+        used = pairs[:, 0] >= 0
+        r, c, pairs = cell_r[used], cell_c[used], pairs[used]
+        for side, (out_points, out_ids) in enumerate(((starts, start_ids), (ends, end_ids))):
+            edge = pairs[:, side]
+            ends_rc = _EDGE_ENDS[edge]
+            r0, c0 = r + ends_rc[:, 0, 0], c + ends_rc[:, 0, 1]
+            r1, c1 = r + ends_rc[:, 1, 0], c + ends_rc[:, 1, 1]
+            h0, h1 = z[r0, c0], z[r1, c1]
+            t = (level - h0) / (h1 - h0)
+            points = np.empty((len(edge), 2), dtype=np.float32)
+            points[:, 0] = c0 + t * (c1 - c0)
+            points[:, 1] = r0 + t * (r1 - r0)
+            out_points.append(points)
+            out_ids.append((r0 * cols + c0) * 2 + _EDGE_VERTICAL[edge])
+
+    return (np.concatenate(starts), np.concatenate(ends),
+            np.concatenate(start_ids), np.concatenate(end_ids))
+
+
+def stitch_segments(p0, p1, e0, e1):
+    """
+    Ortak kenarı paylaşan segmentleri polyline'lara birleştirir.
+    Her grid kenarına en fazla iki segment değdiğinden graf yollar ve
+    döngülerden oluşur; önce açık uçlardan, sonra kalan döngülerden yürünür.
+    Dönüş: (points (N, 2), counts list)
+    """
+    n = len(e0)
+    if n == 0:
+        return np.empty((0, 2), dtype=np.float32), []
+
+    # Uç k: k < n ise segment k'nın başı, değilse segment k - n'nin sonu
+    endpoint_ids = np.concatenate((e0, e1))
+    order = np.argsort(endpoint_ids, kind='stable')
+    shared = np.nonzero(endpoint_ids[order[1:]] == endpoint_ids[order[:-1]])[0]
+    partner = np.full(2 * n, -1, dtype=np.int64)
+    partner[order[shared]] = order[shared + 1]
+    partner[order[shared + 1]] = order[shared]
+
+    partner = partner.tolist()
+    visited = bytearray(n)
+    path = []
+    counts = []
+
+    def walk(k):
+        path.append(k)
+        length = 1
+        while True:
+            segment = k % n
+            visited[segment] = 1
+            k = k + n if k < n else k - n  # Segmentin diğer ucu
+            path.append(k)
+            length += 1
+            k = partner[k]
+            if k < 0 or visited[k % n]:
+                return length
+
+    open_ends = np.nonzero(np.asarray(partner) < 0)[0].tolist()
+    for k in open_ends:
+        if not visited[k % n]:
+            counts.append(walk(k))
+    for segment in range(n):
+        if not visited[segment]:
+            counts.append(walk(segment))
+
+    endpoints = np.concatenate((p0, p1))
+    return endpoints[np.asarray(path, dtype=np.int64)], counts
+
+
+def extract_contours(elevation_data, interval):
+    """Tüm seviyeler için kontur polyline'larını çıkarır"""
+    elevation_data = np.asarray(elevation_data)
+    all_points, all_counts, all_levels = [], [], []
+    for level in contour_levels(elevation_data, interval):
+        points, counts = stitch_segments(*marching_squares(elevation_data, level))
+        if not counts:
+            continue
+        all_points.append(points)
+        all_counts.extend(counts)
+        all_levels.extend([level] * len(counts))
+
+    if not all_points:
+        all_points = [np.empty((0, 2), dtype=np.float32)]
+    return ContourLines(np.concatenate(all_points),
+                        np.asarray(all_counts, dtype=np.int32),
+                        np.asarray(all_levels, dtype=np.float32),
+                        elevation_data.shape, interval)
+
+
+def contour_cache_key(elevation_data, interval):
+    """Elevation içeriği + aralık (+ seviye sınırı) üzerinden cache anahtarı"""
+    digest = hashlib.blake2b(digest_size=16)
+    data = np.ascontiguousarray(elevation_data)
+    digest.update(str((data.shape, data.dtype.str)).encode())
+    digest.update(memoryview(data).cast('B'))
+    digest.update(repr((float(interval), CONTOUR_SETTINGS['MAX_LEVELS'])).encode())
+    return f"contours_{digest.hexdigest()}.npz"
+
+
+def load_or_extract_contours(elevation_data, interval, cache_dir=None):
+    """Konturları cache'ten okur; yoksa çıkarıp kaydeder"""
+    cache = get_cache_manager(cache_dir)
+    key = contour_cache_key(elevation_data, interval)
+
+    with tracer.span('contours.load') as span:
+        path = cache.lookup(key)
+        lines = None
+        if path is not None:
+            try:
+                with np.load(path) as data:
+                    lines = ContourLines(data['points'], data['counts'], data['levels'],
+                                         np.shape(elevation_data), interval)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Kontur cache'i okunamadı, siliniyor: {e}")
+                cache.invalidate(key)
+        span.annotate(cache='miss' if lines is None else 'hit')
+    if lines is not None:
+        return lines
+
+    with tracer.span('contours.extract', shape=list(np.shape(elevation_data)),
+                     interval=interval) as span:
+        lines = extract_contours(elevation_data, interval)
+        span.annotate(polylines=lines.polyline_count, points=len(lines.points))
+
+    buffer = io.BytesIO()
+    np.savez(buffer, points=lines.points, counts=lines.counts, levels=lines.levels)
+    try:
+        cache.store_bytes(key, buffer.getvalue())
+    except OSError as e:
+        logger.warning(f"Konturlar cache'e yazılamadı: {e}")
+    return lines
+
+
+class ContourBuilder(QObject):
+    """
+    Konturları tek bir arka plan thread'inde hesaplar; çizim beklemez.
+    Yeni istek gelince eski sonuçlar atılır. Hazır olunca contours_ready
+    (istek numarası, ContourLines) sinyali ana thread'e iletilir; alıcı
+    is_current ile sonucun hâlâ geçerli olduğunu doğrular.
+    """
+
+    contours_ready = pyqtSignal(int, object)
+
+    def __init__(self):
+        super().__init__()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='contours')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._closed = False
+
+    def request(self, elevation_data, interval):
+        """(elevation_data, interval) için hesaplamayı başlatır; öncekileri geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        self._executor.submit(self._run_job, generation, elevation_data, interval)
+
+    def cancel(self):
+        """Bekleyen sonuçları geçersiz kılar"""
+        with self._lock:
+            self._generation += 1
+
+    def is_current(self, generation):
+        with self._lock:
+            return generation == self._generation and not self._closed
+
+    def _run_job(self, generation, elevation_data, interval):
+        if not self.is_current(generation):
+            return
+        try:
+            lines = load_or_extract_contours(elevation_data, interval)
+        except Exception as e:
+            logger.warning(f"Konturlar hesaplanamadı: {e}")
+            return
+        if self.is_current(generation):
+            self.contours_ready.emit(generation, lines)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Arazi Dışa Aktarma - Elevation grid'ini binary glTF (.glb), OBJ veya STL olarak
+satır şeritleri halinde yazar
+
+Grid şerit şerit okunur; her şeridin vertex, normal ve UV dizileri hesaplanıp
+doğrudan dosyaya yazılır. Tüm vertex listesi hiçbir zaman bellekte tutulmaz,
+bu yüzden np.memmap üzerindeki çok büyük DEM'ler (dem_raster.LocalDEMSource)
+de sabit bellekle aktarılabilir. step ile her n'inci örnek alınarak
+basitleştirilir; tile_size ile çıktı kenarları ortak dosyalara bölünür.
+
+Eksenler: glTF ve OBJ Y-yukarı (x doğu, y yükseklik, z güney), STL Z-yukarı.
+
+Örnek:
+    python terrain_export.py --coord 41.0082,28.9784 --size 200 --out istanbul.glb
+    python terrain_export.py --dem dem.tif --step 4 --tile-size 4096 --out dem.glb
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import struct
+import sys
+
+import numpy as np
+
+import geo_math
+from config import EXPORT_SETTINGS, RENDER_SETTINGS
+from pipeline_trace import tracer
+from terrain_mesh import TERRAIN_EXTENT, grid_indices, terrain_uv_axes
+from utils import logger, setup_logging
+
+EXPORT_FORMATS = ('glb', 'obj', 'stl')
+
+_GLB_MAGIC = 0x46546C67  # 'glTF'
+_GLB_CHUNK_JSON = 0x4E4F534A
+_GLB_CHUNK_BIN = 0x004E4942
+_GLB_MAX_BYTES = 0xFFFFFFFF
+_GL_FLOAT = 5126
+_GL_UNSIGNED_INT = 5125
+_GL_ARRAY_BUFFER = 34962
+_GL_ELEMENT_ARRAY_BUFFER = 34963
+_GL_LINEAR = 9729
+_GL_CLAMP_TO_EDGE = 33071
+
+_STL_RECORD = np.dtype([('normal', '<f4', (3,)), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+
+def _pad4(length):
+    return (length + 3) // 4 * 4
+
+
+class ExportGrid:
+    """
+    Basitleştirilmiş grid: kaynak dizinin her step'inci satır/sütunu ve
+    bunların çıktı koordinatları. Kaynak satır 0 güneydir (uygulamanın grid
+    düzeni); step'e tam bölünmeyen son satır/sütunlar atılır.
+    """
+
+    def __init__(self, source, xs, ys, z_scale, step=1, us=None, vs=None, nodata=None):
+        self.source = source
+        self.step = step
+        self.xs = xs  # Sütun başına x (basitleştirilmiş grid)
+        self.ys = ys  # Satır başına y
+        self.z_scale = z_scale
+        self.us = us  # Sütun başına u ve satır başına v (texture yoksa None)
+        self.vs = vs
+        self.nodata = nodata
+
+    @property
+    def shape(self):
+        return len(self.ys), len(self.xs)
+
+    def read(self, r0, r1, c0, c1):
+        """Basitleştirilmiş grid'in [r0, r1) x [c0, c1) bölgesi (float32 kopya)"""
+        step = self.step
+        block = self.source[r0 * step:(r1 - 1) * step + 1:step, c0 * step:(c1 - 1) * step + 1:step]
+        block = np.array(block, dtype=np.float32)
+        if self.nodata is not None:
+            # Yükleyici ile aynı: nodata (NaN dahil) deniz seviyesine çekilir
+            nodata = np.float32(self.nodata)
+            block[np.isnan(block) if np.isnan(nodata) else block == nodata] = 0.0
+        return block
+
+    def tiles(self, tile_size):
+        """(satır0, satır1, sütun0, sütun1) tile aralıkları; komşu tile'lar bir kenarı paylaşır"""
+        rows, cols = self.shape
+        if not tile_size or tile_size >= max(rows, cols):
+            return [(0, rows, 0, cols)]
+        span = tile_size - 1
+        return [(r0, min(r0 + tile_size, rows), c0, min(c0 + tile_size, cols))
+                for r0 in range(0, rows - 1, span)
+                for c0 in range(0, cols - 1, span)]
+
+
+class ExportTile:
+    """Tek çıktı dosyasının bölgesi; şerit üreteçleri Z-yukarı dizileri verir"""
+
+    def __init__(self, grid, r0, r1, c0, c1, image=None):
+        self.grid = grid
+        self.r0, self.r1, self.c0, self.c1 = r0, r1, c0, c1
+        self.rows = r1 - r0
+        self.cols = c1 - c0
+        self.image = None
+        self.us = self.vs = None
+        if image is not None and grid.us is not None:
+            self._crop_texture(image)
+
+        if self.vertex_count > 2 ** 32:
+            raise ValueError("Tile 2^32 vertex'i aşıyor, tile_size ile bölün")
+
+    @property
+    def vertex_count(self):
+        return self.rows * self.cols
+
+    @property
+    def triangle_count(self):
+        return 2 * (self.rows - 1) * (self.cols - 1)
+
+    @property
+    def band_rows(self):
+        return max(2, EXPORT_SETTINGS['BAND_VERTICES'] // self.cols)
+
+    def _crop_texture(self, image):
+        """Görüntünün bu tile'a düşen kısmını keser, UV'leri kesite göre ölçekler"""
+        from PIL import Image
+
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        width, height = image.size
+        us = self.grid.us[self.c0:self.c1] * width
+        vs = self.grid.vs[self.r0:self.r1] * height
+
+        x0 = int(np.clip(math.floor(us.min()), 0, width - 1))
+        x1 = int(np.clip(math.ceil(us.max()), x0 + 1, width))
+        y0 = int(np.clip(math.floor(vs.min()), 0, height - 1))
+        y1 = int(np.clip(math.ceil(vs.max()), y0 + 1, height))
+
+        self.image = image.convert('RGB').crop((x0, y0, x1, y1))
+        self.us = ((us - x0) / (x1 - x0)).astype(np.float32)
+        self.vs = ((vs - y0) / (y1 - y0)).astype(np.float32)
+
+    def png_bytes(self):
+        buffer = io.BytesIO()
+        self.image.save(buffer, format='PNG')
+        return buffer.getvalue()
+
+    def z_range(self):
+        """Tile'ın ölçeklenmiş yükseklik aralığı (glTF accessor min/max için ön geçiş)"""
+        low, high = np.inf, -np.inf
+        for start in range(self.r0, self.r1, self.band_rows):
+            block = self.grid.read(start, min(start + self.band_rows, self.r1), self.c0, self.c1)
+            low, high = min(low, float(block.min())), max(high, float(block.max()))
+        scale = self.grid.z_scale
+        return low * scale, high * scale
+
+    def bands(self):
+        """
+        Satır şeritleri: (tile içi ilk satır, positions (n, 3), normals (n, 3),
+        uvs (n, 2) veya None). Normaller için şeridin bir satır/sütun çevresi de
+        okunur, böylece şerit ve tile sınırlarında normaller kesintisizdir.
+        """
+        grid = self.grid
+        rows, cols = grid.shape
+        mc0, mc1 = max(self.c0 - 1, 0), min(self.c1 + 1, cols)
+
+        for start in range(self.r0, self.r1, self.band_rows):
+            stop = min(start + self.band_rows, self.r1)
+            m0, m1 = max(start - 1, 0), min(stop + 1, rows)
+            z = grid.read(m0, m1, mc0, mc1)
+            z *= np.float32(grid.z_scale)
+
+            # Aralıklar sabit; skaler verilince sonuç şerit sınırlarından bağımsızdır
+            dz_dy, dz_dx = np.gradient(z, grid.ys[1] - grid.ys[0], grid.xs[1] - grid.xs[0])
+            inner = (slice(start - m0, stop - m0), slice(self.c0 - mc0, self.c1 - mc0))
+            z, dz_dx, dz_dy = z[inner], dz_dx[inner], dz_dy[inner]
+            band_rows = stop - start
+
+            positions = np.empty((band_rows, self.cols, 3), dtype=np.float32)
+            positions[..., 0] = grid.xs[self.c0:self.c1][np.newaxis, :]
+            positions[..., 1] = grid.ys[start:stop][:, np.newaxis]
+            positions[..., 2] = z
+
+            normals = np.empty((band_rows, self.cols, 3), dtype=np.float32)
+            length = np.sqrt(dz_dx * dz_dx + dz_dy * dz_dy + 1.0)
+            normals[..., 0] = -dz_dx / length
+            normals[..., 1] = -dz_dy / length
+            normals[..., 2] = 1.0 / length
+
+            uvs = None
+            if self.image is not None:
+                uvs = np.empty((band_rows, self.cols, 2), dtype=np.float32)
+                uvs[..., 0] = self.us[np.newaxis, :]
+                uvs[..., 1] = self.vs[start - self.r0:stop - self.r0][:, np.newaxis]
+                uvs = uvs.reshape(-1, 2)
+
+            yield start - self.r0, positions.reshape(-1, 3), normals.reshape(-1, 3), uvs
+
+    def quad_indices(self, q0, q1):
+        """
+        [q0, q1) quad satırlarının üçgen indeksleri (tile vertex numaralarıyla)
+        """
+        return _ccw_indices(q1 - q0 + 1, self.cols) + np.uint32(q0 * self.cols)
+
+    def quad_bands(self):
+        """quad_indices için (q0, q1) aralıkları, vertex şeritleriyle aynı boyda"""
+        for q0 in range(0, self.rows - 1, self.band_rows):
+            yield q0, min(q0 + self.band_rows, self.rows - 1)
+
+
+def _ccw_indices(rows, cols):
+    """
+    grid_indices ile aynı köşegen; ilk üçgeni ters çevrilerek iki üçgen de
+    yukarıdan bakınca saat yönü tersine (normal +Z) sarılır. (k, 3) uint32
+    """
+    quads = grid_indices(rows, cols).reshape(-1, 6)
+    return np.ascontiguousarray(quads[:, [2, 1, 0, 3, 4, 5]]).reshape(-1, 3)
+
+
+def _y_up(array):
+    """Z-yukarı (x, y, z) -> Y-yukarı (x, z, -y); dönüş olduğundan sarım yönü korunur"""
+    out = np.empty_like(array)
+    out[:, 0] = array[:, 0]
+    out[:, 1] = array[:, 2]
+    out[:, 2] = -array[:, 1]
+    return out
+
+
+def _write_glb(path, tile, progress=None):
+    """Binary glTF 2.0: tek primitive, iç içe (interleaved) vertex buffer + uint32 indeksler"""
+    grid = tile.grid
+    textured = tile.image is not None
+    stride = 32 if textured else 24
+    vertex_bytes = tile.vertex_count * stride
+    index_bytes = tile.triangle_count * 3 * 4
+    png = tile.png_bytes() if textured else b''
+    bin_length = _pad4(vertex_bytes + index_bytes + len(png))
+
+    z_low, z_high = tile.z_range()
+    ys = grid.ys[tile.r0:tile.r1]
+    position_min = [float(grid.xs[tile.c0]), z_low, -float(ys[-1])]
+    position_max = [float(grid.xs[tile.c1 - 1]), z_high, -float(ys[0])]
+
+    attributes = {'POSITION': 0, 'NORMAL': 1}
+    accessors = [
+        {'bufferView': 0, 'byteOffset': 0, 'componentType': _GL_FLOAT, 'count': tile.vertex_count,
+         'type': 'VEC3', 'min': position_min, 'max': position_max},
+        {'bufferView': 0, 'byteOffset': 12, 'componentType': _GL_FLOAT, 'count': tile.vertex_count,
+         'type': 'VEC3'},
+    ]
+    if textured:
+        attributes['TEXCOORD_0'] = len(accessors)
+        accessors.append({'bufferView': 0, 'byteOffset': 24, 'componentType': _GL_FLOAT,
+                          'count': tile.vertex_count, 'type': 'VEC2'})
+    accessors.append({'bufferView': 1, 'componentType': _GL_UNSIGNED_INT,
+                      'count': tile.triangle_count * 3, 'type': 'SCALAR'})
+
+    buffer_views = [
+        {'buffer': 0, 'byteOffset': 0, 'byteLength': vertex_bytes, 'byteStride': stride,
+         'target': _GL_ARRAY_BUFFER},
+        {'buffer': 0, 'byteOffset': vertex_bytes, 'byteLength': index_bytes,
+         'target': _GL_ELEMENT_ARRAY_BUFFER},
+    ]
+    material = {'name': 'terrain', 'pbrMetallicRoughness': {'metallicFactor': 0.0, 'roughnessFactor': 1.0}}
+
+    document = {
+        'asset': {'version': '2.0', 'generator': 'python3Dmap terrain_export'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0, 'name': os.path.splitext(os.path.basename(path))[0]}],
+        'meshes': [{'primitives': [{'attributes': attributes, 'indices': len(accessors) - 1,
+                                    'material': 0}]}],
+        'materials': [material],
+        'accessors': accessors,
+        'bufferViews': buffer_views,
+        'buffers': [{'byteLength': bin_length}],
+    }
+    if textured:
+        buffer_views.append({'buffer': 0, 'byteOffset': vertex_bytes + index_bytes, 'byteLength': len(png)})
+        document['images'] = [{'bufferView': 2, 'mimeType': 'image/png'}]
+        document['samplers'] = [{'magFilter': _GL_LINEAR, 'minFilter': _GL_LINEAR,
+                                 'wrapS': _GL_CLAMP_TO_EDGE, 'wrapT': _GL_CLAMP_TO_EDGE}]
+        document['textures'] = [{'source': 0, 'sampler': 0}]
+        material['pbrMetallicRoughness']['baseColorTexture'] = {'index': 0}
+
+    json_bytes = json.dumps(document, separators=(',', ':')).encode()
+    json_bytes += b' ' * (_pad4(len(json_bytes)) - len(json_bytes))
+    total = 12 + 8 + len(json_bytes) + 8 + bin_length
+    if total > _GLB_MAX_BYTES:
+        raise ValueError(f"GLB 4 GB sınırını aşıyor ({total / 1e9:.1f} GB), tile_size ile bölün")
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<III', _GLB_MAGIC, 2, total))
+        f.write(struct.pack('<II', len(json_bytes), _GLB_CHUNK_JSON))
+        f.write(json_bytes)
+        f.write(struct.pack('<II', bin_length, _GLB_CHUNK_BIN))
+
+        for start, positions, normals, uvs in tile.bands():
+            interleaved = np.empty((len(positions), stride // 4), dtype='<f4')
+            interleaved[:, 0:3] = _y_up(positions)
+            interleaved[:, 3:6] = _y_up(normals)
+            if textured:
+                interleaved[:, 6:8] = uvs
+            f.write(memoryview(interleaved).cast('B'))
+            if progress:
+                progress(0.5 * (start + len(positions) // tile.cols) / tile.rows)
+
+        for q0, q1 in tile.quad_bands():
+            f.write(memoryview(tile.quad_indices(q0, q1).astype('<u4', copy=False)).cast('B'))
+            if progress:
+                progress(0.5 + 0.5 * q1 / max(tile.rows - 1, 1))
+
+        f.write(png)
+        f.write(b'\0' * (bin_length - vertex_bytes - index_bytes - len(png)))
+    return total
+
+
+def _write_obj(path, tile, progress=None):
+    """Wavefront OBJ (+ MTL ve PNG texture); yüzler tanımlanmış vertex'lere atıfta bulunur"""
+    stem = os.path.splitext(path)[0]
+    textured = tile.image is not None
+    if textured:
+        tile.image.save(f"{stem}.png")
+        with open(f"{stem}.mtl", 'w', encoding='utf-8') as f:
+            f.write("newmtl terrain\nKa 1 1 1\nKd 1 1 1\nKs 0 0 0\n"
+                    f"map_Kd {os.path.basename(stem)}.png\n")
+
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write("# python3Dmap terrain_export\n")
+        if textured:
+            f.write(f"mtllib {os.path.basename(stem)}.mtl\nusemtl terrain\n")
+
+        for start, positions, normals, uvs in tile.bands():
+            np.savetxt(f, _y_up(positions), fmt='v %.4f %.4f %.4f')
+            if textured:
+                # OBJ'de v ekseni aşağıdan yukarı
+                np.savetxt(f, np.column_stack((uvs[:, 0], 1.0 - uvs[:, 1])), fmt='vt %.6f %.6f')
+            np.savetxt(f, _y_up(normals), fmt='vn %.4f %.4f %.4f')
+
+            # Bu şeritle tamamlanan quad satırları (önceki şeridin son satırı dahil)
+            stop = start + len(positions) // tile.cols
+            q0, q1 = max(start - 1, 0), stop - 1
+            if q1 > q0:
+                faces = tile.quad_indices(q0, q1).astype(np.int64) + 1
+                if textured:
+                    np.savetxt(f, faces[:, [0, 0, 0, 1, 1, 1, 2, 2, 2]],
+                               fmt='f %d/%d/%d %d/%d/%d %d/%d/%d')
+                else:
+                    np.savetxt(f, faces[:, [0, 0, 1, 1, 2, 2]], fmt='f %d//%d %d//%d %d//%d')
+            if progress:
+                progress(stop / tile.rows)
+    return os.path.getsize(path)
+
+
+def _write_stl(path, tile, progress=None):
+    """Binary STL (Z-yukarı); her üçgen kendi yüz normaliyle yazılır, texture yok"""
+    if tile.triangle_count >= 2 ** 32:
+        raise ValueError("STL 2^32 üçgen sınırını aşıyor, tile_size ile bölün")
+
+    with open(path, 'wb') as f:
+        f.write(b'python3Dmap terrain_export'.ljust(80, b' '))
+        f.write(struct.pack('<I', tile.triangle_count))
+
+        previous_row = None
+        for start, positions, normals, uvs in tile.bands():
+            # Önceki şeridin son satırı bu şeritle birlikte quad satırı oluşturur
+            block = positions if previous_row is None else np.concatenate((previous_row, positions))
+            block_rows = len(block) // tile.cols
+            previous_row = positions[-tile.cols:]
+            if block_rows < 2:
+                continue
+
+            indices = _ccw_indices(block_rows, tile.cols)
+            records = np.zeros(len(indices), dtype=_STL_RECORD)
+            triangles = block[indices]
+            records['vertices'] = triangles
+            normal = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+            normal /= np.maximum(np.linalg.norm(normal, axis=1, keepdims=True), 1e-12)
+            records['normal'] = normal
+            f.write(memoryview(records).cast('B'))
+            if progress:
+                progress((start + len(positions) // tile.cols) / tile.rows)
+        return f.tell()
+
+
+_WRITERS = {'glb': _write_glb, 'obj': _write_obj, 'stl': _write_stl}
+
+
+def export_format_for(path, fmt=None):
+    """Biçim verilmemişse dosya uzantısından (yoksa EXPORT_SETTINGS['FORMAT'])"""
+    fmt = (fmt or os.path.splitext(path)[1].lstrip('.') or EXPORT_SETTINGS['FORMAT']).lower()
+    if fmt == 'gltf':
+        fmt = 'glb'
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Desteklenmeyen biçim: {fmt} ({', '.join(EXPORT_FORMATS)})")
+    return fmt
+
+
+def make_export_grid(elevation_data, terrain_bounds=None, tile_bounds=None, textured=False,
+                     step=1, units=None, height_scale=None, nodata=None):
+    """Kaynak grid için basitleştirilmiş ExportGrid (koordinatlar ve UV eksenleri)"""
+    units = units or EXPORT_SETTINGS['UNITS']
+    rows, cols = np.shape(elevation_data)
+    if rows < 2 or cols < 2:
+        raise ValueError("Dışa aktarma için en az 2x2 grid gerekir")
+    step = max(1, min(int(step), rows - 1, cols - 1))
+
+    if units == 'meters' and terrain_bounds is None:
+        logger.warning("Coğrafi sınır yok, sahne birimleriyle aktarılıyor")
+        units = 'scene'
+    if units == 'meters':
+        mid_lat = (terrain_bounds['south'] + terrain_bounds['north']) / 2
+        mid_lon = (terrain_bounds['west'] + terrain_bounds['east']) / 2
+        width = float(geo_math.haversine(mid_lat, terrain_bounds['west'],
+                                         mid_lat, terrain_bounds['east'])) * 1000.0
+        height = float(geo_math.haversine(terrain_bounds['south'], mid_lon,
+                                          terrain_bounds['north'], mid_lon)) * 1000.0
+        z_scale = EXPORT_SETTINGS['VERTICAL_EXAGGERATION']
+    elif units == 'scene':
+        width = height = TERRAIN_EXTENT
+        z_scale = height_scale or RENDER_SETTINGS['HEIGHT_SCALE']
+    else:
+        raise ValueError(f"Bilinmeyen birim: {units}")
+
+    col_index = np.arange(0, cols, step)
+    row_index = np.arange(0, rows, step)
+    xs = (col_index / (cols - 1) - 0.5) * width
+    ys = (row_index / (rows - 1) - 0.5) * height
+
+    us = vs = None
+    if textured:
+        if terrain_bounds is not None and tile_bounds is not None:
+            u, v = terrain_uv_axes(terrain_bounds, tile_bounds, rows, cols)
+            us, vs = u[col_index], v[row_index]
+        else:
+            # Sınır bilgisi yoksa görüntü grid'e düz yayılır (satır 0 = güney = görüntünün altı)
+            us, vs = col_index / (cols - 1), 1.0 - row_index / (rows - 1)
+
+    return ExportGrid(elevation_data, xs, ys, z_scale, step, us, vs, nodata)
+
+
+def export_terrain(path, elevation_data, terrain_bounds=None, texture=None, tile_bounds=None,
+                   fmt=None, step=None, tile_size=None, units=None, height_scale=None,
+                   nodata=None, progress=None):
+    """
+    Elevation grid'ini (ndarray veya memmap view, satır 0 güney) dosyaya aktarır.
+
+    texture verilirse (PIL Image veya RGB dizi) glTF'e gömülür / OBJ yanına PNG
+    olarak yazılır. tile_size > 0 ise çıktı `isim_satır_sütun.uzantı` dosyalarına
+    bölünür. progress(0-1) verilirse ilerleme bildirilir. Dönüş: yazılan dosyalar.
+    """
+    fmt = export_format_for(path, fmt)
+    step = step or EXPORT_SETTINGS['STEP']
+    tile_size = EXPORT_SETTINGS['TILE_SIZE'] if tile_size is None else tile_size
+    if tile_size and tile_size < 2:
+        raise ValueError("tile_size en az 2 olmalıdır")
+
+    grid = make_export_grid(elevation_data, terrain_bounds, tile_bounds, texture is not None and fmt != 'stl',
+                            step, units, height_scale, nodata)
+    ranges = grid.tiles(tile_size)
+    stem, ext = os.path.splitext(path)
+    ext = ext or f".{fmt}"
+    writer = _WRITERS[fmt]
+
+    written = []
+    for number, (r0, r1, c0, c1) in enumerate(ranges):
+        tile_path = path if len(ranges) == 1 else f"{stem}_{r0 // (tile_size - 1)}_{c0 // (tile_size - 1)}{ext}"
+        tile = ExportTile(grid, r0, r1, c0, c1, texture if fmt != 'stl' else None)
+
+        tile_progress = None
+        if progress:
+            tile_progress = lambda fraction, number=number: progress((number + fraction) / len(ranges))
+
+        with tracer.span('export.tile', format=fmt, vertices=tile.vertex_count) as span:
+            size = writer(tile_path, tile, tile_progress)
+            span.annotate(bytes=size)
+        written.append(tile_path)
+        logger.info(f"{tile_path}: {tile.vertex_count} vertex, {tile.triangle_count} üçgen, "
+                    f"{size / (1024 * 1024):.1f} MB")
+    return written
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(description="Arazi mesh'ini glTF/OBJ/STL olarak dışa aktarır")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--coord', help="lat,lon: elevation ve tile'lar yükleyici ile alınır")
+    source.add_argument('--dem', help="Yerel DEM dosyası (GeoTIFF veya .json tanımlı ham raster)")
+    parser.add_argument('--bbox', help="DEM için south,west,north,east penceresi (varsayılan: tümü)")
+    parser.add_argument('--size', type=int, default=200, help="--coord için elevation grid boyutu")
+    parser.add_argument('--zoom', type=int, default=14, help="--coord için tile zoom seviyesi")
+    parser.add_argument('--no-texture', action='store_true', help="Harita görüntüsünü ekleme")
+    parser.add_argument('--out', required=True, help="Çıktı dosyası (.glb, .obj, .stl)")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, help="Uzantıdan farklıysa biçim")
+    parser.add_argument('--step', type=int, default=EXPORT_SETTINGS['STEP'],
+                        help="Basitleştirme: her n'inci örnek")
+    parser.add_argument('--tile-size', type=int, default=EXPORT_SETTINGS['TILE_SIZE'],
+                        help="Tile başına kenar örnek sayısı (0: tek dosya)")
+    parser.add_argument('--units', choices=('meters', 'scene'), default=EXPORT_SETTINGS['UNITS'])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    setup_logging()
+
+    texture = tile_bounds = nodata = None
+    if args.dem:
+        from dem_raster import LocalDEMSource
+
+        dem = LocalDEMSource(args.dem)
+        if args.bbox:
+            south, west, north, east = (float(v) for v in args.bbox.split(','))
+        else:
+            south, west, north, east = (dem.bounds[k] for k in ('south', 'west', 'north', 'east'))
+        elevation_data, terrain_bounds = dem.read_window(south, west, north, east)
+        nodata = dem.nodata
+    else:
+        from map_data_loader import MapDataLoader
+
+        lat, lon = (float(v) for v in args.coord.split(','))
+        loader = MapDataLoader()
+        elevation_data = loader.get_elevation_data(lat, lon, args.size)
+        terrain_bounds = loader.last_elevation_bounds
+        if not args.no_texture:
+            texture = loader.get_map_tiles(lat, lon, args.zoom, size=args.size)
+            tile_bounds = loader.get_tile_bounds(lat, lon, args.zoom, args.size)
+
+    written = export_terrain(args.out, elevation_data, terrain_bounds, texture, tile_bounds,
+                             fmt=args.format, step=args.step, tile_size=args.tile_size,
+                             units=args.units, nodata=nodata)
+    print(f"{len(written)} dosya yazıldı: {', '.join(written)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
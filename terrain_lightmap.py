@@ -0,0 +1,139 @@
+"""
+Arazi Işık Haritası - Elevation grid'inden vektörize hillshade ve ufuk tabanlı
+ortam kapatması (ambient occlusion) hesaplar, sonucu cache'te saklar
+
+Işık haritası grid ile aynı boyutta tek kanallı (uint8) bir dizidir; widget
+bunu ikinci texture birimine yükler ve fixed-function aydınlatmayı kapatır.
+Hesap çizilen geometriyle aynı ölçekte (TERRAIN_EXTENT ve height_scale)
+yapılır, böylece gölgeler ekranda görülen yükseklik abartısına uyar.
+"""
+
+import hashlib
+import io
+
+import numpy as np
+
+from cache_manager import get_cache_manager
+from config import LIGHTMAP_SETTINGS
+from pipeline_trace import tracer
+from terrain_mesh import TERRAIN_EXTENT
+from utils import logger
+
+
+def _grid_spacing(shape, extent):
+    rows, cols = shape
+    return extent / max(cols - 1, 1), extent / max(rows - 1, 1)
+
+
+def hillshade(elevation_data, height_scale, light_direction=None, extent=TERRAIN_EXTENT):
+    """
+    Yönlü ışık için Lambert gölgelemesi (0-1).
+    Normaller merkezi farklarla (kenarlarda tek yönlü) hesaplanır.
+    """
+    light = np.asarray(light_direction or LIGHTMAP_SETTINGS['LIGHT_DIRECTION'], dtype=np.float32)
+    light = light / np.linalg.norm(light)
+
+    heights = np.asarray(elevation_data, dtype=np.float32) * np.float32(height_scale)
+    sx, sy = _grid_spacing(heights.shape, extent)
+    dz_dy, dz_dx = np.gradient(heights, sy, sx)
+
+    # Normal (-dz/dx, -dz/dy, 1) normalize edilip ışıkla çarpılır
+    shade = light[2] - dz_dx * light[0] - dz_dy * light[1]
+    shade /= np.sqrt(dz_dx * dz_dx + dz_dy * dz_dy + 1.0)
+    np.clip(shade, 0.0, 1.0, out=shade)
+    return shade
+
+
+def horizon_occlusion(elevation_data, height_scale, directions=None, radius=None,
+                      steps=None, extent=TERRAIN_EXTENT):
+    """
+    Ufuk tabanlı ortam kapatması (0: tamamen kapalı, 1: açık gökyüzü).
+
+    Her yönde geometrik aralıklı adımlarla ilerlenip en yüksek ufuk eğimi
+    bulunur; kapatma, ufuk açılarının sinüslerinin ortalamasıdır. Her adım
+    tüm grid üzerinde tek bir kaydırılmış dizi işlemidir. Grid dışı kenar
+    yüksekliğinin devamı kabul edilir.
+    """
+    directions = directions or LIGHTMAP_SETTINGS['AO_DIRECTIONS']
+    radius = radius or LIGHTMAP_SETTINGS['AO_RADIUS']
+    steps = steps or LIGHTMAP_SETTINGS['AO_STEPS']
+
+    heights = np.asarray(elevation_data, dtype=np.float32) * np.float32(height_scale)
+    rows, cols = heights.shape
+    sx, sy = _grid_spacing(heights.shape, extent)
+    padded = np.pad(heights, radius, mode='edge')
+
+    distances = np.unique(np.round(np.geomspace(1.0, radius, steps)))
+    occlusion = np.zeros_like(heights)
+    max_slope = np.empty_like(heights)
+    slope = np.empty_like(heights)
+
+    for angle in np.arange(directions) * (2.0 * np.pi / directions):
+        dx, dy = np.cos(angle), np.sin(angle)
+        max_slope.fill(0.0)
+        seen = set()
+        for distance in distances:
+            ox, oy = int(round(distance * dx)), int(round(distance * dy))
+            if (ox, oy) == (0, 0) or (ox, oy) in seen:
+                continue
+            seen.add((ox, oy))
+            shifted = padded[radius + oy:radius + oy + rows, radius + ox:radius + ox + cols]
+            np.subtract(shifted, heights, out=slope)
+            slope *= np.float32(1.0 / np.hypot(ox * sx, oy * sy))
+            np.maximum(max_slope, slope, out=max_slope)
+        # sin(atan(m)) = m / sqrt(1 + m^2)
+        occlusion += max_slope / np.sqrt(1.0 + max_slope * max_slope)
+
+    occlusion *= np.float32(1.0 / directions)
+    return 1.0 - occlusion
+
+
+def bake_lightmap(elevation_data, height_scale, extent=TERRAIN_EXTENT):
+    """Ortam (AO ile) + yönlü ışık (hillshade) birleşimi, (rows, cols) uint8"""
+    shade = hillshade(elevation_data, height_scale, extent=extent)
+    ambient = horizon_occlusion(elevation_data, height_scale, extent=extent)
+
+    light = LIGHTMAP_SETTINGS['AMBIENT'] * ambient + LIGHTMAP_SETTINGS['DIFFUSE'] * shade
+    np.clip(light, 0.0, 1.0, out=light)
+    return np.ascontiguousarray(np.round(light * 255.0).astype(np.uint8))
+
+
+def lightmap_cache_key(elevation_data, height_scale):
+    """Elevation içeriği + height_scale + ışık ayarları üzerinden cache anahtarı"""
+    digest = hashlib.blake2b(digest_size=16)
+    data = np.ascontiguousarray(elevation_data)
+    digest.update(str((data.shape, data.dtype.str)).encode())
+    digest.update(memoryview(data).cast('B'))
+    digest.update(repr((float(height_scale), sorted(LIGHTMAP_SETTINGS.items()))).encode())
+    return f"lightmap_{digest.hexdigest()}.npy"
+
+
+def load_or_bake_lightmap(elevation_data, height_scale, cache_dir=None):
+    """Işık haritasını cache'ten okur; yoksa hesaplayıp kaydeder"""
+    cache = get_cache_manager(cache_dir)
+    key = lightmap_cache_key(elevation_data, height_scale)
+
+    with tracer.span('lightmap.load') as span:
+        path = cache.lookup(key)
+        lightmap = None
+        if path is not None:
+            try:
+                lightmap = np.load(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Işık haritası cache'i okunamadı, siliniyor: {e}")
+                cache.invalidate(key)
+        span.annotate(cache='miss' if lightmap is None else 'hit')
+    if lightmap is not None:
+        return lightmap
+
+    with tracer.span('lightmap.bake', shape=list(np.shape(elevation_data))) as span:
+        lightmap = bake_lightmap(elevation_data, height_scale)
+        span.annotate(bytes=lightmap.nbytes)
+
+    buffer = io.BytesIO()
+    np.save(buffer, lightmap)
+    try:
+        cache.store_bytes(key, buffer.getvalue())
+    except OSError as e:
+        logger.warning(f"Işık haritası cache'e yazılamadı: {e}")
+    return lightmap
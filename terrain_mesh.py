@@ -0,0 +1,124 @@
+"""
+Terrain Mesh - Elevation grid'inden vektörize vertex/normal/renk/indeks dizileri üretir
+"""
+
+import numpy as np
+
+import geo_math
+from utils import calculate_normals, generate_heightmap_texture
+
+TERRAIN_EXTENT = 4.0  # Terrain'in dünya koordinatlarındaki kenar uzunluğu
+
+
+class TerrainMesh:
+    """
+    GPU'ya doğrudan yüklenebilecek düz diziler:
+    vertices (N, 3) float32, normals (N, 3) float32, colors (N, 3) uint8,
+    uvs (N, 2) float32 veya None, indices (M,) uint32 üçgen listesi.
+
+    Vertex (satır, sütun) sırası row-major'dır: indeks = satır * cols + sütun.
+    """
+
+    ARRAY_NAMES = ('vertices', 'normals', 'colors', 'uvs', 'indices')
+
+    def __init__(self, vertices, normals, colors, indices, uvs=None, shape=None):
+        self.vertices = vertices
+        self.normals = normals
+        self.colors = colors
+        self.indices = indices
+        self.uvs = uvs
+        self.shape = shape
+
+    @property
+    def triangle_count(self):
+        return len(self.indices) // 3
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_NAMES
+                   if getattr(self, name) is not None)
+
+
+def terrain_uv_axes(terrain_bounds, tile_bounds, rows, cols):
+    """
+    Web Mercator'da u yalnızca boylama, v yalnızca enleme bağlıdır; sütun
+    başına u (cols,) ve satır başına v (rows,) dizilerini döndürür
+    """
+    lats = np.linspace(terrain_bounds['south'], terrain_bounds['north'], rows)
+    lons = np.linspace(terrain_bounds['west'], terrain_bounds['east'], cols)
+
+    # Kesirli global tile koordinatları (satır ve sütun ayrı hesaplanır)
+    tile_x, _ = geo_math.lat_lon_to_tile_fraction(0.0, lons, tile_bounds['zoom'])
+    _, tile_y = geo_math.lat_lon_to_tile_fraction(lats, 0.0, tile_bounds['zoom'])
+
+    # Birleştirilmiş görüntünün sol üst köşesine göre 0-1 arası
+    u = (tile_x - tile_bounds['x0']) / tile_bounds['cols']
+    v = (tile_y - tile_bounds['y0']) / tile_bounds['rows']
+    return u, v
+
+
+def compute_terrain_uvs(terrain_bounds, tile_bounds, rows, cols):
+    """
+    Elevation grid'inin her vertex'i için Web Mercator tile sınırlarından
+    texture koordinatlarını (u, v) hesaplar. Sonuç (rows, cols) boyutlu iki dizidir.
+    """
+    u, v = terrain_uv_axes(terrain_bounds, tile_bounds, rows, cols)
+    u_grid, v_grid = np.meshgrid(u, v)
+    return u_grid.astype(np.float32), v_grid.astype(np.float32)
+
+
+def grid_indices(rows, cols):
+    """
+    rows x cols grid için üçgen indeksleri. Köşegen, eski triangle strip
+    çizimiyle aynıdır: (i, j), (i+1, j), (i, j+1) ve (i+1, j), (i, j+1), (i+1, j+1)
+    """
+    base = (np.arange(rows - 1, dtype=np.uint32)[:, np.newaxis] * cols +
+            np.arange(cols - 1, dtype=np.uint32)[np.newaxis, :]).ravel()
+    below = base + cols
+
+    indices = np.empty((base.size, 6), dtype=np.uint32)
+    indices[:, 0] = base
+    indices[:, 1] = below
+    indices[:, 2] = base + 1
+    indices[:, 3] = below
+    indices[:, 4] = base + 1
+    indices[:, 5] = below + 1
+    return indices.ravel()
+
+
+def build_terrain_mesh(elevation_data, height_scale, uvs=None, extent=TERRAIN_EXTENT):
+    """
+    Map3DWidget'ın terrain geometrisini tek geçişte vektörize olarak oluşturur.
+
+    uvs verilirse (u, v) dizi çifti) renkler beyaz olur ve texture modüle eder;
+    aksi halde yükseklik bantlarına göre renklendirilir.
+    """
+    rows, cols = elevation_data.shape
+    count = rows * cols
+
+    vertices = np.empty((rows, cols, 3), dtype=np.float32)
+    vertices[..., 0] = ((np.arange(cols, dtype=np.float32) / (cols - 1) - 0.5) * extent)[np.newaxis, :]
+    vertices[..., 1] = ((np.arange(rows, dtype=np.float32) / (rows - 1) - 0.5) * extent)[:, np.newaxis]
+    np.multiply(elevation_data, height_scale, out=vertices[..., 2], casting='unsafe')
+
+    # Widget'ın normal formülü (-dx*hs*2, -dy*hs*2, 4/max(rows, cols)),
+    # calculate_normals'ın (-dx*s, -dy*s, 2) biçimine ölçeklenmiş hali
+    normals = calculate_normals(np.asarray(elevation_data, dtype=np.float32),
+                                scale=height_scale * max(rows, cols))
+    normals[0, :] = (0, 0, 1)
+    normals[-1, :] = (0, 0, 1)
+    normals[:, 0] = (0, 0, 1)
+    normals[:, -1] = (0, 0, 1)
+
+    if uvs is not None:
+        colors = np.full((count, 3), 255, dtype=np.uint8)
+        uv_array = np.empty((rows, cols, 2), dtype=np.float32)
+        uv_array[..., 0] = uvs[0]
+        uv_array[..., 1] = uvs[1]
+        uv_array = uv_array.reshape(count, 2)
+    else:
+        colors = generate_heightmap_texture(elevation_data).reshape(count, 3)
+        uv_array = None
+
+    return TerrainMesh(vertices.reshape(count, 3), normals.reshape(count, 3), colors,
+                       grid_indices(rows, cols), uv_array, shape=(rows, cols))
@@ -0,0 +1,194 @@
+"""
+Terrain Picking - Max-quadtree (max mip piramidi) ile hızlı ray/heightmap kesişimi
+"""
+
+import math
+import numpy as np
+
+
+def _reduce_2x2(data, func, fill):
+    """2x2 bloklar üzerinde func ile indirger; tek sayılı kenarlar fill ile doldurulur"""
+    rows, cols = data.shape
+    pad_rows = rows % 2
+    pad_cols = cols % 2
+    if pad_rows or pad_cols:
+        data = np.pad(data, ((0, pad_rows), (0, pad_cols)), constant_values=fill)
+    return func.reduce(
+        data.reshape(data.shape[0] // 2, 2, data.shape[1] // 2, 2), axis=(1, 3)
+    )
+
+
+def build_max_pyramid(elevation_data):
+    """
+    Hücre bazlı max piramidi oluşturur.
+
+    Seviye 0'da her hücre dört köşe vertex'inin max değerini tutar
+    (boyut rows-1 x cols-1). Her üst seviye 2x2 hücreyi tek hücrede toplar,
+    tek hücre kalana kadar devam eder.
+    """
+    data = np.asarray(elevation_data, dtype=np.float32)
+    corners = (data[:-1, :-1], data[1:, :-1], data[:-1, 1:], data[1:, 1:])
+
+    max_levels = [np.maximum(np.maximum(corners[0], corners[1]), np.maximum(corners[2], corners[3]))]
+    while max_levels[-1].shape[0] > 1 or max_levels[-1].shape[1] > 1:
+        max_levels.append(_reduce_2x2(max_levels[-1], np.maximum, -np.inf))
+
+    return max_levels
+
+
+class HeightfieldPicker:
+    """
+    Grid uzayında (x = sütun, y = satır, z = yükseklik) ray/heightmap kesişimi.
+
+    Ray, max piramidinde yukarıdan aşağı dolaşılır: ray'in bir düğümün
+    ayak izi boyunca düğümün max yüksekliğinin üstünde kaldığı alt ağaçlar
+    tümden atlanır. Çocuklar ray'e yakınlık sırasıyla ziyaret edildiği için
+    bulunan ilk kesişim en yakın kesişimdir. Sorgu başına ziyaret edilen
+    düğüm sayısı grid boyutuyla logaritmik büyür.
+    """
+
+    def __init__(self, elevation_data):
+        self.elevation_data = np.asarray(elevation_data, dtype=np.float32)
+        self.rows, self.cols = self.elevation_data.shape
+        self.max_levels = build_max_pyramid(self.elevation_data)
+        self.top_level = len(self.max_levels) - 1
+
+    def intersect(self, origin, direction):
+        """
+        Grid uzayındaki ray için ilk kesişimi (x, y, z) olarak döndürür; yoksa None.
+        """
+        ox, oy, oz = (float(v) for v in origin)
+        dx, dy, dz = (float(v) for v in direction)
+
+        inv_dx = 1.0 / dx if dx != 0.0 else math.inf
+        inv_dy = 1.0 / dy if dy != 0.0 else math.inf
+
+        stack = [(self.top_level, 0, 0)]
+        while stack:
+            level, cy, cx = stack.pop()
+
+            # Düğümün grid uzayındaki ayak izi
+            cell = 1 << level
+            x0 = cx * cell
+            y0 = cy * cell
+            x1 = min(x0 + cell, self.cols - 1)
+            y1 = min(y0 + cell, self.rows - 1)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            span = self._slab(ox, oy, inv_dx, inv_dy, dx, dy, x0, x1, y0, y1)
+            if span is None:
+                continue
+            t_enter, t_exit = span
+
+            # Ray bu ayak izi boyunca düğümün en yüksek noktasının üstündeyse atla
+            node_max = self.max_levels[level][cy, cx]
+            if oz + dz * t_enter > node_max and oz + dz * t_exit > node_max:
+                continue
+
+            if level == 0:
+                hit = self._intersect_cell(ox, oy, oz, dx, dy, dz, x0, y0)
+                if hit is not None:
+                    return hit
+                continue
+
+            # Çocukları uzaktan yakına yığına it, en yakın önce işlenir
+            children = []
+            child_level = level - 1
+            child_rows, child_cols = self.max_levels[child_level].shape
+            for ccy in (cy * 2, cy * 2 + 1):
+                for ccx in (cx * 2, cx * 2 + 1):
+                    if ccy >= child_rows or ccx >= child_cols:
+                        continue
+                    child_cell = 1 << child_level
+                    child_span = self._slab(
+                        ox, oy, inv_dx, inv_dy, dx, dy,
+                        ccx * child_cell, min((ccx + 1) * child_cell, self.cols - 1),
+                        ccy * child_cell, min((ccy + 1) * child_cell, self.rows - 1))
+                    if child_span is not None:
+                        children.append((child_span[0], ccy, ccx))
+
+            children.sort(reverse=True)
+            for _, ccy, ccx in children:
+                stack.append((child_level, ccy, ccx))
+
+        return None
+
+    @staticmethod
+    def _slab(ox, oy, inv_dx, inv_dy, dx, dy, x0, x1, y0, y1):
+        """Ray'in XY kutusuna giriş/çıkış parametrelerini döndürür (t >= 0)"""
+        if dx != 0.0:
+            tx0 = (x0 - ox) * inv_dx
+            tx1 = (x1 - ox) * inv_dx
+            if tx0 > tx1:
+                tx0, tx1 = tx1, tx0
+        elif x0 <= ox <= x1:
+            tx0, tx1 = -math.inf, math.inf
+        else:
+            return None
+
+        if dy != 0.0:
+            ty0 = (y0 - oy) * inv_dy
+            ty1 = (y1 - oy) * inv_dy
+            if ty0 > ty1:
+                ty0, ty1 = ty1, ty0
+        elif y0 <= oy <= y1:
+            ty0, ty1 = -math.inf, math.inf
+        else:
+            return None
+
+        t_enter = max(tx0, ty0, 0.0)
+        t_exit = min(tx1, ty1)
+        if t_enter > t_exit:
+            return None
+        return t_enter, t_exit
+
+    def _intersect_cell(self, ox, oy, oz, dx, dy, dz, x, y):
+        """
+        Hücrenin iki üçgeniyle (Map3DWidget'taki triangle strip ile aynı köşegen)
+        Möller–Trumbore kesişimi
+        """
+        h = self.elevation_data
+        p00 = (x, y, float(h[y, x]))
+        p01 = (x, y + 1, float(h[y + 1, x]))
+        p10 = (x + 1, y, float(h[y, x + 1]))
+        p11 = (x + 1, y + 1, float(h[y + 1, x + 1]))
+
+        best = None
+        for a, b, c in ((p00, p01, p10), (p01, p10, p11)):
+            t = _ray_triangle(ox, oy, oz, dx, dy, dz, a, b, c)
+            if t is not None and (best is None or t < best):
+                best = t
+
+        if best is None:
+            return None
+        return ox + dx * best, oy + dy * best, oz + dz * best
+
+
+def _ray_triangle(ox, oy, oz, dx, dy, dz, a, b, c):
+    """Ray-üçgen kesişim parametresi t (yoksa None)"""
+    e1x, e1y, e1z = b[0] - a[0], b[1] - a[1], b[2] - a[2]
+    e2x, e2y, e2z = c[0] - a[0], c[1] - a[1], c[2] - a[2]
+
+    px = dy * e2z - dz * e2y
+    py = dz * e2x - dx * e2z
+    pz = dx * e2y - dy * e2x
+    det = e1x * px + e1y * py + e1z * pz
+    if abs(det) < 1e-12:
+        return None
+    inv_det = 1.0 / det
+
+    sx, sy, sz = ox - a[0], oy - a[1], oz - a[2]
+    u = (sx * px + sy * py + sz * pz) * inv_det
+    if u < 0.0 or u > 1.0:
+        return None
+
+    qx = sy * e1z - sz * e1y
+    qy = sz * e1x - sx * e1z
+    qz = sx * e1y - sy * e1x
+    v = (dx * qx + dy * qy + dz * qz) * inv_det
+    if v < 0.0 or u + v > 1.0:
+        return None
+
+    t = (e2x * qx + e2y * qy + e2z * qz) * inv_det
+    return t if t >= 0.0 else None
@@ -0,0 +1,407 @@
+"""
+Akışlı Arazi - Kamera hedefi çevresindeki arazi karolarını dünya koordinatlarında
+arka planda yükler; CPU ve GPU'da tutulan karo sayısını LRU ile sınırlar
+"""
+
+import math
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from config import ELEVATION_SETTINGS, LIGHTMAP_SETTINGS, RENDER_SETTINGS, STREAMING_SETTINGS
+from mesh_cache import MeshCache, mesh_cache_key
+from pipeline_trace import tracer
+from terrain_lightmap import load_or_bake_lightmap
+from terrain_mesh import TERRAIN_EXTENT, build_terrain_mesh, compute_terrain_uvs
+from terrain_picking import HeightfieldPicker
+from utils import logger
+
+GRID_SPACING = ELEVATION_SETTINGS['GRID_SPACING_DEG']  # MapDataLoader._elevation_grid_axes ile aynı
+MAX_TILE_ZOOM = 18  # TILE_ZOOM = 0 iken üst sınır; loader kapsama zoom'una düşürür
+
+
+class StreamChunk:
+    """
+    Dünya grid'inde (i, j) konumlu tek arazi karosu.
+
+    state: 'queued' -> 'loading' -> 'ready' (CPU'da mesh ve görüntü hazır)
+    veya 'failed'. gpu, widget'ın yüklediği buffer/texture kaydıdır.
+    """
+
+    __slots__ = ('key', 'lat', 'lon', 'state', 'elevation', 'mesh', 'pixels', 'lightmap',
+                 'terrain_bounds', 'tile_bounds', 'gpu', 'picker', 'error',
+                 'load_seconds', 'ready_time')
+
+    def __init__(self, key, lat, lon):
+        self.key = key
+        self.lat = lat
+        self.lon = lon
+        self.state = 'queued'
+        self.elevation = None
+        self.mesh = None
+        self.pixels = None
+        self.lightmap = None
+        self.terrain_bounds = None
+        self.tile_bounds = None
+        self.gpu = None
+        self.picker = None
+        self.error = None
+        self.load_seconds = None
+        self.ready_time = None  # time.perf_counter(); GUI thread'i teslim aldığında
+
+    @property
+    def offset(self):
+        """Karo merkezinin dünya koordinatları (x, y)"""
+        return self.key[0] * TERRAIN_EXTENT, self.key[1] * TERRAIN_EXTENT
+
+    @property
+    def nbytes(self):
+        total = 0
+        if self.mesh is not None:
+            total += self.mesh.nbytes
+        if self.pixels is not None:
+            total += self.pixels.nbytes
+        if self.elevation is not None:
+            total += self.elevation.nbytes
+        if self.lightmap is not None:
+            total += self.lightmap.nbytes
+        return total
+
+    def release_cpu(self):
+        self.elevation = None
+        self.mesh = None
+        self.pixels = None
+        self.lightmap = None
+        self.picker = None
+
+
+class ChunkGrid:
+    """
+    Dünya koordinatları ile karo indeksleri ve coğrafi merkezler arasındaki dönüşüm.
+
+    Her karo TERRAIN_EXTENT dünya birimi genişliğindedir ve (0, 0) karosu
+    başlangıç koordinatına ortalanır. Komşu karoların merkezleri grid'in
+    kapladığı açı (GRID_SPACING * size) kadar aralıklıdır; böylece karo
+    kenarlarındaki örnekler aynı enlem/boylamdan alınır ve dikişsiz birleşir.
+    """
+
+    def __init__(self, origin_lat, origin_lon, size, extent=TERRAIN_EXTENT):
+        self.origin_lat = origin_lat
+        self.origin_lon = origin_lon
+        self.size = size
+        self.extent = extent
+        self.span = GRID_SPACING * size
+
+    def chunk_at(self, x, y):
+        """Dünya noktasını içeren karonun (i, j) indeksi"""
+        return (int(math.floor(x / self.extent + 0.5)),
+                int(math.floor(y / self.extent + 0.5)))
+
+    def center(self, key):
+        """Karo merkezinin (lat, lon) değeri"""
+        i, j = key
+        return self.origin_lat + j * self.span, self.origin_lon + i * self.span
+
+    def lat_lon_to_world(self, lat, lon):
+        return ((lon - self.origin_lon) / self.span * self.extent,
+                (lat - self.origin_lat) / self.span * self.extent)
+
+    def world_to_lat_lon(self, x, y):
+        return (self.origin_lat + y / self.extent * self.span,
+                self.origin_lon + x / self.extent * self.span)
+
+    def chunks_around(self, x, y, radius):
+        """
+        (x, y)'yi içeren karo çevresindeki (2r+1)^2 karo, merkezi (x, y)'ye
+        en yakından uzağa sıralı
+        """
+        ci, cj = self.chunk_at(x, y)
+        keys = [(ci + di, cj + dj)
+                for dj in range(-radius, radius + 1)
+                for di in range(-radius, radius + 1)
+                if -90.0 < self.center((ci + di, cj + dj))[0] < 90.0]
+        keys.sort(key=lambda k: (k[0] * self.extent - x) ** 2 + (k[1] * self.extent - y) ** 2)
+        return keys
+
+
+class TerrainStreamer(QObject):
+    """
+    Kamera hedefi çevresindeki karoları öncelik sırasıyla (en yakın önce)
+    arka plan thread'lerinde yükler ve mesh dizilerini hazırlar.
+
+    update() her frame'de GUI thread'inden çağrılır: tamamlanan karoları
+    alır, boşalan worker'lara sıradaki en yakın karoları verir, LRU
+    sınırlarını uygular ve bu frame'de GPU'ya aktarılacak karoları döndürür.
+    GPU kaynaklarını silmek için release_gpu(chunk) çağrılır (widget verir).
+
+    Yükleme bittiğinde chunk_ready sinyali gönderilir; widget yeni frame ister.
+    """
+
+    chunk_ready = pyqtSignal(object)
+
+    def __init__(self, lat, lon, size=None, height_scale=None, tile_zoom=None,
+                 view_radius=None, prefetch_radius=None, workers=None,
+                 max_cpu_chunks=None, max_gpu_chunks=None, release_gpu=None):
+        super().__init__()
+        self.grid = ChunkGrid(lat, lon, size or STREAMING_SETTINGS['CHUNK_SIZE'])
+        self.height_scale = height_scale or RENDER_SETTINGS['HEIGHT_SCALE']
+        self.tile_zoom = tile_zoom if tile_zoom is not None else STREAMING_SETTINGS['TILE_ZOOM']
+        self.view_radius = view_radius if view_radius is not None else STREAMING_SETTINGS['VIEW_RADIUS']
+        self.prefetch_radius = max(self.view_radius, prefetch_radius if prefetch_radius is not None
+                                   else STREAMING_SETTINGS['PREFETCH_RADIUS'])
+        self.workers = max(1, workers or STREAMING_SETTINGS['WORKERS'])
+
+        # Görünür ve önceden yüklenen karolar sınırdan atılmamalı
+        wanted = (2 * self.prefetch_radius + 1) ** 2
+        visible = (2 * self.view_radius + 1) ** 2
+        self.max_cpu_chunks = max(wanted, max_cpu_chunks or STREAMING_SETTINGS['MAX_CPU_CHUNKS'])
+        self.max_gpu_chunks = max(visible, max_gpu_chunks or STREAMING_SETTINGS['MAX_GPU_CHUNKS'])
+        self.uploads_per_frame = STREAMING_SETTINGS['UPLOADS_PER_FRAME']
+        self.release_gpu = release_gpu
+
+        # En son kullanılan sonda; CPU: hazır karolar, GPU: yüklenmiş karolar
+        self.cpu_resident = OrderedDict()
+        self.gpu_resident = OrderedDict()
+        self.chunks = {}  # Bilinen tüm karolar (yükleniyor, hazır, başarısız)
+        self.visible = []
+        self.wanted = []
+        self.prefetch = []  # Dışarıdan istenen karolar, ihtiyaç sırasına göre (set_prefetch)
+        self.load_seconds = None  # Karo yükleme süresinin üstel ortalaması
+
+        self.stats = {'loaded': 0, 'failed': 0, 'uploaded': 0,
+                      'cpu_evictions': 0, 'gpu_evictions': 0}
+
+        self._in_flight = 0
+        self._completed = queue.Queue()
+        self._local = threading.local()
+        self._mesh_cache = MeshCache()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix='terrain-stream')
+        self._closed = False
+
+    # --- Arka plan ---
+
+    def _loader(self):
+        """Her worker thread'i kendi MapDataLoader'ını kullanır (son yükleme durumu thread'e özel)"""
+        loader = getattr(self._local, 'loader', None)
+        if loader is None:
+            from map_data_loader import MapDataLoader
+            loader = self._local.loader = MapDataLoader()
+        return loader
+
+    def _load_chunk(self, chunk):
+        """Worker thread'i: elevation, tile'lar ve mesh dizileri"""
+        loader = self._loader()
+        size = self.grid.size
+        with tracer.span('stream.chunk', i=chunk.key[0], j=chunk.key[1]) as span:
+            elevation = loader.get_elevation_data(chunk.lat, chunk.lon, size)
+            terrain_bounds = loader.get_terrain_bounds(chunk.lat, chunk.lon, size)
+            zoom = self.tile_zoom or MAX_TILE_ZOOM
+            tile_bounds = loader.get_tile_bounds(chunk.lat, chunk.lon, zoom, size)
+            image = loader.get_map_tiles(chunk.lat, chunk.lon, zoom, size=size)
+
+            rows, cols = elevation.shape
+            uvs = compute_terrain_uvs(terrain_bounds, tile_bounds, rows, cols)
+            key = mesh_cache_key(elevation, self.height_scale,
+                                 uv_source=[terrain_bounds, tile_bounds])
+            mesh = self._mesh_cache.get_or_build(
+                key, lambda: build_terrain_mesh(elevation, self.height_scale, uvs))
+
+            # Texture yüklemesi GUI thread'inde dönüşüm yapmasın
+            from terrain_texture import _image_to_rgb_array
+            pixels = _image_to_rgb_array(image)
+            lightmap = None
+            if LIGHTMAP_SETTINGS['ENABLED']:
+                lightmap = load_or_bake_lightmap(elevation, self.height_scale)
+            # Picking piramidi GUI thread'inde fare hareketi sırasında kurulmasın
+            picker = HeightfieldPicker(elevation)
+            span.annotate(source=loader.last_elevation_source, zoom=zoom,
+                          bytes=mesh.nbytes + pixels.nbytes)
+
+        chunk.elevation = elevation
+        chunk.terrain_bounds = terrain_bounds
+        chunk.tile_bounds = tile_bounds
+        chunk.mesh = mesh
+        chunk.pixels = pixels
+        chunk.lightmap = lightmap
+        chunk.picker = picker
+
+    def _run_job(self, chunk):
+        start = time.perf_counter()
+        try:
+            self._load_chunk(chunk)
+        except Exception as e:
+            chunk.error = str(e)
+            logger.warning(f"Karo {chunk.key} yüklenemedi: {e}")
+        chunk.load_seconds = time.perf_counter() - start
+        self._completed.put(chunk)
+        if not self._closed:
+            self.chunk_ready.emit(chunk)
+
+    def _schedule(self):
+        """
+        Boş worker varsa sıradaki karoları başlatır: önce görünür karolar,
+        sonra önceden istenenler (ihtiyaç sırasıyla), sonra çevre halkası
+        """
+        for key in self._priority_order():
+            if self._in_flight >= self.workers:
+                return
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                lat, lon = self.grid.center(key)
+                chunk = self.chunks[key] = StreamChunk(key, lat, lon)
+            if chunk.state != 'queued':
+                continue
+            chunk.state = 'loading'
+            self._in_flight += 1
+            self._executor.submit(self._run_job, chunk)
+
+    def _collect_completed(self):
+        while True:
+            try:
+                chunk = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            self._in_flight -= 1
+            if chunk.error is not None:
+                chunk.state = 'failed'
+                chunk.release_cpu()
+                self.stats['failed'] += 1
+                continue
+            chunk.state = 'ready'
+            chunk.ready_time = time.perf_counter()
+            self.cpu_resident[chunk.key] = chunk
+            self.stats['loaded'] += 1
+            self.load_seconds = (chunk.load_seconds if self.load_seconds is None
+                                 else 0.8 * self.load_seconds + 0.2 * chunk.load_seconds)
+
+    def _priority_order(self):
+        seen = set()
+        order = []
+        for key in self.visible + self.prefetch + self.wanted:
+            if key not in seen:
+                seen.add(key)
+                order.append(key)
+        return order
+
+    # --- Residency ---
+
+    def _evict(self):
+        """LRU sınırlarını aşan, artık istenmeyen karoları bırakır"""
+        prefetch = set(self.prefetch)
+        keep_gpu = set(self.visible) | prefetch
+        keep_cpu = set(self.wanted) | prefetch
+
+        for key in list(self.gpu_resident):
+            if len(self.gpu_resident) <= self.max_gpu_chunks:
+                break
+            if key in keep_gpu:
+                continue
+            self._release_gpu(self.gpu_resident.pop(key))
+            self.stats['gpu_evictions'] += 1
+
+        for key in list(self.cpu_resident):
+            if len(self.cpu_resident) <= self.max_cpu_chunks:
+                break
+            if key in keep_cpu:
+                continue
+            chunk = self.cpu_resident.pop(key)
+            if key in self.gpu_resident:
+                self._release_gpu(self.gpu_resident.pop(key))
+            chunk.release_cpu()
+            del self.chunks[key]  # Tekrar istenirse baştan yüklenir
+            self.stats['cpu_evictions'] += 1
+
+    def _release_gpu(self, chunk):
+        if chunk.gpu is not None and self.release_gpu is not None:
+            self.release_gpu(chunk)
+        chunk.gpu = None
+
+    def set_prefetch(self, keys):
+        """
+        Kamera yolundan tahmin edilen karolar (en erken gerekecek önce).
+        Çevre halkasından önce yüklenir, bu listede kaldıkça atılmaz.
+        """
+        limit = self.max_cpu_chunks - len(self.wanted)
+        self.prefetch = list(keys)[:max(0, limit)]
+
+    def mark_uploaded(self, chunk):
+        """Widget karonun GPU kaynaklarını oluşturduktan sonra çağırır"""
+        self.gpu_resident[chunk.key] = chunk
+        self.stats['uploaded'] += 1
+
+    # --- Frame ---
+
+    def update(self, x, y):
+        """
+        Kamera hedefi (x, y) için residency'yi günceller.
+        Bu frame'de GPU'ya aktarılacak karoları (en yakın önce) döndürür.
+        """
+        self.visible = self.grid.chunks_around(x, y, self.view_radius)
+        self.wanted = self.grid.chunks_around(x, y, self.prefetch_radius)
+
+        self._collect_completed()
+
+        # Başarısız karolar alandan çıkınca unutulur, geri gelince tekrar denenir
+        wanted = set(self.wanted) | set(self.prefetch)
+        for key in [key for key, chunk in self.chunks.items()
+                    if chunk.state == 'failed' and key not in wanted]:
+            del self.chunks[key]
+
+        self._schedule()
+
+        # Kullanılan karoları LRU sonuna taşı (uzaktan yakına, en yakın en sonda)
+        for key in reversed(self.prefetch + self.wanted):
+            if key in self.cpu_resident:
+                self.cpu_resident.move_to_end(key)
+        for key in reversed(self.prefetch + self.visible):
+            if key in self.gpu_resident:
+                self.gpu_resident.move_to_end(key)
+
+        self._evict()
+
+        # Önceden istenen karolar GPU'da yer varsa görünür olmadan aktarılır
+        uploads = []
+        visible = set(self.visible)
+        for key in self.visible + self.prefetch:
+            chunk = self.cpu_resident.get(key)
+            if chunk is None or chunk.gpu is not None or chunk in uploads:
+                continue
+            if key not in visible and len(self.gpu_resident) + len(uploads) >= self.max_gpu_chunks:
+                break
+            uploads.append(chunk)
+            if len(uploads) >= self.uploads_per_frame:
+                break
+        return uploads
+
+    def drawable(self):
+        """GPU'da hazır görünür karolar"""
+        return [self.gpu_resident[key] for key in self.visible if key in self.gpu_resident]
+
+    @property
+    def has_pending_uploads(self):
+        """GPU'ya aktarılmayı bekleyen görünür karo var mı"""
+        return any(key in self.cpu_resident and key not in self.gpu_resident
+                   for key in self.visible)
+
+    def format_summary(self):
+        """Performans overlay'i için kısa metin"""
+        cpu_mb = sum(chunk.nbytes for chunk in self.cpu_resident.values()) / (1024 * 1024)
+        return (f"Akış: CPU {len(self.cpu_resident)}/{self.max_cpu_chunks} ({cpu_mb:.1f} MB)  "
+                f"GPU {len(self.gpu_resident)}/{self.max_gpu_chunks}  yükleniyor {self._in_flight}")
+
+    def close(self):
+        """Worker'ları durdurur; GPU kaynakları release_gpu ile bırakılır"""
+        self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for chunk in list(self.gpu_resident.values()):
+            self._release_gpu(chunk)
+        self.gpu_resident.clear()
+        for chunk in self.cpu_resident.values():
+            chunk.release_cpu()
+        self.cpu_resident.clear()
+        self.chunks.clear()
@@ -0,0 +1,257 @@
+"""
+Terrain Texture - Harita görüntüsünü mipmap'li GL texture olarak arazi üzerine giydirir
+"""
+
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+
+
+def _image_to_rgb_array(image):
+    """PIL görüntüsünü C-contiguous uint8 RGB dizisine çevirir (dizi verilirse olduğu gibi)"""
+    if isinstance(image, np.ndarray):
+        return np.ascontiguousarray(image, dtype=np.uint8)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return np.ascontiguousarray(np.asarray(image, dtype=np.uint8))
+
+
+class TerrainTexture:
+    """
+    Birleştirilmiş tile görüntüsünü tek seferde mipmap'li texture olarak yükler,
+    sonradan gelen tile'ları glTexSubImage2D ile yerinde günceller.
+
+    GL çağrıları yalnızca sync() içinde yapılır; sync() context aktifken
+    (paintGL sırasında) çağrılmalıdır.
+    """
+
+    def __init__(self, use_pbo=False):
+        self.use_pbo = use_pbo
+        self.texture_id = None
+        self.width = 0
+        self.height = 0
+        self.tile_size = 256
+
+        self._pbo = None
+        self._pending_image = None
+        self._pending_tiles = []
+
+    @property
+    def is_ready(self):
+        return self.texture_id is not None
+
+    @property
+    def memory_bytes(self):
+        """Mipmap zinciri dahil yaklaşık GPU belleği (RGB8)"""
+        if self.texture_id is None:
+            return 0
+        return self.width * self.height * 3 * 4 // 3
+
+    def set_image(self, image, tile_size=256):
+        """Tüm görüntüyü bir sonraki sync()'te yüklenmek üzere ayarlar"""
+        self._pending_image = _image_to_rgb_array(image)
+        self._pending_tiles = []
+        self.tile_size = tile_size
+
+    def queue_tile(self, grid_col, grid_row, image):
+        """Tek bir tile'ı bir sonraki sync()'te yerinde güncellenmek üzere sıraya alır"""
+        if self._pending_image is not None:
+            # Texture henüz yüklenmedi, tile'ı doğrudan CPU kopyasına yaz
+            data = _image_to_rgb_array(image)
+            y = grid_row * self.tile_size
+            x = grid_col * self.tile_size
+            h, w = data.shape[:2]
+            self._pending_image[y:y + h, x:x + w] = data
+            return
+
+        self._pending_tiles.append((grid_col, grid_row, image))
+
+    def sync(self):
+        """Bekleyen yükleme ve tile güncellemelerini GPU'ya aktarır"""
+        if self._pending_image is not None:
+            self._upload_full(self._pending_image)
+            self._pending_image = None
+
+        if self.texture_id is None or not self._pending_tiles:
+            return
+
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        for grid_col, grid_row, image in self._pending_tiles:
+            data = _image_to_rgb_array(image)
+            h, w = data.shape[:2]
+            x = grid_col * self.tile_size
+            y = grid_row * self.tile_size
+
+            # Texture sınırlarını aşan tile'ları atla
+            if x + w > self.width or y + h > self.height:
+                continue
+
+            if self.use_pbo:
+                self._sub_image_via_pbo(x, y, w, h, data)
+            else:
+                glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w, h, GL_RGB, GL_UNSIGNED_BYTE, data)
+
+        self._pending_tiles = []
+        self._regenerate_mipmaps()
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _upload_full(self, data):
+        """Görüntüyü tek seferde yükler ve mipmap zincirini oluşturur"""
+        if self.texture_id is None:
+            self.texture_id = glGenTextures(1)
+
+        self.height, self.width = data.shape[:2]
+
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR_MIPMAP_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+
+        if not bool(glGenerateMipmap):
+            # Eski sürücüler: alt görüntü güncellemelerinde mipmap otomatik yenilenir
+            glTexParameteri(GL_TEXTURE_2D, GL_GENERATE_MIPMAP, GL_TRUE)
+
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_RGB8, self.width, self.height, 0,
+                     GL_RGB, GL_UNSIGNED_BYTE, data)
+        self._regenerate_mipmaps()
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _regenerate_mipmaps(self):
+        """Mipmap seviyelerini yeniler (GL_GENERATE_MIPMAP kullanılıyorsa gerekmez)"""
+        if bool(glGenerateMipmap):
+            glGenerateMipmap(GL_TEXTURE_2D)
+
+    def _sub_image_via_pbo(self, x, y, w, h, data):
+        """Tile'ı pixel unpack buffer üzerinden aktarır"""
+        if self._pbo is None:
+            self._pbo = glGenBuffers(1)
+
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, self._pbo)
+        # Buffer'ı yeniden tanımlamak (orphaning) sürücünün beklemesini önler
+        glBufferData(GL_PIXEL_UNPACK_BUFFER, data.nbytes, data, GL_STREAM_DRAW)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, x, y, w, h, GL_RGB, GL_UNSIGNED_BYTE,
+                        ctypes.c_void_p(0))
+        glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0)
+
+    def bind(self):
+        """Texture'ı fixed-function pipeline için etkinleştirir"""
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+
+    def unbind(self):
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+
+    def delete(self):
+        """GPU kaynaklarını serbest bırakır"""
+        if self.texture_id is not None:
+            glDeleteTextures([self.texture_id])
+            self.texture_id = None
+        if self._pbo is not None:
+            glDeleteBuffers(1, [self._pbo])
+            self._pbo = None
+        self._pending_image = None
+        self._pending_tiles = []
+
+
+class LightmapTexture:
+    """
+    Tek kanallı ışık haritasını ikinci texture biriminde (GL_TEXTURE1) tutar.
+
+    Texture koordinatları vertex dizisi gerektirmeden GL_OBJECT_LINEAR texgen
+    ile arazinin nesne koordinatlarından üretilir; böylece aynı harita LOD
+    seviyelerinde ve akış karolarında (glTranslate ile) değişmeden kullanılır.
+    Düzlemler grid örneklerini texel merkezlerine denk getirir.
+    """
+
+    def __init__(self):
+        self.texture_id = None
+        self.width = 0
+        self.height = 0
+        self._pending = None
+        self._clear = False
+
+    @property
+    def is_ready(self):
+        return self.texture_id is not None
+
+    @property
+    def memory_bytes(self):
+        if self.texture_id is None:
+            return 0
+        return self.width * self.height
+
+    def set_array(self, lightmap):
+        """(rows, cols) uint8 diziyi bir sonraki sync()'te yüklenmek üzere ayarlar"""
+        self._pending = np.ascontiguousarray(lightmap, dtype=np.uint8)
+        self._clear = False
+
+    def clear(self):
+        """Işık haritasını kaldırır (texture bir sonraki sync()'te silinir)"""
+        self._pending = None
+        self._clear = True
+
+    def sync(self):
+        """Bekleyen yükleme veya silmeyi uygular (context aktif olmalı)"""
+        if self._clear:
+            self._clear = False
+            self.delete()
+        if self._pending is None:
+            return
+
+        data = self._pending
+        self._pending = None
+        if self.texture_id is None:
+            self.texture_id = glGenTextures(1)
+        self.height, self.width = data.shape
+
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_LUMINANCE8, self.width, self.height, 0,
+                     GL_LUMINANCE, GL_UNSIGNED_BYTE, data)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def bind(self, extent):
+        """
+        GL_TEXTURE1'de etkinleştirir; extent, arazinin dünya birimindeki kenarıdır.
+        s = x * (cols - 1) / (cols * extent) + 0.5 (t için satırlarla aynı)
+        """
+        glActiveTexture(GL_TEXTURE1)
+        glEnable(GL_TEXTURE_2D)
+        glBindTexture(GL_TEXTURE_2D, self.texture_id)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+
+        s_scale = (self.width - 1) / (self.width * extent)
+        t_scale = (self.height - 1) / (self.height * extent)
+        glTexGeni(GL_S, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR)
+        glTexGeni(GL_T, GL_TEXTURE_GEN_MODE, GL_OBJECT_LINEAR)
+        glTexGenfv(GL_S, GL_OBJECT_PLANE, [s_scale, 0.0, 0.0, 0.5])
+        glTexGenfv(GL_T, GL_OBJECT_PLANE, [0.0, t_scale, 0.0, 0.5])
+        glEnable(GL_TEXTURE_GEN_S)
+        glEnable(GL_TEXTURE_GEN_T)
+        glActiveTexture(GL_TEXTURE0)
+
+    def unbind(self):
+        glActiveTexture(GL_TEXTURE1)
+        glDisable(GL_TEXTURE_GEN_S)
+        glDisable(GL_TEXTURE_GEN_T)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glDisable(GL_TEXTURE_2D)
+        glActiveTexture(GL_TEXTURE0)
+
+    def delete(self):
+        """GPU kaynaklarını serbest bırakır"""
+        if self.texture_id is not None:
+            glDeleteTextures([self.texture_id])
+            self.texture_id = None
+        self.width = self.height = 0
@@ -0,0 +1,70 @@
+"""batch_precompute çıktısının widget'ın yükleme yolunda cache'ten okunması"""
+
+import pytest
+
+import batch_precompute
+from config import API_SETTINGS, APP_SETTINGS, LIGHTMAP_SETTINGS, RENDER_SETTINGS, get_terrain_quality_settings
+from mesh_cache import MeshCache, mesh_cache_key
+from stub_map_server import StubMapServer
+
+
+@pytest.fixture
+def stub_env(tmp_path, monkeypatch):
+    server = StubMapServer()
+    server.start()
+    for key, value in server.api_settings().items():
+        monkeypatch.setitem(API_SETTINGS, key, value)
+    monkeypatch.setitem(API_SETTINGS, 'RATE_LIMIT_DELAY', 0)
+    monkeypatch.setitem(APP_SETTINGS, 'CACHE_DIR', str(tmp_path / 'cache'))
+    yield tmp_path
+    server.stop()
+
+
+def test_precomputed_mesh_hits_in_widget_path(stub_env):
+    lat, lon = 41.0082, 28.9784
+    quality = 'low'
+    summary = batch_precompute.precompute([('Istanbul', (lat, lon))], quality, workers=1,
+                                          checkpoint_path=str(stub_env / 'checkpoint.json'),
+                                          restart=True)
+    assert summary['locations'] == 1 and not summary['failed']
+
+    # Map3DWidget.load_terrain_data / generate_terrain_display_list ile aynı girdiler
+    from map_data_loader import MapDataLoader
+    settings = get_terrain_quality_settings(quality)
+    loader = MapDataLoader()
+    pyramid = loader.get_elevation_pyramid(lat, lon, settings['terrain_size'])
+    assert loader.last_elevation_source == 'cache'
+    elevation_data = pyramid[0]
+    terrain_bounds = loader.last_elevation_bounds
+    tile_bounds = loader.get_tile_bounds(lat, lon, settings['tile_zoom'], settings['terrain_size'])
+
+    key = mesh_cache_key(elevation_data, RENDER_SETTINGS['HEIGHT_SCALE'],
+                         uv_source=[terrain_bounds, tile_bounds])
+    mesh = MeshCache().load(key)
+    assert mesh is not None
+    del mesh
+
+    if LIGHTMAP_SETTINGS['ENABLED']:
+        from cache_manager import get_cache_manager
+        from terrain_lightmap import lightmap_cache_key
+        lightmap_key = lightmap_cache_key(elevation_data, RENDER_SETTINGS['HEIGHT_SCALE'])
+        assert get_cache_manager().lookup(lightmap_key) is not None
+
+
+def test_smoothed_precompute_keeps_cached_overviews(stub_env):
+    lat, lon = 41.0082, 28.9784
+    quality = 'low'
+    summary = batch_precompute.precompute([('Istanbul', (lat, lon))], quality, workers=1,
+                                          checkpoint_path=str(stub_env / 'checkpoint.json'),
+                                          smooth_iterations=2, restart=True)
+    assert summary['locations'] == 1 and not summary['failed']
+
+    # Overview'lar widget'ın cache'ten okuduğu (yumuşatılmamış) grid'e ait olmalı
+    from elevation_pyramid import level_digest
+    from map_data_loader import MapDataLoader
+    size = get_terrain_quality_settings(quality)['terrain_size']
+    loader = MapDataLoader()
+    elevation_data = loader.get_elevation_data(lat, lon, size)
+    assert loader.last_elevation_source == 'cache'
+    key = loader._pyramid_cache_key(lat, lon, size, 'mean', level_digest(elevation_data))
+    assert loader.cache.lookup(key) is not None
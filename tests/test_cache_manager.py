@@ -0,0 +1,53 @@
+"""CacheManager bütçe havuzları"""
+
+import os
+
+from cache_manager import CacheManager
+
+
+def _store(manager, key, size):
+    manager.store_bytes(key, b'\0' * size)
+
+
+def _drain(manager):
+    while manager.evict_step():
+        pass
+
+
+def test_artifacts_do_not_evict_downloaded_data(tmp_path):
+    manager = CacheManager(str(tmp_path), max_bytes=1000, artifact_max_bytes=5000)
+    try:
+        for i in range(3):
+            _store(manager, f"elev_{i}.npz", 300)
+        for i in range(4):
+            _store(manager, f"mesh_{i}.bin", 1000)
+        _drain(manager)
+
+        stats = manager.stats()
+        assert stats['bytes'] == 900
+        assert stats['artifact_bytes'] == 4000
+        assert stats['evictions'] == 0
+    finally:
+        manager.stop()
+
+
+def test_each_pool_evicts_its_own_lru_entries(tmp_path):
+    manager = CacheManager(str(tmp_path), max_bytes=1000, artifact_max_bytes=2500)
+    try:
+        _store(manager, "mesh_old.bin", 1000)
+        _store(manager, "elev_old.npz", 600)
+        _store(manager, "lightmap_a.npy", 1000)
+        _store(manager, "elev_new.npz", 600)
+        _store(manager, "contours_a.npz", 1000)
+        _drain(manager)
+
+        assert manager.lookup("mesh_old.bin") is None
+        assert manager.lookup("elev_old.npz") is None
+        for key in ("lightmap_a.npy", "contours_a.npz", "elev_new.npz"):
+            assert manager.lookup(key) is not None
+            assert os.path.exists(manager.path_for(key))
+        stats = manager.stats()
+        assert stats['bytes'] == 600
+        assert stats['artifact_bytes'] == 2000
+    finally:
+        manager.stop()
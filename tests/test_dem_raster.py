@@ -0,0 +1,94 @@
+"""LocalDEMSource.read_overview indirgemeleri"""
+
+import json
+
+import numpy as np
+import pytest
+
+from dem_raster import LocalDEMSource
+
+
+def _write_raw(tmp_path, data, nodata=None):
+    path = tmp_path / 'dem.bin'
+    data.tofile(path)
+    meta = {'width': data.shape[1], 'height': data.shape[0], 'dtype': data.dtype.str,
+            'west': 28.0, 'south': 40.0, 'east': 29.0, 'north': 41.0}
+    if nodata is not None:
+        meta['nodata'] = nodata
+    (tmp_path / 'dem.json').write_text(json.dumps(meta))
+    return LocalDEMSource(str(path))
+
+
+def _masked_reference(data, factor, method, nodata):
+    rows, cols = data.shape[0] // factor, data.shape[1] // factor
+    blocks = data[:rows * factor, :cols * factor].astype(np.float64)
+    blocks = blocks.reshape(rows, factor, cols, factor).transpose(0, 2, 1, 3).reshape(rows, cols, -1)
+    masked = np.ma.masked_invalid(blocks) if np.isnan(nodata) else np.ma.masked_equal(blocks, nodata)
+    reduced = masked.mean(axis=2) if method == 'mean' else masked.max(axis=2)
+    return reduced.filled(nodata)[::-1]
+
+
+@pytest.mark.parametrize('method', ['mean', 'max'])
+def test_overview_ignores_nodata(tmp_path, method):
+    rng = np.random.default_rng(0)
+    data = rng.integers(-100, 3000, (203, 157)).astype(np.int16)
+    data[rng.random(data.shape) < 0.3] = -32768
+    data[:16, :16] = -32768  # Tamamı nodata bloklar
+    dem = _write_raw(tmp_path, data, nodata=-32768)
+
+    overview = dem.read_overview(40, method, chunk_rows=24)
+    factor = 6
+    expected = _masked_reference(data, factor, method, -32768.0)
+    assert overview.shape == expected.shape
+    np.testing.assert_allclose(overview, expected, rtol=1e-6)
+    assert overview[-1, 0] == -32768 and overview[-2, 1] == -32768
+
+
+@pytest.mark.parametrize('method', ['mean', 'max'])
+def test_overview_nan_nodata(tmp_path, method):
+    data = np.arange(64 * 64, dtype=np.float32).reshape(64, 64)
+    data[::3, ::2] = np.nan
+    data[:4, :4] = np.nan
+    dem = _write_raw(tmp_path, data, nodata='nan')
+
+    overview = dem.read_overview(16, method)
+    expected = _masked_reference(data, 4, method, np.nan)
+    np.testing.assert_allclose(overview, expected, rtol=1e-6)
+    assert np.isnan(overview[-1, 0])
+    assert np.count_nonzero(np.isnan(overview)) == 1
+
+
+@pytest.mark.parametrize('method', ['mean', 'max'])
+def test_overview_without_nodata(tmp_path, method):
+    data = np.random.default_rng(1).uniform(0, 500, (48, 40)).astype(np.float32)
+    dem = _write_raw(tmp_path, data)
+    overview = dem.read_overview(12, method)
+    blocks = data.reshape(12, 4, 10, 4)
+    expected = (blocks.mean(axis=(1, 3)) if method == 'mean' else blocks.max(axis=(1, 3)))[::-1]
+    np.testing.assert_allclose(overview, expected, rtol=1e-6)
+
+
+def test_loader_zeroes_nan_nodata(tmp_path):
+    from map_data_loader import MapDataLoader
+
+    data = np.full((64, 64), 250.0, dtype=np.float32)
+    data[10:20, 30:40] = np.nan
+    dem = _write_raw(tmp_path, data, nodata='nan')
+
+    loader = MapDataLoader(cache_dir=str(tmp_path / 'cache'))
+    loader.local_dem_path = dem.path
+    grid = loader.get_local_elevation_data(40.5, 28.5, 100)
+    assert grid is not None
+    assert not np.isnan(grid).any()
+    assert np.count_nonzero(grid == 0) == 100
+
+
+def test_export_grid_zeroes_nan_nodata():
+    from terrain_export import ExportGrid
+
+    data = np.arange(16, dtype=np.float32).reshape(4, 4)
+    data[1, 2] = np.nan
+    grid = ExportGrid(data, np.arange(4.0), np.arange(4.0), 1.0, nodata=float('nan'))
+    block = grid.read(0, 4, 0, 4)
+    assert block[1, 2] == 0.0
+    assert not np.isnan(block).any()
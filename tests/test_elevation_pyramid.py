@@ -0,0 +1,86 @@
+"""elevation_pyramid.downsample_2x kenar davranışı"""
+
+import numpy as np
+import pytest
+
+from elevation_pyramid import ElevationPyramid, downsample_2x
+
+
+def _reference(data, method):
+    """Her 2x2 bloğu (kenarda kesik blok) var olan örnekleri üzerinden indirger"""
+    rows, cols = data.shape
+    reduce = np.mean if method == 'mean' else np.max
+    out = np.empty(((rows + 1) // 2, (cols + 1) // 2))
+    for i in range(out.shape[0]):
+        for j in range(out.shape[1]):
+            out[i, j] = reduce(data[2 * i:2 * i + 2, 2 * j:2 * j + 2].astype(np.float64))
+    return out
+
+
+@pytest.mark.parametrize('shape', [(8, 8), (9, 8), (8, 9), (9, 9), (1, 5), (5, 1), (1, 1), (37, 64)])
+@pytest.mark.parametrize('method', ['mean', 'max'])
+def test_downsample_matches_partial_block_reference(shape, method):
+    data = np.random.default_rng(sum(shape)).uniform(-50, 3000, shape).astype(np.float32)
+    result = downsample_2x(data, method)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, _reference(data, method), rtol=1e-6)
+
+
+def test_downsample_odd_edge_uses_only_existing_samples():
+    data = np.array([[0.0, 2.0, 10.0],
+                     [4.0, 6.0, 20.0],
+                     [100.0, 200.0, 1000.0]], dtype=np.float32)
+    np.testing.assert_array_equal(downsample_2x(data, 'mean'),
+                                  [[3.0, 15.0], [150.0, 1000.0]])
+    np.testing.assert_array_equal(downsample_2x(data, 'max'),
+                                  [[6.0, 20.0], [200.0, 1000.0]])
+
+
+def test_downsample_does_not_modify_input():
+    data = np.random.default_rng(0).uniform(0, 1, (11, 7)).astype(np.float32)
+    original = data.copy()
+    downsample_2x(data)
+    np.testing.assert_array_equal(data, original)
+
+
+def test_downsample_unknown_method():
+    with pytest.raises(ValueError):
+        downsample_2x(np.zeros((4, 4), dtype=np.float32), 'median')
+
+
+def test_pyramid_level_shapes_for_odd_grid():
+    pyramid = ElevationPyramid.build(np.zeros((101, 75), dtype=np.float32))
+    shapes = [level.shape for level in pyramid.levels]
+    assert shapes[:4] == [(101, 75), (51, 38), (26, 19), (13, 10)]
+
+
+def _stub_elevation(loader, monkeypatch, grid, source):
+    def get_elevation_data(lat, lon, size):
+        loader.last_elevation_source = source
+        loader.last_elevation_bounds = loader.get_terrain_bounds(lat, lon, size)
+        return grid
+    monkeypatch.setattr(loader, 'get_elevation_data', get_elevation_data)
+
+
+def test_cached_overviews_follow_level_zero(tmp_path, monkeypatch):
+    from map_data_loader import MapDataLoader
+
+    loader = MapDataLoader(cache_dir=str(tmp_path))
+    rng = np.random.default_rng(3)
+    first = rng.uniform(0, 1000, (50, 50)).astype(np.float32)
+    second = rng.uniform(2000, 3000, (50, 50)).astype(np.float32)
+
+    _stub_elevation(loader, monkeypatch, first, 'srtm')
+    loader.get_elevation_pyramid(41.0, 29.0, 50)
+    _stub_elevation(loader, monkeypatch, second, 'local')
+    pyramid = loader.get_elevation_pyramid(41.0, 29.0, 50)
+    np.testing.assert_allclose(pyramid[1], downsample_2x(second), atol=0.5)
+
+
+def test_fake_elevation_skips_pyramid_cache(tmp_path, monkeypatch):
+    from map_data_loader import MapDataLoader
+
+    loader = MapDataLoader(cache_dir=str(tmp_path))
+    _stub_elevation(loader, monkeypatch, np.zeros((50, 50), dtype=np.float32), 'fake')
+    loader.get_elevation_pyramid(41.0, 29.0, 50)
+    assert not list(tmp_path.rglob('*_pyr_*'))
@@ -0,0 +1,42 @@
+"""Tile mozaiğinin elevation grid'ini kapsaması"""
+
+import numpy as np
+import pytest
+
+from config import API_SETTINGS, APP_SETTINGS, RENDER_SETTINGS
+from map_data_loader import MapDataLoader
+from stub_map_server import StubMapServer
+from terrain_mesh import compute_terrain_uvs
+
+
+@pytest.mark.parametrize('lat, lon', [(41.0082, 28.9784), (-33.9, 151.2), (64.1, -21.9), (0.0, 0.0)])
+@pytest.mark.parametrize('size, zoom', [(30, 12), (50, 14), (100, 16), (5, 18)])
+def test_tile_bounds_cover_terrain(tmp_path, lat, lon, size, zoom):
+    loader = MapDataLoader(cache_dir=str(tmp_path))
+    tile_bounds = loader.get_tile_bounds(lat, lon, zoom, size)
+    terrain_bounds = loader.get_terrain_bounds(lat, lon, size)
+
+    assert tile_bounds['zoom'] <= zoom
+    assert max(tile_bounds['cols'], tile_bounds['rows']) <= RENDER_SETTINGS['MAX_TILE_GRID']
+    u, v = compute_terrain_uvs(terrain_bounds, tile_bounds, size, size)
+    assert u.min() >= 0 and u.max() <= 1
+    assert v.min() >= 0 and v.max() <= 1
+
+
+def test_map_tiles_match_tile_bounds(tmp_path, monkeypatch):
+    with StubMapServer() as server:
+        for key, value in server.api_settings().items():
+            monkeypatch.setitem(API_SETTINGS, key, value)
+        monkeypatch.setitem(API_SETTINGS, 'RATE_LIMIT_DELAY', 0)
+        monkeypatch.setitem(APP_SETTINGS, 'CACHE_DIR', str(tmp_path))
+
+        loader = MapDataLoader()
+        received = []
+        image = loader.get_map_tiles(41.0082, 28.9784, 14, tile_callback=lambda *a: received.append(a[:2]),
+                                     size=50)
+        tile_bounds = loader.get_tile_bounds(41.0082, 28.9784, 14, 50)
+
+    size = tile_bounds['tile_size']
+    assert image.size == (tile_bounds['cols'] * size, tile_bounds['rows'] * size)
+    assert sorted(received) == [(c, r) for c in range(tile_bounds['cols']) for r in range(tile_bounds['rows'])]
+    assert np.asarray(image).std() > 0
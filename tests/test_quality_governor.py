@@ -0,0 +1,26 @@
+"""QualityGovernor yükleme ayarları"""
+
+import numpy as np
+
+from config import ELEVATION_SETTINGS, RENDER_SETTINGS
+from quality_governor import QualityGovernor
+
+
+def test_tile_zoom_keeps_terrain_inside_tile_grid():
+    governor = QualityGovernor()
+    max_tiles = RENDER_SETTINGS['MAX_TILE_GRID']
+    for level in np.arange(0.0, 2.01, 0.05):
+        settings = governor.settings_for_level(level)
+        span = settings['terrain_size'] * ELEVATION_SETTINGS['GRID_SPACING_DEG']
+        tile_width = 360.0 / 2 ** settings['tile_zoom']
+        assert span <= (max_tiles - 1) * tile_width
+        # Bir üst zoom artık sığmaz (gereksiz yere düşürülmez)
+        assert span > (max_tiles - 1) * tile_width / 2 or settings['tile_zoom'] >= 16
+
+
+def test_no_step_up_without_elevation_measurement():
+    governor = QualityGovernor(base_quality='medium')
+    governor.record_load(0.01, 0.1, 50, elevation_source='cache')
+    assert governor.level <= 1.0
+    governor.record_load(0.2, 0.1, 50, elevation_source='api')
+    assert governor.level > 1.0
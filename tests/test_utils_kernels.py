@@ -0,0 +1,212 @@
+"""utils kernel'lerinin eski döngülü uygulamalarla eşdeğerliği"""
+
+import numpy as np
+import pytest
+
+from utils import calculate_normals, generate_heightmap_texture, smooth_elevation_data
+
+
+# --- Referans: vektörleştirmeden önceki döngülü uygulamalar ---
+
+def _reference_normalize(elevation_data):
+    min_val = np.min(elevation_data)
+    max_val = np.max(elevation_data)
+    if max_val == min_val:
+        return np.zeros_like(elevation_data)
+    return (elevation_data - min_val) / (max_val - min_val)
+
+
+def _reference_smooth(elevation_data, iterations=1):
+    smoothed = elevation_data.copy()
+    kernel = np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16
+    for _ in range(iterations):
+        rows, cols = smoothed.shape
+        result = np.zeros_like(smoothed)
+        for i in range(1, rows - 1):
+            for j in range(1, cols - 1):
+                region = smoothed[i-1:i+2, j-1:j+2]
+                result[i, j] = np.sum(region * kernel)
+        result[0, :] = smoothed[0, :]
+        result[-1, :] = smoothed[-1, :]
+        result[:, 0] = smoothed[:, 0]
+        result[:, -1] = smoothed[:, -1]
+        smoothed = result
+    return smoothed
+
+
+def _reference_normals(elevation_data, scale=1.0):
+    rows, cols = elevation_data.shape
+    normals = np.zeros((rows, cols, 3))
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            dx = elevation_data[i, j + 1] - elevation_data[i, j - 1]
+            dy = elevation_data[i + 1, j] - elevation_data[i - 1, j]
+            normal = np.array([-dx * scale, -dy * scale, 2.0])
+            length = np.linalg.norm(normal)
+            if length > 0:
+                normal /= length
+            else:
+                normal = np.array([0, 0, 1])
+            normals[i, j] = normal
+    normals[0, :] = normals[1, :]
+    normals[-1, :] = normals[-2, :]
+    normals[:, 0] = normals[:, 1]
+    normals[:, -1] = normals[:, -2]
+    return normals
+
+
+def _reference_heightmap_texture(elevation_data):
+    normalized = _reference_normalize(elevation_data)
+    colors = np.zeros((elevation_data.shape[0], elevation_data.shape[1], 3))
+    for i in range(elevation_data.shape[0]):
+        for j in range(elevation_data.shape[1]):
+            height = normalized[i, j]
+            if height < 0.3:
+                colors[i, j] = [0.2, 0.4, 0.8]
+            elif height < 0.6:
+                colors[i, j] = [0.2, 0.7, 0.2]
+            elif height < 0.8:
+                colors[i, j] = [0.6, 0.4, 0.2]
+            else:
+                colors[i, j] = [0.9, 0.9, 0.9]
+    return (colors * 255).astype(np.uint8)
+
+
+# --- Test grid'leri ---
+
+def _random_grid(shape, seed=0):
+    return np.random.default_rng(seed).uniform(-50.0, 2500.0, shape)
+
+
+GRIDS = {
+    'random_50x50': _random_grid((50, 50)),
+    'random_37x64': _random_grid((37, 64), seed=1),
+    'random_3x3': _random_grid((3, 3), seed=2),
+    'ramp': np.add.outer(np.arange(20.0), np.arange(30.0)),
+    'integer_steps': np.tile(np.arange(11.0), (4, 1)),  # Normalize değerler tam eşiklerde
+    'spike': np.pad(np.array([[1000.0]]), 10),
+}
+
+SMALL_GRIDS = {
+    '2x5': _random_grid((2, 5), seed=3),
+    '5x2': _random_grid((5, 2), seed=4),
+    '1x1': np.array([[42.0]]),
+}
+
+
+@pytest.fixture(params=sorted(GRIDS))
+def grid(request):
+    return GRIDS[request.param]
+
+
+# --- smooth_elevation_data ---
+
+@pytest.mark.parametrize('iterations', [1, 3])
+def test_smooth_matches_reference(grid, iterations):
+    expected = _reference_smooth(grid, iterations)
+    np.testing.assert_allclose(smooth_elevation_data(grid, iterations), expected,
+                               rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize('iterations', [1, 3])
+def test_smooth_out_and_in_place(grid, iterations):
+    expected = _reference_smooth(grid, iterations)
+
+    out = np.empty_like(grid)
+    result = smooth_elevation_data(grid, iterations, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, expected, rtol=1e-12, atol=1e-9)
+
+    data = grid.copy()
+    result = smooth_elevation_data(data, iterations, out=data)
+    assert result is data
+    np.testing.assert_allclose(data, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_smooth_does_not_modify_input(grid):
+    original = grid.copy()
+    smooth_elevation_data(grid, 2)
+    np.testing.assert_array_equal(grid, original)
+
+
+def test_smooth_float32(grid):
+    data = grid.astype(np.float32)
+    result = smooth_elevation_data(data, 2)
+    assert result.dtype == np.float32
+    np.testing.assert_allclose(result, _reference_smooth(data.astype(np.float64), 2),
+                               rtol=1e-5, atol=1e-2)
+
+
+@pytest.mark.parametrize('name', sorted(SMALL_GRIDS))
+def test_smooth_small_grid_unchanged(name):
+    data = SMALL_GRIDS[name]
+    np.testing.assert_array_equal(smooth_elevation_data(data, 3), data)
+    out = np.empty_like(data)
+    np.testing.assert_array_equal(smooth_elevation_data(data, 3, out=out), data)
+
+
+def test_smooth_flat_grid():
+    flat = np.full((16, 9), 123.5)
+    np.testing.assert_array_equal(smooth_elevation_data(flat, 4), flat)
+
+
+# --- calculate_normals ---
+
+@pytest.mark.parametrize('scale', [1.0, 0.1])
+def test_normals_match_reference(grid, scale):
+    expected = _reference_normals(grid, scale)
+    np.testing.assert_allclose(calculate_normals(grid, scale), expected, rtol=1e-12, atol=1e-15)
+
+
+def test_normals_out(grid):
+    expected = _reference_normals(grid, 0.5)
+    out = np.empty(grid.shape + (3,))
+    result = calculate_normals(grid, 0.5, out=out)
+    assert result is out
+    np.testing.assert_allclose(out, expected, rtol=1e-12, atol=1e-15)
+
+
+def test_normals_flat_grid():
+    flat = np.full((8, 12), -7.0)
+    expected = np.zeros((8, 12, 3))
+    expected[..., 2] = 1.0
+    np.testing.assert_array_equal(calculate_normals(flat), expected)
+    np.testing.assert_array_equal(calculate_normals(flat), _reference_normals(flat))
+
+
+@pytest.mark.parametrize('name', sorted(SMALL_GRIDS))
+def test_normals_small_grid_point_up(name):
+    # Eski döngü iç nokta olmadığında sıfır vektör (1 satırda IndexError)
+    # üretiyordu; yeni uygulama yukarı bakan birim normal verir
+    data = SMALL_GRIDS[name]
+    expected = np.zeros(data.shape + (3,))
+    expected[..., 2] = 1.0
+    np.testing.assert_array_equal(calculate_normals(data), expected)
+    out = np.empty(data.shape + (3,))
+    np.testing.assert_array_equal(calculate_normals(data, out=out), expected)
+
+
+# --- generate_heightmap_texture ---
+
+def test_heightmap_texture_matches_reference(grid):
+    result = generate_heightmap_texture(grid)
+    assert result.dtype == np.uint8
+    np.testing.assert_array_equal(result, _reference_heightmap_texture(grid))
+
+
+def test_heightmap_texture_out(grid):
+    out = np.empty(grid.shape + (3,), dtype=np.uint8)
+    result = generate_heightmap_texture(grid, out=out)
+    assert result is out
+    np.testing.assert_array_equal(out, _reference_heightmap_texture(grid))
+
+
+@pytest.mark.parametrize('name', sorted(SMALL_GRIDS))
+def test_heightmap_texture_small_grid(name):
+    data = SMALL_GRIDS[name]
+    np.testing.assert_array_equal(generate_heightmap_texture(data), _reference_heightmap_texture(data))
+
+
+def test_heightmap_texture_flat_grid():
+    flat = np.full((5, 7), 300.0)
+    np.testing.assert_array_equal(generate_heightmap_texture(flat), _reference_heightmap_texture(flat))
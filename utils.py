@@ -8,15 +8,21 @@ import os
 import time
 import logging
 from typing import Tuple, List, Optional
-from config import APP_SETTINGS
+import geo_math
+from config import APP_SETTINGS, COLOR_SETTINGS, HEIGHT_THRESHOLDS, ELEVATION_SETTINGS
 
-# Logging setup
-logging.basicConfig(
-    level=getattr(logging, APP_SETTINGS['LOG_LEVEL']),
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+def setup_logging(level: Optional[str] = None) -> None:
+    """
+    Kök logger'ı yapılandırır. Import sırasında değil, uygulama ve komut
+    satırı araçlarının giriş noktasında çağrılır; tekrar çağrılması zararsızdır.
+    """
+    logging.basicConfig(
+        level=getattr(logging, level or APP_SETTINGS['LOG_LEVEL']),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
 def validate_coordinates(lat: float, lon: float) -> bool:
     """Koordinat doğrulaması yapar"""
     if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)):
@@ -32,42 +38,25 @@ def validate_coordinates(lat: float, lon: float) -> bool:
 
 def deg2rad(degrees: float) -> float:
     """Derece to radyan çevirici"""
-    return degrees * math.pi / 180.0
+    return float(geo_math.deg2rad(degrees))
 
 def rad2deg(radians: float) -> float:
     """Radyan to derece çevirici"""
-    return radians * 180.0 / math.pi
+    return float(geo_math.rad2deg(radians))
 
 def haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """İki koordinat arası mesafeyi hesaplar (km)"""
-    R = 6371  # Dünya yarıçapı (km)
-    
-    dlat = deg2rad(lat2 - lat1)
-    dlon = deg2rad(lon2 - lon1)
-    
-    a = (math.sin(dlat/2) * math.sin(dlat/2) + 
-         math.cos(deg2rad(lat1)) * math.cos(deg2rad(lat2)) * 
-         math.sin(dlon/2) * math.sin(dlon/2))
-    
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    
-    return R * c
+    return float(geo_math.haversine(lat1, lon1, lat2, lon2))
 
 def tile_to_lat_lon(x: int, y: int, z: int) -> Tuple[float, float]:
     """Tile koordinatlarını lat/lon'a çevirir"""
-    n = 2.0 ** z
-    lon = x / n * 360.0 - 180.0
-    lat_rad = math.atan(math.sinh(math.pi * (1 - 2 * y / n)))
-    lat = math.degrees(lat_rad)
-    return lat, lon
+    lat, lon = geo_math.tile_to_lat_lon(x, y, z)
+    return float(lat), float(lon)
 
 def lat_lon_to_tile(lat: float, lon: float, z: int) -> Tuple[int, int]:
     """Lat/lon'u tile koordinatlarına çevirir"""
-    lat_rad = math.radians(lat)
-    n = 2.0 ** z
-    x = int((lon + 180.0) / 360.0 * n)
-    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
-    return x, y
+    x, y = geo_math.lat_lon_to_tile(lat, lon, z)
+    return int(x), int(y)
 
 def calculate_tile_bounds(center_lat: float, center_lon: float, zoom: int, 
                          tile_count: int = 3) -> List[Tuple[int, int]]:
@@ -83,95 +72,200 @@ def calculate_tile_bounds(center_lat: float, center_lon: float, zoom: int,
     
     return tiles
 
-def normalize_elevation_data(elevation_data: np.ndarray) -> np.ndarray:
-    """Elevation verilerini normalize eder (0-1 arası)"""
+def elevation_dtype() -> np.dtype:
+    """Pipeline boyunca kullanılan elevation veri tipi (ELEVATION_SETTINGS['DTYPE'])"""
+    return np.dtype(ELEVATION_SETTINGS['DTYPE'])
+
+def as_elevation_array(elevation_data) -> np.ndarray:
+    """
+    Veriyi yapılandırılmış elevation tipine çevirir; tip zaten uygunsa kopyalamaz
+    """
+    return np.asarray(elevation_data, dtype=elevation_dtype())
+
+def quantize_elevation(elevation_data: np.ndarray,
+                       step: Optional[float] = None) -> Tuple[np.ndarray, float, float]:
+    """
+    Elevation verisini int16'ya sıkıştırır: değer = offset + q * step
+    
+    Varsayılan adım desimetredir; yükseklik aralığı int16'ya sığmazsa adım
+    büyütülür. (q, offset, step) döndürür.
+    """
+    if step is None:
+        step = ELEVATION_SETTINGS['QUANTIZATION_STEP']
+    
+    min_val = float(np.min(elevation_data))
+    max_val = float(np.max(elevation_data))
+    offset = (min_val + max_val) / 2
+    
+    # int16 aralığı: -32767..32767
+    step = max(step, (max_val - min_val) / 65534)
+    
+    q = np.empty(elevation_data.shape, dtype=np.float32)
+    np.subtract(elevation_data, offset, out=q, casting='unsafe')
+    q *= 1.0 / step
+    np.rint(q, out=q)
+    return q.astype(np.int16), offset, step
+
+def dequantize_elevation(q: np.ndarray, offset: float, step: float,
+                         out: Optional[np.ndarray] = None) -> np.ndarray:
+    """quantize_elevation çıktısını yapılandırılmış elevation tipine geri açar"""
+    if out is None:
+        out = np.empty(q.shape, dtype=elevation_dtype())
+    np.multiply(q, step, out=out, casting='unsafe')
+    out += offset
+    return out
+
+def save_elevation(file, elevation_data: np.ndarray, encoding: Optional[str] = None):
+    """Elevation grid'ini ELEVATION_SETTINGS['CACHE_ENCODING'] ile .npz olarak yazar"""
+    if encoding is None:
+        encoding = ELEVATION_SETTINGS['CACHE_ENCODING']
+    
+    if encoding == 'quantized':
+        q, offset, step = quantize_elevation(elevation_data)
+        np.savez(file, q=q, offset=offset, step=step)
+    else:
+        np.savez(file, data=np.asarray(elevation_data, dtype=np.dtype(encoding)))
+
+def load_elevation(file) -> np.ndarray:
+    """save_elevation ile yazılmış grid'i yapılandırılmış elevation tipinde okur"""
+    with np.load(file) as archive:
+        if 'q' in archive:
+            return dequantize_elevation(archive['q'], float(archive['offset']), float(archive['step']))
+        return as_elevation_array(archive['data'])
+
+def _float_dtype(elevation_data: np.ndarray) -> np.dtype:
+    """Girdi float ise kendi tipini, değilse yapılandırılmış elevation tipini döndürür"""
+    if np.issubdtype(elevation_data.dtype, np.floating):
+        return elevation_data.dtype
+    return elevation_dtype()
+
+def normalize_elevation_data(elevation_data: np.ndarray,
+                             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Elevation verilerini normalize eder (0-1 arası)
+    
+    out verilirse sonuç oraya yazılır (out=elevation_data ile yerinde çalışır).
+    """
     min_val = np.min(elevation_data)
     max_val = np.max(elevation_data)
     
+    if out is None:
+        out = np.empty(elevation_data.shape, dtype=_float_dtype(elevation_data))
+    
     if max_val == min_val:
-        return np.zeros_like(elevation_data)
+        out.fill(0)
+        return out
     
-    return (elevation_data - min_val) / (max_val - min_val)
+    np.subtract(elevation_data, min_val, out=out)
+    out *= 1.0 / (max_val - min_val)
+    return out
 
-def smooth_elevation_data(elevation_data: np.ndarray, iterations: int = 1) -> np.ndarray:
-    """Elevation verilerini düzleştirir"""
-    smoothed = elevation_data.copy()
+def smooth_elevation_data(elevation_data: np.ndarray, iterations: int = 1,
+                          out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Elevation verilerini düzleştirir
+    
+    3x3 [1 2 1] Gaussian kernel'i ayrıştırılabilir olduğundan önce yatay,
+    sonra dikey [1 2 1] / 4 geçişi olarak uygulanır. Kenar satır ve sütunlar
+    korunur. out verilirse sonuç oraya yazılır (out=elevation_data ile yerinde).
+    """
+    if out is None:
+        out = np.array(elevation_data, dtype=_float_dtype(elevation_data))
+    elif out is not elevation_data:
+        np.copyto(out, elevation_data)
+    
+    rows, cols = out.shape
+    if rows < 3 or cols < 3:
+        return out
+    
+    # Geçici tamponlar tüm iterasyonlarda tekrar kullanılır
+    horizontal = np.empty((rows, cols - 2), dtype=out.dtype)
+    vertical = np.empty((rows - 2, cols - 2), dtype=out.dtype)
     
     for _ in range(iterations):
-        # Gaussian blur benzeri işlem
-        kernel = np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]]) / 16
-        
-        # Convolution işlemi
-        rows, cols = smoothed.shape
-        result = np.zeros_like(smoothed)
+        # Yatay geçiş: (a + 2b + c) / 4
+        np.add(out[:, :-2], out[:, 2:], out=horizontal)
+        horizontal += out[:, 1:-1]
+        horizontal += out[:, 1:-1]
+        horizontal *= 0.25
         
-        for i in range(1, rows - 1):
-            for j in range(1, cols - 1):
-                region = smoothed[i-1:i+2, j-1:j+2]
-                result[i, j] = np.sum(region * kernel)
+        # Dikey geçiş
+        np.add(horizontal[:-2], horizontal[2:], out=vertical)
+        vertical += horizontal[1:-1]
+        vertical += horizontal[1:-1]
+        vertical *= 0.25
         
-        # Kenarları koru
-        result[0, :] = smoothed[0, :]
-        result[-1, :] = smoothed[-1, :]
-        result[:, 0] = smoothed[:, 0]
-        result[:, -1] = smoothed[:, -1]
-        
-        smoothed = result
+        out[1:-1, 1:-1] = vertical
     
-    return smoothed
+    return out
 
-def calculate_normals(elevation_data: np.ndarray, scale: float = 1.0) -> np.ndarray:
-    """Elevation verilerinden normal vektörleri hesaplar"""
+def calculate_normals(elevation_data: np.ndarray, scale: float = 1.0,
+                      out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Elevation verilerinden normal vektörleri hesaplar
+    
+    Merkezi farklarla (np.gradient'in iç nokta formülü, 1/2 çarpanı normal
+    z bileşenine katılmış) (-dx, -dy, 2) vektörü normalize edilir. out
+    verilirse (rows, cols, 3) boyutlu diziye yazılır.
+    """
     rows, cols = elevation_data.shape
-    normals = np.zeros((rows, cols, 3))
-    
-    for i in range(1, rows - 1):
-        for j in range(1, cols - 1):
-            # Gradient hesapla
-            dx = elevation_data[i, j + 1] - elevation_data[i, j - 1]
-            dy = elevation_data[i + 1, j] - elevation_data[i - 1, j]
-            
-            # Normal vektör
-            normal = np.array([-dx * scale, -dy * scale, 2.0])
-            
-            # Normalize
-            length = np.linalg.norm(normal)
-            if length > 0:
-                normal /= length
-            else:
-                normal = np.array([0, 0, 1])
-            
-            normals[i, j] = normal
+    if out is None:
+        out = np.zeros((rows, cols, 3), dtype=_float_dtype(elevation_data))
+    
+    if rows < 3 or cols < 3:
+        out[...] = (0, 0, 1)
+        return out
+    
+    inner = out[1:-1, 1:-1]
+    
+    # Gradient hesapla
+    np.subtract(elevation_data[1:-1, :-2], elevation_data[1:-1, 2:], out=inner[..., 0])
+    np.subtract(elevation_data[:-2, 1:-1], elevation_data[2:, 1:-1], out=inner[..., 1])
+    if scale != 1.0:
+        inner[..., :2] *= scale
+    inner[..., 2] = 2.0
+    
+    # Normalize (z = 2 olduğundan uzunluk hiçbir zaman sıfır olmaz)
+    length = np.sqrt(np.einsum('ijk,ijk->ij', inner, inner))
+    inner /= length[..., np.newaxis]
     
     # Kenar normalleri
-    normals[0, :] = normals[1, :]
-    normals[-1, :] = normals[-2, :]
-    normals[:, 0] = normals[:, 1]
-    normals[:, -1] = normals[:, -2]
+    out[0, :] = out[1, :]
+    out[-1, :] = out[-2, :]
+    out[:, 0] = out[:, 1]
+    out[:, -1] = out[:, -2]
     
-    return normals
+    return out
 
-def generate_heightmap_texture(elevation_data: np.ndarray) -> np.ndarray:
-    """Elevation verilerinden texture oluşturur"""
-    normalized = normalize_elevation_data(elevation_data)
+# Yükseklik bantları için eşik ve renk tablosu
+_BAND_THRESHOLDS = np.array([
+    HEIGHT_THRESHOLDS['WATER_LEVEL'],
+    HEIGHT_THRESHOLDS['LOW_LAND'],
+    HEIGHT_THRESHOLDS['MID_LAND'],
+])
+_BAND_COLORS = (np.array([
+    COLOR_SETTINGS['WATER_COLOR'],
+    COLOR_SETTINGS['LAND_LOW_COLOR'],
+    COLOR_SETTINGS['LAND_MID_COLOR'],
+    COLOR_SETTINGS['LAND_HIGH_COLOR'],
+]) * 255).astype(np.uint8)
+
+def generate_heightmap_texture(elevation_data: np.ndarray,
+                               out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Elevation verilerinden texture oluşturur
     
-    # Renk haritası
-    colors = np.zeros((elevation_data.shape[0], elevation_data.shape[1], 3))
+    Normalize yükseklik eşik tablosunda aranarak bant indeksine, bant
+    indeksi de renk tablosu üzerinden RGB'ye çevrilir.
+    """
+    normalized = normalize_elevation_data(elevation_data)
+    bands = np.searchsorted(_BAND_THRESHOLDS, normalized, side='right')
     
-    for i in range(elevation_data.shape[0]):
-        for j in range(elevation_data.shape[1]):
-            height = normalized[i, j]
-            
-            if height < 0.3:  # Su
-                colors[i, j] = [0.2, 0.4, 0.8]
-            elif height < 0.6:  # Düşük arazi
-                colors[i, j] = [0.2, 0.7, 0.2]
-            elif height < 0.8:  # Orta yükseklik
-                colors[i, j] = [0.6, 0.4, 0.2]
-            else:  # Yüksek
-                colors[i, j] = [0.9, 0.9, 0.9]
+    if out is None:
+        return _BAND_COLORS[bands]
     
-    return (colors * 255).astype(np.uint8)
+    np.take(_BAND_COLORS, bands, axis=0, out=out)
+    return out
 
 def ensure_cache_directory(cache_dir: str = None) -> str:
     """Cache dizininin var olduğundan emin olur"""
@@ -181,7 +275,11 @@ def ensure_cache_directory(cache_dir: str = None) -> str:
     os.makedirs(cache_dir, exist_ok=True)
     return cache_dir
 
-def clean_old_cache_files(cache_dir: str = None, max_age_days: int = 7):
-    """Eski cache dosyalarını temizler"""
+def clean_old_cache_files(cache_dir: str = None, max_age_days: int = 7) -> int:
+    """Eski cache dosyalarını temizler, silinen dosya sayısını döndürür"""
+    from cache_manager import get_cache_manager
+    
     if cache_dir is None:
-        cache_dir = APP_SETTINGS['CACHE_DIR']
\ No newline at end of file
+        cache_dir = APP_SETTINGS['CACHE_DIR']
+    
+    return get_cache_manager(cache_dir).evict_expired(max_age_days * 86400)